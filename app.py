@@ -3,10 +3,13 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import sys
 import os
 import json
-from datetime import datetime
+import gzip
+import sqlite3
+from datetime import date, datetime
 from contextlib import asynccontextmanager
 import re
 
@@ -15,9 +18,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
 from backend.logger import logger
+from backend.core.infrastructure.file_utils import atomic_write, file_lock
+from backend.core.infrastructure.snapshot_store import SnapshotStore
 
 # --- Caching --- #
 CACHE_FILE = "./data/cache/spa_analysis_cache.json"
+CACHE_LOCK_FILE = "./data/cache/.spa_analysis_cache.lock"
+# Daily versions of the cache file, so past runs can be audited
+CACHE_SNAPSHOT_DIR = "./data/cache/analysis_snapshots"
+CACHE_SNAPSHOT_KEY = "spa_analysis"
 
 def get_cache():
     if not os.path.exists(CACHE_FILE):
@@ -29,9 +38,26 @@ def get_cache():
             return {}
 
 def write_cache(data):
-    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-    with open(CACHE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    body = json.dumps(data, indent=4)
+    # Atomic replace: other uvicorn workers never read a half-written file
+    with atomic_write(CACHE_FILE) as f:
+        f.write(body)
+    try:
+        SnapshotStore(CACHE_SNAPSHOT_DIR).put(CACHE_SNAPSHOT_KEY, "cache", gzip.compress(body.encode(), mtime=0), date.today())
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Could not snapshot the analysis cache: {e}")
+
+def get_cache_as_of(as_of: date) -> dict:
+    """The analysis cache as it stood at the end of ``as_of`` (its last write that day or before)."""
+    content = SnapshotStore(CACHE_SNAPSHOT_DIR).get(CACHE_SNAPSHOT_KEY, "cache", as_of)
+    return json.loads(gzip.decompress(content)) if content is not None else {}
+
+def update_cache_step(step, entry):
+    """Set one step's entry, re-reading the cache under a lock so concurrent workers don't drop each other's steps."""
+    with file_lock(CACHE_LOCK_FILE):
+        cache = get_cache()
+        cache[step] = entry
+        write_cache(cache)
 
 def _extract_json_from_text(text_content: str) -> str:
     """Extracts a JSON string from a text, handling markdown code blocks."""
@@ -42,13 +68,26 @@ def _extract_json_from_text(text_content: str) -> str:
     return text_content
 
 from backend.core.use_cases.ai_evaluation_service import AIEvaluationService
-from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository
+from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository, serialize_bundle
+from backend.core.use_cases.triage_service import TriageService
+
+# RFC 9111 caps Age at 2^31 seconds
+MAX_AGE_HEADER = 2 ** 31
+
+def _bundle_response(data: dict) -> JSONResponse:
+    """JSON response for a ticker bundle; stale bundles carry their age in the Age header."""
+    headers = {}
+    cache_status = data.get("cache_status")
+    if cache_status and cache_status["age_seconds"] is not None:
+        headers["Age"] = str(min(cache_status["age_seconds"], MAX_AGE_HEADER))
+    return JSONResponse(content=serialize_bundle(data), headers=headers)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up application...")
     app.state.ai_service = AIEvaluationService()
     app.state.yfinance_repo = YahooFinanceRepository()
+    app.state.triage_service = TriageService(app.state.yfinance_repo)
     yield
     logger.info("Shutting down application...")
 
@@ -80,9 +119,11 @@ async def read_root(request: Request):
 async def get_stock_detail(ticker: str, request: Request):
     yfinance_repo = request.app.state.yfinance_repo
     try:
-        data = yfinance_repo.get_all_data(ticker)
+        # Off the event loop, so concurrent requests for one ticker coalesce into a single fetch.
+        # Expired data is served immediately and refreshed in the background.
+        data = await run_in_threadpool(yfinance_repo.get_all_data, ticker, stale_while_revalidate=True)
         if data:
-            return JSONResponse(content=data)
+            return _bundle_response(data)
         raise HTTPException(status_code=404, detail=f"Stock data not found for {ticker}")
     except Exception as e:
         logger.error(f"Error fetching stock detail for {ticker}: {e}", exc_info=True)
@@ -92,9 +133,11 @@ async def get_stock_detail(ticker: str, request: Request):
 async def get_yfinance_data(ticker: str, request: Request):
     yfinance_repo = request.app.state.yfinance_repo
     try:
-        data = yfinance_repo.get_all_data(ticker)
+        # Off the event loop, so concurrent requests for one ticker coalesce into a single fetch.
+        # Expired data is served immediately and refreshed in the background.
+        data = await run_in_threadpool(yfinance_repo.get_all_data, ticker, stale_while_revalidate=True)
         if data:
-            return JSONResponse(content=data)
+            return _bundle_response(data)
         raise HTTPException(status_code=404, detail=f"Yahoo Finance data not found for {ticker}")
     except Exception as e:
         logger.error(f"Error fetching Yahoo Finance data for {ticker}: {e}", exc_info=True)
@@ -152,7 +195,13 @@ async def run_analysis_step(request: Request):
             companies_list = payload.get("companies_list")
             if not companies_list:
                 raise HTTPException(status_code=400, detail="companies_list is required for categorization_triage step.")
-            result = ai_service.categorize_and_filter_lynch(companies_list=companies_list, detail_level=detail_level)
+            # Clear cases are settled from cached data; only the ambiguous tickers go to the LLM
+            triage_service: TriageService = request.app.state.triage_service
+            result = await run_in_threadpool(
+                triage_service.categorize,
+                companies_list,
+                lambda ambiguous: ai_service.categorize_and_filter_lynch(companies_list=ambiguous, detail_level=detail_level),
+            )
         elif step == "vetting_fast_growers":
             fast_growers_data = payload.get("fast_growers_data")
             if not fast_growers_data:
@@ -205,11 +254,10 @@ async def run_analysis_step(request: Request):
             raise HTTPException(status_code=400, detail=f"Unknown step: {step}")
 
         # Update cache
-        cache[step] = {
+        update_cache_step(step, {
             "timestamp": datetime.now().isoformat(),
             "data": result
-        }
-        write_cache(cache)
+        })
         logger.info(f"Successfully completed analysis step: {step}")
         return {"status": "success", "step": step, "data": result}
 
@@ -266,5 +314,7 @@ async def get_stock_sentiment_analysis(ticker: str):
     raise HTTPException(status_code=404, detail=f"Sentiment analysis not found for {ticker}")
 
 @app.get("/api/get_full_cache")
-async def get_full_cache():
+async def get_full_cache(as_of: date | None = None):
+    if as_of is not None:
+        return JSONResponse(content=await run_in_threadpool(get_cache_as_of, as_of))
     return JSONResponse(content=get_cache())
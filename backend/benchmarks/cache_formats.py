@@ -0,0 +1,99 @@
+"""
+Benchmark: Yahoo Finance cache formats, disk footprint and read throughput.
+
+Compares the legacy indent=4 JSON files with the columnar layout, both
+uncompressed (memory-mapped Arrow files, plain meta.json) and with the default
+encoding (zstd Arrow files, gzipped meta). The input is the ``<TICKER>.json`` files in
+``data/cache/yfinance_data``, each copied ``--copies`` times under new
+ticker names.
+
+    python -m backend.benchmarks.cache_formats --copies 20
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.core.infrastructure import yfinance_cache
+
+SOURCE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "yfinance_data")
+CACHE_BOOKKEEPING = (yfinance_cache.LOCK_DIR, yfinance_cache.MANIFEST_FILE, yfinance_cache.SNAPSHOT_DIR)
+
+FORMATS = {
+    "columnar (uncompressed)": {"META_COMPRESSION": None, "ARROW_COMPRESSION": None},
+    "columnar (gzip meta, zstd)": {"META_COMPRESSION": "gzip", "ARROW_COMPRESSION": "zstd"},
+}
+
+
+def _directory_size(directory: str, exclude: tuple[str, ...] = ()) -> int:
+    """Bytes under ``directory``, skipping top-level entries whose names start with one of ``exclude``."""
+    total = 0
+    for root, dirs, names in os.walk(directory):
+        if root == directory:
+            dirs[:] = [name for name in dirs if not name.startswith(exclude)]
+            names = [name for name in names if not name.startswith(exclude)]
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in names)
+    return total
+
+
+def _report(label: str, tickers: int, nbytes: int, seconds: float):
+    print(
+        f"{label:<32} {nbytes / 1024 / 1024:>9.2f} MB {nbytes / tickers / 1024:>9.1f} KB/ticker"
+        f" {tickers / seconds:>10.1f} tickers/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=10, help="Copies of each source ticker.")
+    args = parser.parse_args()
+
+    sources = sorted(glob.glob(os.path.join(SOURCE_DIR, "*.json")))
+    if not sources:
+        sys.exit(f"No legacy cache files found in {SOURCE_DIR}")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        legacy_dir = os.path.join(work_dir, "legacy")
+        os.makedirs(legacy_dir)
+        tickers = []
+        for source in sources:
+            name = os.path.splitext(os.path.basename(source))[0]
+            for copy in range(args.copies):
+                ticker = f"{name}{copy}"
+                shutil.copy(source, os.path.join(legacy_dir, f"{ticker}.json"))
+                tickers.append(ticker)
+
+        print(f"{len(tickers)} tickers\n")
+        print(f"{'format':<32} {'on disk':>12} {'per ticker':>12} {'read':>20}")
+
+        start = time.perf_counter()
+        for ticker in tickers:
+            yfinance_cache.load_legacy_json(os.path.join(legacy_dir, f"{ticker}.json"))
+        _report("legacy JSON (indent=4)", len(tickers), _directory_size(legacy_dir), time.perf_counter() - start)
+
+        for label, settings in FORMATS.items():
+            format_dir = os.path.join(work_dir, label)
+            with patch.multiple(yfinance_cache, YFINANCE_CACHE_DIR=format_dir, **settings):
+                for ticker in tickers:
+                    _, data = yfinance_cache.load_legacy_json(os.path.join(legacy_dir, f"{ticker}.json"))
+                    yfinance_cache.write_bundle(ticker, data)
+                start = time.perf_counter()
+                for ticker in tickers:
+                    yfinance_cache.read_bundle(ticker)
+                seconds = time.perf_counter() - start
+            # Only the entries themselves: locks, the manifest (and its WAL files) and snapshots are not the format
+            _report(label, len(tickers), _directory_size(format_dir, exclude=CACHE_BOOKKEEPING), seconds)
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Columnar storage for a universe of evaluated candidates.
+
+``InvestmentCandidate`` holds one ``CriterionResult`` object per criterion,
+which for thousands of tickers times dozens of criteria means millions of
+small objects. ``CandidateTable`` keeps the same information in arrays:
+
+  * ``statuses``: an ``int8`` (ticker x criterion) matrix of ``STATUSES``
+    codes, ``NO_RESULT`` where a criterion has not been evaluated;
+  * ``values``: one column per criterion, ``float64`` (NaN for no value)
+    while every value is numeric, ``object`` once any value is not;
+  * ``note_codes``: an ``int32`` matrix of indexes into ``note_texts``,
+    the table's distinct notes, with 0 for the empty note.
+
+Rows are read through ``CandidateView``, which has the ``company``,
+``results``, ``add_criterion_result`` and ``get_criterion_result`` of an
+``InvestmentCandidate`` but builds objects only for what is accessed.
+"""
+
+from numbers import Real
+from typing import Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+
+from .models import Company, CriterionResult, InvestmentCandidate, ResultStatus
+
+STATUSES = (ResultStatus.PASS, ResultStatus.FAIL, ResultStatus.PENDING)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+NO_RESULT = -1
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool)
+
+
+class CandidateTable:
+    def __init__(self, companies: Sequence[Company], criteria: Sequence[str]):
+        self.tickers = np.array([company.ticker for company in companies], dtype=object)
+        self.names = np.array([company.name for company in companies], dtype=object)
+        self.industries = np.array([company.industry for company in companies], dtype=object)
+        self.stories = np.array([company.story for company in companies], dtype=object)
+        self.criteria = tuple(dict.fromkeys(criteria))
+        self.statuses = np.full((len(self.tickers), len(self.criteria)), NO_RESULT, dtype=np.int8)
+        self.values: dict[str, np.ndarray] = {}
+        self.note_codes = np.zeros(self.statuses.shape, dtype=np.int32)
+        self.note_texts = [""]
+        self._note_index = {"": 0}
+        self._rows = {ticker: row for row, ticker in enumerate(self.tickers)}
+        self._columns = {criterion_id: column for column, criterion_id in enumerate(self.criteria)}
+
+    @classmethod
+    def from_candidates(cls, candidates: Iterable[InvestmentCandidate]) -> "CandidateTable":
+        candidates = list(candidates)
+        criteria = dict.fromkeys(criterion_id for c in candidates for criterion_id in c.results)
+        table = cls([candidate.company for candidate in candidates], criteria)
+        for row, candidate in enumerate(candidates):
+            for result in candidate.results.values():
+                table.set_result(row, result)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __iter__(self) -> Iterator["CandidateView"]:
+        return (CandidateView(self, row) for row in range(len(self)))
+
+    def __getitem__(self, ticker: str) -> "CandidateView":
+        return CandidateView(self, self._rows[ticker])
+
+    def row_of(self, ticker: str) -> int:
+        return self._rows[ticker]
+
+    def column_of(self, criterion_id: str) -> int:
+        if criterion_id not in self._columns:
+            raise KeyError(f"Criterion {criterion_id!r} is not a column of this table")
+        return self._columns[criterion_id]
+
+    def company(self, row: int) -> Company:
+        return Company(
+            ticker=self.tickers[row], name=self.names[row], industry=self.industries[row], story=self.stories[row],
+        )
+
+    def note_code(self, note: str) -> int:
+        """The code of ``note`` in ``note_texts``, adding it if new."""
+        code = self._note_index.get(note)
+        if code is None:
+            code = self._note_index[note] = len(self.note_texts)
+            self.note_texts.append(note)
+        return code
+
+    def set_result(self, row: int, result: CriterionResult):
+        column = self.column_of(result.criterion_id)
+        self.statuses[row, column] = STATUS_CODES[result.status]
+        self.note_codes[row, column] = self.note_code(result.notes)
+        self._set_value(result.criterion_id, row, result.value)
+
+    def _set_value(self, criterion_id: str, row: int, value):
+        values = self.values.get(criterion_id)
+        if values is None:
+            if value is None:
+                return
+            if _is_number(value):
+                values = np.full(len(self), np.nan)
+            else:
+                values = np.full(len(self), None, dtype=object)
+            self.values[criterion_id] = values
+        elif values.dtype == np.float64 and value is not None and not _is_number(value):
+            # The first non-numeric value turns the column into an object column
+            values = values.astype(object)
+            values[np.isnan(values.astype(np.float64))] = None
+            self.values[criterion_id] = values
+        values[row] = np.nan if value is None and values.dtype == np.float64 else value
+
+    def value(self, row: int, criterion_id: str):
+        values = self.values.get(criterion_id)
+        if values is None:
+            return None
+        value = values[row]
+        if values.dtype == np.float64:
+            return None if np.isnan(value) else float(value)
+        return value
+
+    def status(self, row: int, criterion_id: str) -> ResultStatus | None:
+        code = self.statuses[row, self.column_of(criterion_id)]
+        return None if code == NO_RESULT else STATUSES[code]
+
+    def result(self, row: int, criterion_id: str) -> CriterionResult | None:
+        if criterion_id not in self._columns:
+            return None
+        column = self._columns[criterion_id]
+        code = self.statuses[row, column]
+        if code == NO_RESULT:
+            return None
+        return CriterionResult(
+            criterion_id=criterion_id,
+            status=STATUSES[code],
+            value=self.value(row, criterion_id),
+            notes=self.note_texts[self.note_codes[row, column]],
+        )
+
+    def passed(self) -> np.ndarray:
+        """Boolean (ticker x criterion) matrix of PASS results."""
+        return self.statuses == STATUS_CODES[ResultStatus.PASS]
+
+
+class CandidateResults(Mapping):
+    """Read view of one row's results, keyed by criterion id like ``InvestmentCandidate.results``."""
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: CandidateTable, row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, criterion_id: str) -> CriterionResult:
+        result = self._table.result(self._row, criterion_id)
+        if result is None:
+            raise KeyError(criterion_id)
+        return result
+
+    def __iter__(self) -> Iterator[str]:
+        evaluated = self._table.statuses[self._row] != NO_RESULT
+        return (criterion_id for criterion_id, present in zip(self._table.criteria, evaluated) if present)
+
+    def __len__(self) -> int:
+        return int((self._table.statuses[self._row] != NO_RESULT).sum())
+
+
+class CandidateView:
+    """One row of a ``CandidateTable``, usable wherever an ``InvestmentCandidate`` is read."""
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: CandidateTable, row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def company(self) -> Company:
+        return self.table.company(self.row)
+
+    @property
+    def results(self) -> CandidateResults:
+        return CandidateResults(self.table, self.row)
+
+    def add_criterion_result(self, result: CriterionResult):
+        self.table.set_result(self.row, result)
+
+    def get_criterion_result(self, criterion_id: str) -> CriterionResult | None:
+        return self.table.result(self.row, criterion_id)
+
+    def to_candidate(self) -> InvestmentCandidate:
+        return InvestmentCandidate(company=self.company, results=dict(self.results))
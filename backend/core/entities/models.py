@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
 from typing import Dict, Any
 
@@ -18,14 +19,45 @@ class Criterion:
     category: CriterionCategory
     description: str
 
-@dataclass
+@dataclass(slots=True)
 class Company:
     ticker: str
     name: str
     industry: str
     story: str = ""
 
-@dataclass
+@dataclass(frozen=True)
+class MarketContext:
+    gdp_growth: float
+    interest_rate: float
+    market_direction: str
+    as_of: datetime
+
+class MarketRegime(Enum):
+    # Declared from most defensive to most bullish
+    CORRECTION = "Market in Correction"
+    UNDER_PRESSURE = "Uptrend Under Pressure"
+    CONFIRMED_UPTREND = "Confirmed Uptrend"
+
+@dataclass(frozen=True)
+class IndexState:
+    symbol: str
+    as_of: datetime
+    close: float
+    regime: MarketRegime
+    distribution_days: int
+    rally_day: int
+    follow_through: bool
+    ma50: float | None
+    ma200: float | None
+
+@dataclass(frozen=True)
+class MarketRegimeSignal:
+    as_of: datetime
+    regime: MarketRegime
+    indexes: Dict[str, IndexState]
+
+@dataclass(slots=True)
 class CriterionResult:
     criterion_id: str
     status: ResultStatus
@@ -0,0 +1,118 @@
+"""
+SQLite index of the Yahoo Finance cache directory.
+
+One row per (ticker, dataset) records when the dataset was fetched and the
+size and checksum of the file holding it, so questions like "which tickers
+have price history older than X" are answered with one query instead of
+opening every ticker's meta file. ``yfinance_cache.write_bundle`` keeps the
+index current; ``rebuild`` re-creates it from the files on disk.
+"""
+
+import hashlib
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime
+from typing import Iterable
+
+MANIFEST_FILE = "manifest.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    ticker TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    PRIMARY KEY (ticker, dataset)
+);
+CREATE INDEX IF NOT EXISTS datasets_by_fetch_time ON datasets (dataset, fetched_at);
+"""
+
+
+def file_checksum(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class CacheManifest:
+    def __init__(self, path: str):
+        self.path = path
+
+    @contextmanager
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # WAL lets uvicorn workers read while another process records a write
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            with connection:
+                yield connection
+
+    def record(self, ticker: str, entries: Iterable[tuple[str, datetime, str]]):
+        """Upsert ``(dataset, fetched_at, file_path)`` entries for a ticker."""
+        rows = [
+            (ticker.upper(), dataset, fetched_at.isoformat(), os.path.getsize(path), file_checksum(path))
+            for dataset, fetched_at, path in entries
+        ]
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO datasets (ticker, dataset, fetched_at, size, checksum) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def set_fetched(self, tickers: Iterable[str], datasets: Iterable[str], fetched_at: datetime):
+        rows = [(fetched_at.isoformat(), ticker.upper(), dataset) for ticker in tickers for dataset in datasets]
+        with self._connect() as connection:
+            connection.executemany("UPDATE datasets SET fetched_at = ? WHERE ticker = ? AND dataset = ?", rows)
+
+    def remove(self, tickers: Iterable[str]):
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM datasets WHERE ticker = ?", [(t.upper(),) for t in tickers])
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM datasets")
+
+    def tickers(self) -> list[str]:
+        with self._connect() as connection:
+            return [row[0] for row in connection.execute("SELECT DISTINCT ticker FROM datasets ORDER BY ticker")]
+
+    def entries(self, ticker: str | None = None) -> list[dict]:
+        query = "SELECT ticker, dataset, fetched_at, size, checksum FROM datasets"
+        params = ()
+        if ticker is not None:
+            query += " WHERE ticker = ?"
+            params = (ticker.upper(),)
+        with self._connect() as connection:
+            rows = connection.execute(query + " ORDER BY ticker, dataset", params).fetchall()
+        return [
+            {"ticker": t, "dataset": d, "fetched_at": datetime.fromisoformat(f), "size": s, "checksum": c}
+            for t, d, f, s, c in rows
+        ]
+
+    def fetch_times(self, dataset: str) -> dict[str, datetime]:
+        """``{ticker: fetched_at}`` of every ticker with ``dataset`` cached."""
+        with self._connect() as connection:
+            rows = connection.execute("SELECT ticker, fetched_at FROM datasets WHERE dataset = ?", (dataset,)).fetchall()
+        return {ticker: datetime.fromisoformat(fetched_at) for ticker, fetched_at in rows}
+
+    def tickers_older_than(self, cutoff: datetime, datasets: Iterable[str] | None = None) -> list[str]:
+        """Tickers with at least one of ``datasets`` (default: any) fetched before ``cutoff``."""
+        query = "SELECT DISTINCT ticker FROM datasets WHERE fetched_at < ?"
+        params = [cutoff.isoformat()]
+        if datasets is not None:
+            datasets = list(datasets)
+            query += f" AND dataset IN ({', '.join('?' * len(datasets))})"
+            params.extend(datasets)
+        with self._connect() as connection:
+            return [row[0] for row in connection.execute(query + " ORDER BY ticker", params)]
+
+    def missing_tickers(self, tickers: Iterable[str]) -> list[str]:
+        """The given tickers that have nothing cached, in input order."""
+        cached = set(self.tickers())
+        return [ticker for ticker in dict.fromkeys(t.upper() for t in tickers) if ticker not in cached]
+
+    def total_size(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COALESCE(SUM(size), 0) FROM datasets").fetchone()[0]
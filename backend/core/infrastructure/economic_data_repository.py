@@ -1,24 +1,170 @@
+"""
+Macro and market inputs for vetting: FRED series and the S&P 500 trend.
+
+Series are stored under ``ECONOMIC_CACHE_DIR`` as Arrow files and topped up
+with only the observations newer than the last stored date, at most once per
+``SERIES_REFRESH_INTERVAL``. ``get_market_context`` combines them into one
+``MarketContext`` snapshot that is memoized for the whole process, so a batch
+of vettings shares a single set of lookups.
+"""
+
 import os
-from fredapi import Fred
+import threading
+from datetime import datetime, timedelta
+from typing import Callable
+
+import pandas as pd
+import pyarrow.feather as feather
 import yfinance as yf
+from fredapi import Fred
+
+from backend.logger import logger
+from ..entities.models import MarketContext
+from .file_utils import atomic_write, file_lock
+
+ECONOMIC_CACHE_DIR = "./data/cache/economic_data"
+SERIES_REFRESH_INTERVAL = timedelta(hours=12) # None of these inputs change more than daily
+MARKET_CONTEXT_TTL = timedelta(hours=1)
+MARKET_INDEX = "^GSPC"
+MARKET_HISTORY_PERIOD = "1y"
+MARKET_HISTORY_WINDOW = pd.DateOffset(years=1)
+GDP_SERIES = "GDPC1"
+INTEREST_RATE_SERIES = "FEDFUNDS"
+
+# Process-wide snapshot shared by every repository instance
+_market_context: MarketContext | None = None
+_market_context_lock = threading.Lock()
+
+def _series_path(name: str) -> str:
+    # "^GSPC" is not a friendly file name
+    return os.path.join(ECONOMIC_CACHE_DIR, f"{name.lstrip('^')}.arrow")
+
+def _read_stored(name: str) -> pd.DataFrame | None:
+    path = _series_path(name)
+    if not os.path.exists(path):
+        return None
+    try:
+        return feather.read_feather(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Error reading stored series {name}: {e}")
+        return None
+
+def _is_current(name: str, max_age: timedelta) -> bool:
+    path = _series_path(name)
+    return os.path.exists(path) and datetime.now() - datetime.fromtimestamp(os.path.getmtime(path)) < max_age
+
+def _append_observations(stored: pd.DataFrame | None, new: pd.DataFrame, window: pd.DateOffset | None = None) -> pd.DataFrame:
+    """Append ``new`` rows to ``stored``, letting re-fetched dates win (revisions), optionally trimmed to ``window``."""
+    if stored is None or stored.empty:
+        merged = new
+    elif new.empty:
+        merged = stored
+    else:
+        if isinstance(new.index, pd.DatetimeIndex) and stored.index.tz != new.index.tz:
+            stored = stored.tz_convert(new.index.tz) if stored.index.tz is not None else stored.tz_localize(new.index.tz)
+        merged = pd.concat([stored, new])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    if window is not None and not merged.empty:
+        merged = merged[merged.index > merged.index[-1] - window]
+    return merged
+
+def _load_series(
+    name: str,
+    fetch_all: Callable[[], pd.DataFrame],
+    fetch_since: Callable[[pd.Timestamp], pd.DataFrame],
+    window: pd.DateOffset | None = None,
+    max_age: timedelta | None = None,
+) -> pd.DataFrame:
+    """
+    Stored observations for ``name``, topped up from the source when the file is
+    older than ``max_age`` (default ``SERIES_REFRESH_INTERVAL``). Falls back to
+    the stored copy if the source cannot be reached.
+    """
+    max_age = SERIES_REFRESH_INTERVAL if max_age is None else max_age
+    if _is_current(name, max_age):
+        stored = _read_stored(name)
+        if stored is not None:
+            return stored
+    with file_lock(os.path.join(ECONOMIC_CACHE_DIR, ".locks", f"{name.lstrip('^')}.lock")):
+        stored = _read_stored(name)
+        if stored is not None and _is_current(name, max_age):
+            return stored
+        try:
+            # Start at the last stored date so a revised or partial last observation is replaced
+            new = fetch_all() if stored is None or stored.empty else fetch_since(stored.index[-1])
+        except Exception as e:
+            if stored is None:
+                raise
+            logger.warning(f"Could not update {name}, using stored observations: {e}")
+            return stored
+        merged = _append_observations(stored, new, window)
+        with atomic_write(_series_path(name), "wb") as f:
+            feather.write_feather(merged, f, compression="zstd")
+        logger.info(f"Stored {len(merged) - (0 if stored is None else len(stored))} new observation(s) for {name}")
+        return merged
 
 class EconomicDataRepository:
     def __init__(self):
-        self.fred = Fred(api_key=os.environ.get("FRED_API_KEY"))
+        self._fred = None
+
+    @property
+    def fred(self) -> Fred:
+        # Created on first use so that cached lookups do not need an API key
+        if self._fred is None:
+            self._fred = Fred(api_key=os.environ.get("FRED_API_KEY"))
+        return self._fred
+
+    def get_fred_series(self, series_id: str) -> pd.Series:
+        frame = _load_series(
+            series_id,
+            lambda: self.fred.get_series(series_id).to_frame("value"),
+            lambda last: self.fred.get_series(series_id, observation_start=last).to_frame("value"),
+        )
+        return frame["value"]
+
+    def get_index_history(self, symbol: str = MARKET_INDEX, max_age: timedelta | None = None) -> pd.DataFrame:
+        """Daily bars for an index; pass a short ``max_age`` intraday to pick up the current session's bar."""
+        ticker = yf.Ticker(symbol)
+        return _load_series(
+            symbol,
+            lambda: ticker.history(period=MARKET_HISTORY_PERIOD),
+            lambda last: ticker.history(start=last.date()),
+            window=MARKET_HISTORY_WINDOW,
+            max_age=max_age,
+        )
 
     def get_gdp_growth(self):
-        gdp_data = self.fred.get_series('GDPC1')
+        gdp_data = self.get_fred_series(GDP_SERIES)
         gdp_growth = gdp_data.pct_change().iloc[-1] * 100
         return gdp_growth
 
     def get_interest_rates(self):
-        interest_rate_data = self.fred.get_series('FEDFUNDS')
+        interest_rate_data = self.get_fred_series(INTEREST_RATE_SERIES)
         return interest_rate_data.iloc[-1]
 
     def get_market_direction(self):
         # Use S&P 500 as a proxy for market direction
-        market_data = yf.Ticker("^GSPC").history(period="1y")
+        market_data = self.get_index_history(MARKET_INDEX)
         # Simple check: is the 50-day moving average above the 200-day?
         ma50 = market_data['Close'].rolling(window=50).mean().iloc[-1]
         ma200 = market_data['Close'].rolling(window=200).mean().iloc[-1]
         return "Uptrend" if ma50 > ma200 else "Downtrend"
+
+    def get_market_context(self) -> MarketContext:
+        """The process-wide macro snapshot, rebuilt once it is older than ``MARKET_CONTEXT_TTL``."""
+        global _market_context
+        with _market_context_lock:
+            if _market_context is None or datetime.now() - _market_context.as_of >= MARKET_CONTEXT_TTL:
+                _market_context = MarketContext(
+                    gdp_growth=float(self.get_gdp_growth()),
+                    interest_rate=float(self.get_interest_rates()),
+                    market_direction=self.get_market_direction(),
+                    as_of=datetime.now(),
+                )
+            return _market_context
+
+def clear_market_context():
+    """Drop the memoized snapshot so the next ``get_market_context`` rebuilds it."""
+    global _market_context
+    with _market_context_lock:
+        _market_context = None
@@ -0,0 +1,151 @@
+"""
+Ticker x quarter x line-item panel of quarterly statement figures.
+
+Each ticker gets ``PANEL_QUARTERS`` rows, newest quarter first, aligned on
+its own fiscal calendar and padded with NaN. ``LINE_ITEMS`` fixes the order of
+the line items. Every item is a ``(tickers, quarters)`` float array, so metrics
+can be computed for the whole universe with array operations.
+
+The panel persists as one uncompressed Arrow IPC file in long form (one row
+per ticker and quarter). ``FundamentalsPanel.load`` memory-maps it, and
+the item arrays are zero-copy views of the mapped file. ``sources`` keeps the
+checksum of the statement each ticker's rows were parsed from, so a scan only
+rebuilds the rows whose statements changed.
+"""
+
+import json
+import os
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from .file_utils import atomic_write
+
+FUNDAMENTALS_PANEL_PATH = "./data/cache/fundamentals_panel.arrow"
+PANEL_QUARTERS = 8
+LINE_ITEMS = (
+    "Diluted EPS",
+    "Basic EPS",
+    "Total Revenue",
+    "Gross Profit",
+    "Operating Income",
+    "Net Income",
+)
+_METADATA_KEY = b"sources"
+
+
+def _quarter_rows(frame) -> tuple[np.ndarray, np.ndarray]:
+    """``(periods, values)`` of one quarterly statement: newest first, padded to ``PANEL_QUARTERS``."""
+    periods = np.full(PANEL_QUARTERS, np.datetime64("NaT"), dtype="datetime64[ns]")
+    values = np.full((PANEL_QUARTERS, len(LINE_ITEMS)), np.nan)
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return periods, values
+    columns = pd.to_datetime(frame.columns, errors="coerce")
+    order = [i for i in np.argsort(columns)[::-1] if not pd.isna(columns[i])][:PANEL_QUARTERS]
+    periods[:len(order)] = columns[order].to_numpy(dtype="datetime64[ns]")
+    for item_position, item in enumerate(LINE_ITEMS):
+        if item in frame.index:
+            row = pd.to_numeric(frame.loc[item].iloc[order], errors="coerce")
+            values[:len(order), item_position] = row.to_numpy(dtype="float64")
+    return periods, values
+
+
+def _column_view(table: pa.Table, name: str) -> np.ndarray:
+    """Zero-copy view of a single-chunk column; a file without rows has no chunk at all."""
+    column = table.column(name)
+    if column.num_chunks == 0:
+        return np.empty(0, dtype=column.type.to_pandas_dtype())
+    return column.chunk(0).to_numpy(zero_copy_only=True)
+
+
+class FundamentalsPanel:
+    def __init__(
+        self,
+        tickers: list[str],
+        periods: np.ndarray,
+        items: Mapping[str, np.ndarray],
+        sources: Mapping[str, str | None] | None = None,
+    ):
+        self.tickers = list(tickers)
+        self.periods = periods # (tickers, quarters) datetime64
+        self.items = dict(items) # line item -> (tickers, quarters) float64
+        self.sources = dict(sources or {})
+        self._positions = {ticker: position for position, ticker in enumerate(self.tickers)}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._positions
+
+    @classmethod
+    def from_bundles(cls, bundles: Mapping[str, dict], sources: Mapping[str, str | None] | None = None):
+        """Parse the ``quarterly_financials`` frame of each bundle into panel rows."""
+        tickers = list(bundles)
+        periods = np.full((len(tickers), PANEL_QUARTERS), np.datetime64("NaT"), dtype="datetime64[ns]")
+        values = np.full((len(tickers), PANEL_QUARTERS, len(LINE_ITEMS)), np.nan)
+        for position, ticker in enumerate(tickers):
+            periods[position], values[position] = _quarter_rows((bundles[ticker] or {}).get("quarterly_financials"))
+        items = {item: values[:, :, i] for i, item in enumerate(LINE_ITEMS)}
+        return cls(tickers, periods, items, sources)
+
+    def item(self, name: str) -> np.ndarray:
+        return self.items[name]
+
+    def as_array(self) -> np.ndarray:
+        """The panel as one ``(tickers, quarters, LINE_ITEMS)`` array (a copy)."""
+        return np.stack([self.items[item] for item in LINE_ITEMS], axis=-1)
+
+    def select(self, tickers: Iterable[str]) -> "FundamentalsPanel":
+        """Rows for ``tickers`` that are in the panel, in the given order."""
+        tickers = [ticker for ticker in tickers if ticker in self._positions]
+        rows = np.array([self._positions[ticker] for ticker in tickers], dtype=int)
+        return FundamentalsPanel(
+            tickers,
+            self.periods[rows],
+            {item: values[rows] for item, values in self.items.items()},
+            {ticker: self.sources.get(ticker) for ticker in tickers},
+        )
+
+    def merge(self, other: "FundamentalsPanel") -> "FundamentalsPanel":
+        """This panel with ``other``'s rows added or replacing existing ones."""
+        kept = [ticker for ticker in self.tickers if ticker not in other]
+        kept_panel = self.select(kept)
+        return FundamentalsPanel(
+            kept + other.tickers,
+            np.concatenate([kept_panel.periods, other.periods]),
+            {item: np.concatenate([kept_panel.items[item], other.items[item]]) for item in LINE_ITEMS},
+            {**kept_panel.sources, **other.sources},
+        )
+
+    def save(self, path: str = FUNDAMENTALS_PANEL_PATH):
+        count = len(self.tickers) * PANEL_QUARTERS
+        columns = {
+            "ticker": pa.array(np.repeat(np.array(self.tickers, dtype=object), PANEL_QUARTERS), type=pa.string()),
+            "period": pa.array(self.periods.reshape(count)),
+        }
+        for item in LINE_ITEMS:
+            columns[item] = pa.array(np.ascontiguousarray(self.items[item]).reshape(count))
+        table = pa.table(columns).replace_schema_metadata({_METADATA_KEY: json.dumps(self.sources)})
+        with atomic_write(path, "wb") as f:
+            with ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+
+    @classmethod
+    def load(cls, path: str = FUNDAMENTALS_PANEL_PATH) -> "FundamentalsPanel | None":
+        """Memory-map a saved panel; item arrays are read-only views of the file. None if there is none."""
+        if not os.path.exists(path):
+            return None
+        table = ipc.open_file(pa.memory_map(path, "r")).read_all().combine_chunks()
+        count = table.num_rows // PANEL_QUARTERS
+        tickers = table.column("ticker").to_numpy(zero_copy_only=False)[::PANEL_QUARTERS].tolist()
+        periods = table.column("period").to_numpy(zero_copy_only=False).astype("datetime64[ns]").reshape(count, PANEL_QUARTERS)
+        items = {
+            item: _column_view(table, item).reshape(count, PANEL_QUARTERS)
+            for item in LINE_ITEMS
+        }
+        sources = json.loads((table.schema.metadata or {}).get(_METADATA_KEY, b"{}"))
+        return cls(tickers, periods, items, sources)
@@ -0,0 +1,216 @@
+"""
+In-process caching primitives used in front of the on-disk Yahoo Finance cache.
+
+``BundleLRUCache`` keeps decoded ticker bundles in memory and evicts the least
+recently used ones once their estimated size exceeds a byte budget. Frames a
+cached ``LazyDict`` loads later are added to its entry's size as they load.
+``SingleFlight`` coalesces concurrent calls for the same key so that only one
+of them does the work while the others wait for its result. ``LazyDict`` is
+a mapping whose values for some keys are produced on first access, so a
+bundle can be cached with only the datasets that were asked for loaded.
+"""
+
+import json
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Rough in-memory footprint of a bundle value; DataFrames are measured deeply."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, LazyDict):
+        return estimate_nbytes(value.loaded())
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class LazyDict(MutableMapping):
+    """
+    Dict whose ``lazy_keys`` are filled in by ``loader(key)`` the first time
+    they are read. Iteration, ``in`` and ``len`` do not trigger loading;
+    ``items()``/``values()`` and ``dict(...)`` do. Safe to share between threads.
+    ``on_load``, if set, is called with each value once it has been loaded.
+    """
+
+    def __init__(self, data: dict, loader: Callable[[str], Any], lazy_keys: Iterable[str] = ()):
+        self._data = dict(data)
+        self._loader = loader
+        self._pending = [key for key in dict.fromkeys(lazy_keys) if key not in self._data]
+        self._lock = threading.Lock()
+        self.on_load: Callable[[Any], None] | None = None
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            loaded = False
+            with self._lock:
+                if key in self._pending:
+                    self._data[key] = self._loader(key)
+                    self._pending.remove(key)
+                    loaded = True
+            if loaded and self.on_load is not None:
+                self.on_load(self._data[key])
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            if key in self._pending:
+                self._pending.remove(key)
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key in self._pending:
+                self._pending.remove(key)
+            else:
+                del self._data[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._data or key in self._pending
+
+    def __iter__(self):
+        return iter(list(self._data) + list(self._pending))
+
+    def __len__(self) -> int:
+        return len(self._data) + len(self._pending)
+
+    def __repr__(self) -> str:
+        return f"LazyDict({self._data!r}, pending={self._pending!r})"
+
+    def loaded(self) -> dict:
+        """The values loaded so far."""
+        return dict(self._data)
+
+    def copy(self) -> "LazyDict":
+        """Shallow copy; keys not yet loaded stay lazy in the copy."""
+        with self._lock:
+            return LazyDict(self._data, self._loader, self._pending)
+
+
+class BundleLRUCache:
+    """Thread-safe LRU keyed by ticker, bounded by the estimated size of its entries."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key.upper() in self._entries
+
+    def get(self, key: str):
+        key = key.upper()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: Any):
+        key = key.upper()
+        size = estimate_nbytes(value)
+        for lazy in _lazy_dicts(value):
+            lazy.on_load = partial(self._grow, key, value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._nbytes += size
+            self._evict()
+
+    def _grow(self, key: str, value: Any, loaded: Any):
+        """Count a value a cached ``LazyDict`` has just loaded against the entry it belongs to."""
+        size = estimate_nbytes(loaded)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not value:
+                return # Evicted or replaced since
+            self._entries[key] = (value, entry[1] + size)
+            self._nbytes += size
+            if entry[1] + size > self.max_bytes:
+                self._discard(key)
+            self._evict()
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._nbytes -= evicted_size
+
+    def pop(self, key: str):
+        with self._lock:
+            self._discard(key.upper())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[1]
+
+
+def _lazy_dicts(value: Any) -> list[LazyDict]:
+    if isinstance(value, LazyDict):
+        return [value]
+    if isinstance(value, (tuple, list)):
+        return [lazy for item in value for lazy in _lazy_dicts(item)]
+    return []
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
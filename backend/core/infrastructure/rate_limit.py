@@ -0,0 +1,42 @@
+"""
+Request budget for calls to rate-limited upstream APIs such as Yahoo Finance.
+
+``RequestBudget`` allows at most ``max_requests`` calls per sliding ``period``
+(seconds) across all threads sharing it; ``acquire`` blocks until the call
+fits in the budget.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+
+class RequestBudget:
+    def __init__(
+        self,
+        max_requests: int,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if max_requests < 1:
+            raise ValueError("max_requests must be at least 1")
+        self.max_requests = max_requests
+        self.period = period
+        self._clock = clock
+        self._sleep = sleep
+        self._calls: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_requests:
+                    self._calls.append(now)
+                    return
+                wait = self.period - (now - self._calls[0])
+            self._sleep(wait)
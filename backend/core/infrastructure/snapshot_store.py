@@ -0,0 +1,173 @@
+"""
+Append-only, content-addressed store of daily dataset snapshots.
+
+Each version is keyed by ``(key, dataset, as_of)``, with ``as_of`` a calendar
+day, and points at a blob named by the checksum of its content::
+
+    <root>/objects/<checksum[:2]>/<checksum>   one file per distinct content
+    <root>/snapshots.sqlite                      (key, dataset, as_of) -> checksum
+
+A put whose content matches the version already in effect on that day
+records nothing, so unchanged data costs no disk. Several puts on one day
+keep only the last, and a blob no version references any more is deleted.
+"As of day D" is a single indexed lookup for the newest version on or
+before D. ``prune`` drops versions that were superseded before a cutoff.
+"""
+
+import hashlib
+import os
+import sqlite3
+from contextlib import closing, contextmanager, suppress
+from datetime import date, datetime
+from typing import Iterable
+
+from .file_utils import atomic_write, file_lock
+
+INDEX_FILE = "snapshots.sqlite"
+OBJECTS_DIR = "objects"
+LOCK_FILE = ".lock"
+SQLITE_MAX_PARAMS = 500 # Keys per IN (...) clause in bulk reads
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    as_of TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (key, dataset, as_of)
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_checksum ON snapshots (checksum);
+"""
+
+
+def content_checksum(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _day(as_of: date) -> str:
+    return (as_of.date() if isinstance(as_of, datetime) else as_of).isoformat()
+
+
+class SnapshotStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    @contextmanager
+    def _connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        with closing(sqlite3.connect(os.path.join(self.root, INDEX_FILE), timeout=30)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            with connection:
+                yield connection
+
+    def _lock(self):
+        # Serializes writers, so a blob is never collected while a put is about to reference it
+        return file_lock(os.path.join(self.root, LOCK_FILE))
+
+    def _object_path(self, checksum: str) -> str:
+        return os.path.join(self.root, OBJECTS_DIR, checksum[:2], checksum)
+
+    def _read_object(self, checksum: str) -> bytes:
+        with open(self._object_path(checksum), "rb") as f:
+            return f.read()
+
+    def _collect(self, connection: sqlite3.Connection, checksums: Iterable[str]) -> int:
+        """Delete the blobs of ``checksums`` that no version references any more."""
+        removed = 0
+        for checksum in set(checksums):
+            if connection.execute("SELECT 1 FROM snapshots WHERE checksum = ? LIMIT 1", (checksum,)).fetchone():
+                continue
+            with suppress(FileNotFoundError):
+                os.remove(self._object_path(checksum))
+                removed += 1
+        return removed
+
+    def put(self, key: str, dataset: str, content: bytes, as_of: date) -> bool:
+        """Record ``content`` as the version of ``(key, dataset)`` on ``as_of``. Returns False when it is unchanged."""
+        checksum = content_checksum(content)
+        day = _day(as_of)
+        with self._lock(), self._connect() as connection:
+            rows = connection.execute(
+                "SELECT as_of, checksum FROM snapshots WHERE key = ? AND dataset = ? AND as_of <= ? "
+                "ORDER BY as_of DESC LIMIT 2",
+                (key, dataset, day),
+            ).fetchall()
+            same_day = rows.pop(0)[1] if rows and rows[0][0] == day else None
+            previous = rows[0][1] if rows else None
+            if checksum == same_day:
+                return False
+            if checksum == previous:
+                if same_day is not None:
+                    # Back to the content already in effect: the day's own version is redundant
+                    connection.execute(
+                        "DELETE FROM snapshots WHERE key = ? AND dataset = ? AND as_of = ?", (key, dataset, day),
+                    )
+                    self._collect(connection, [same_day])
+                return False
+            path = self._object_path(checksum)
+            if not os.path.exists(path):
+                with atomic_write(path, "wb") as f:
+                    f.write(content)
+            connection.execute(
+                "INSERT OR REPLACE INTO snapshots (key, dataset, as_of, checksum, size) VALUES (?, ?, ?, ?, ?)",
+                (key, dataset, day, checksum, len(content)),
+            )
+            if same_day is not None:
+                self._collect(connection, [same_day])
+            return True
+
+    def get(self, key: str, dataset: str, as_of: date) -> bytes | None:
+        """The content of ``(key, dataset)`` as it was on ``as_of``, or None if nothing was recorded by then."""
+        return self.get_many([key], [dataset], as_of).get((key, dataset))
+
+    def get_many(self, keys: Iterable[str], datasets: Iterable[str], as_of: date) -> dict[tuple[str, str], bytes]:
+        """Bulk ``get``: ``{(key, dataset): content}`` for the pairs with a version on or before ``as_of``."""
+        keys, datasets = list(dict.fromkeys(keys)), list(dict.fromkeys(datasets))
+        if not keys or not datasets:
+            return {}
+        rows = []
+        with self._connect() as connection:
+            for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+                chunk = keys[start:start + SQLITE_MAX_PARAMS]
+                # SQLite returns the bare columns of the row holding MAX(as_of)
+                rows.extend(connection.execute(
+                    f"SELECT key, dataset, checksum, MAX(as_of) FROM snapshots "
+                    f"WHERE as_of <= ? AND key IN ({', '.join('?' * len(chunk))}) "
+                    f"AND dataset IN ({', '.join('?' * len(datasets))}) GROUP BY key, dataset",
+                    [_day(as_of), *chunk, *datasets],
+                ).fetchall())
+        return {(key, dataset): self._read_object(checksum) for key, dataset, checksum, _ in rows}
+
+    def versions(self, key: str, dataset: str) -> list[dict]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT as_of, checksum, size FROM snapshots WHERE key = ? AND dataset = ? ORDER BY as_of",
+                (key, dataset),
+            ).fetchall()
+        return [{"as_of": date.fromisoformat(d), "checksum": c, "size": s} for d, c, s in rows]
+
+    def prune(self, before: date) -> int:
+        """
+        Drop the versions superseded before ``before``, keeping the one in effect
+        on that day so reads as of ``before`` or later are unchanged. Returns the
+        number of blobs deleted.
+        """
+        day = _day(before)
+        with self._lock(), self._connect() as connection:
+            doomed = connection.execute(
+                "SELECT s.rowid, s.checksum FROM snapshots s WHERE s.as_of < ? AND EXISTS ("
+                "SELECT 1 FROM snapshots n WHERE n.key = s.key AND n.dataset = s.dataset "
+                "AND n.as_of > s.as_of AND n.as_of <= ?)",
+                (day, day),
+            ).fetchall()
+            connection.executemany("DELETE FROM snapshots WHERE rowid = ?", [(rowid,) for rowid, _ in doomed])
+            return self._collect(connection, [checksum for _, checksum in doomed])
+
+    def total_size(self) -> int:
+        """Bytes held in blobs, counting shared content once."""
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT checksum, size FROM snapshots)"
+            ).fetchone()[0]
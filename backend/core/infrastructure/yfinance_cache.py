@@ -0,0 +1,455 @@
+"""
+Columnar on-disk cache for Yahoo Finance ticker bundles.
+
+Every ticker gets its own directory under ``YFINANCE_CACHE_DIR``::
+
+    <TICKER>/meta.json.gz      per-dataset fetch times, ``info`` and scalar fields
+    <TICKER>/<dataset>.arrow   one typed, zstd-compressed Arrow IPC file per DataFrame
+
+Arrow IPC (Feather v2) keeps the dtypes and index of each frame and decodes
+without any text parsing; with ``ARROW_COMPRESSION = None`` the files are
+memory-mapped on read. Statement frames keep yfinance's orientation (line
+items by period) with their period-end columns stored as ISO dates, since
+Arrow needs string column names.
+
+Decoding is transparent: Arrow records its own codec, an uncompressed
+``meta.json`` (written by earlier versions or with ``META_COMPRESSION = None``)
+is read just like the gzipped one, and ``<dataset>.parquet`` files from the
+first columnar layout (statements stored transposed) are still understood.
+
+``manifest.sqlite`` in the cache directory indexes every entry (see
+``cache_manifest``) and is updated on each write.
+
+Each write also files the datasets it wrote in ``.snapshots`` (see
+``snapshot_store``), one version per dataset and fetch day, so
+``read_snapshots`` can replay what the cache held on any past day. Price
+history changes daily and would never deduplicate, so instead of versions
+it goes to an append-only bar log per ticker, ``.snapshots/history/<TICKER>.arrow``,
+keyed by bar date; a past day's history is the log's ``HISTORY_WINDOW`` of
+bars up to that day.
+
+Files are replaced atomically, so concurrent readers (including other worker
+processes) never see a partial write. Writers that read-modify-write an entry
+hold ``ticker_lock`` for it.
+"""
+
+import os
+import json
+import glob
+import gzip
+import shutil
+import sqlite3
+from contextlib import nullcontext, suppress
+from io import BytesIO, StringIO
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from backend.logger import logger
+from .cache_manifest import MANIFEST_FILE, CacheManifest
+from .file_utils import atomic_write, file_lock
+from .memory_cache import LazyDict
+from .snapshot_store import SnapshotStore
+
+YFINANCE_CACHE_DIR = "./data/cache/yfinance_data"
+
+STATEMENT_DATASETS = ("financials", "balance_sheet", "cashflow", "quarterly_financials")
+FRAME_DATASETS = STATEMENT_DATASETS + ("insider_transactions", "history")
+# "info" covers the info dict and the scalar fields derived from it
+DATASETS = ("info",) + FRAME_DATASETS
+
+META_FILE = "meta.json"
+ARROW_COMPRESSION = "zstd" # "zstd", "lz4" or None
+META_COMPRESSION = "gzip" # "gzip" or None
+META_VERSION = 3
+LOCK_DIR = ".locks"
+EXPIRED_AT = datetime.min # Fetch time of a dataset forced to refresh: "never fetched"
+SNAPSHOT_DIR = ".snapshots"
+SNAPSHOT_RETENTION = timedelta(days=400) # Versions superseded longer ago than this are pruned
+HISTORY_LOG_DIR = "history"
+HISTORY_WINDOW = timedelta(days=366) # Bars the cache holds, matching the repository's "1y" history period
+
+
+def get_ticker_dir(ticker: str) -> str:
+    return os.path.join(YFINANCE_CACHE_DIR, ticker.upper())
+
+
+def get_manifest() -> CacheManifest:
+    return CacheManifest(os.path.join(YFINANCE_CACHE_DIR, MANIFEST_FILE))
+
+
+def get_snapshot_store() -> SnapshotStore:
+    return SnapshotStore(os.path.join(YFINANCE_CACHE_DIR, SNAPSHOT_DIR))
+
+
+def _get_history_log_path(ticker: str) -> str:
+    return os.path.join(YFINANCE_CACHE_DIR, SNAPSHOT_DIR, HISTORY_LOG_DIR, f"{ticker.upper()}.arrow")
+
+
+def ticker_lock(ticker: str):
+    """Exclusive cross-process lock for one ticker's cache entry."""
+    return file_lock(os.path.join(YFINANCE_CACHE_DIR, LOCK_DIR, f"{ticker.upper()}.lock"))
+
+
+def _get_dataset_path(ticker: str, dataset: str, suffix: str = ".arrow") -> str:
+    return os.path.join(get_ticker_dir(ticker), f"{dataset}{suffix}")
+
+
+def _write_frame(frame: pd.DataFrame, dataset: str, path: str):
+    if dataset in STATEMENT_DATASETS and isinstance(frame.columns, pd.DatetimeIndex):
+        frame.columns = frame.columns.strftime("%Y-%m-%d")
+    frame.columns = frame.columns.map(str)
+    with atomic_write(path, "wb") as f:
+        feather.write_feather(frame, f, compression=ARROW_COMPRESSION or "uncompressed")
+
+
+def _decode_frame(frame: pd.DataFrame, dataset: str) -> pd.DataFrame:
+    if dataset in STATEMENT_DATASETS and len(frame.columns):
+        periods = pd.to_datetime(frame.columns, format="%Y-%m-%d", errors="coerce")
+        if not periods.isna().any():
+            frame.columns = periods
+    return frame
+
+
+def _read_frame(ticker: str, dataset: str) -> pd.DataFrame:
+    path = _get_dataset_path(ticker, dataset)
+    if os.path.exists(path):
+        return _decode_frame(feather.read_feather(path, memory_map=True), dataset)
+    path = _get_dataset_path(ticker, dataset, suffix=".parquet")
+    if os.path.exists(path):
+        frame = pd.read_parquet(path)
+        return frame.T if dataset in STATEMENT_DATASETS else frame
+    return pd.DataFrame()
+
+
+def _meta_paths(ticker: str) -> tuple[str, str]:
+    """``(compressed, plain)`` meta file paths for a ticker."""
+    plain = os.path.join(get_ticker_dir(ticker), META_FILE)
+    return f"{plain}.gz", plain
+
+
+def has_bundle(ticker: str) -> bool:
+    return any(os.path.exists(path) for path in _meta_paths(ticker))
+
+
+def _read_meta(ticker: str) -> dict:
+    compressed, plain = _meta_paths(ticker)
+    if os.path.exists(compressed):
+        with open(compressed, "rb") as f:
+            meta = json.loads(gzip.decompress(f.read()))
+    else:
+        with open(plain, "r") as f:
+            meta = json.load(f)
+    if "fetched" not in meta:
+        # Version 1 entries carry a single timestamp for the whole bundle
+        meta["fetched"] = dict.fromkeys(DATASETS, meta["timestamp"])
+    return meta
+
+
+def _existing_meta_path(ticker: str) -> str:
+    compressed, plain = _meta_paths(ticker)
+    return compressed if os.path.exists(compressed) else plain
+
+
+def _write_meta(ticker: str, meta: dict) -> str:
+    compressed, plain = _meta_paths(ticker)
+    path, other = (compressed, plain) if META_COMPRESSION == "gzip" else (plain, compressed)
+    body = json.dumps(meta, separators=(",", ":")).encode()
+    with atomic_write(path, "wb") as f:
+        f.write(gzip.compress(body, mtime=0) if path == compressed else body)
+    with suppress(FileNotFoundError):
+        os.remove(other)
+    return path
+
+
+def _record_in_manifest(ticker: str, fetched: dict[str, str], datasets: Iterable[str]):
+    """Index the written datasets; the "info" row tracks the meta file, which every write replaces."""
+    entries = [("info", datetime.fromisoformat(fetched["info"]), _existing_meta_path(ticker))]
+    for dataset in datasets:
+        if dataset in FRAME_DATASETS:
+            entries.append((dataset, datetime.fromisoformat(fetched[dataset]), _get_dataset_path(ticker, dataset)))
+    try:
+        get_manifest().record(ticker, entries)
+    except (sqlite3.Error, OSError) as e:
+        # The manifest is an index only; the cache entry itself is complete
+        logger.warning(f"Could not update cache manifest for {ticker}: {e}")
+
+
+def _encode_scalars(scalars: dict) -> bytes:
+    return gzip.compress(json.dumps(scalars, sort_keys=True, separators=(",", ":")).encode(), mtime=0)
+
+
+def _bar_dates(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """The session date of each bar, in the bars' own time zone."""
+    return (index if index.tz is None else index.tz_localize(None)).normalize()
+
+
+def _align_bars(frame: pd.DataFrame, like: pd.DatetimeIndex) -> pd.DataFrame:
+    """``frame`` with its bar index expressed in the time zone of ``like``, keeping wall-clock times."""
+    index = frame.index
+    if index.tz is not None:
+        index = index.tz_convert(like.tz) if like.tz is not None else index.tz_localize(None)
+    elif like.tz is not None:
+        index = index.tz_localize(like.tz, ambiguous="NaT", nonexistent="NaT")
+    return frame.set_axis(index)
+
+
+def _read_history_log(ticker: str) -> pd.DataFrame:
+    path = _get_history_log_path(ticker)
+    return feather.read_feather(path) if os.path.exists(path) else pd.DataFrame()
+
+
+def _append_history(ticker: str, history: pd.DataFrame):
+    """Merge ``history`` into the ticker's bar log; a bar replaces the logged one of the same date."""
+    if history.empty or not isinstance(history.index, pd.DatetimeIndex):
+        return
+    path = _get_history_log_path(ticker)
+    with file_lock(f"{path}.lock"):
+        log = _read_history_log(ticker)
+        if not log.empty:
+            history = pd.concat([_align_bars(log, history.index), history])
+            history = history[~_bar_dates(history.index).duplicated(keep="last")].sort_index()
+            if history.equals(log):
+                return
+        _write_frame(history.copy(), "history", path)
+
+
+def _slice_history(history: pd.DataFrame, as_of: date) -> pd.DataFrame:
+    """The ``HISTORY_WINDOW`` of bars up to and including ``as_of``."""
+    if history.empty:
+        return history
+    dates = _bar_dates(history.index)
+    end = pd.Timestamp(as_of)
+    return history[(dates <= end) & (dates > end - HISTORY_WINDOW)]
+
+
+def _snapshot(ticker: str, scalars: dict, fetched: dict[str, str], datasets: Iterable[str]):
+    """File the written datasets as the ticker's versions for their fetch day; unchanged content is not stored again."""
+    store = get_snapshot_store()
+    try:
+        for dataset in datasets:
+            if dataset == "history":
+                _append_history(ticker, _read_frame(ticker, dataset))
+                continue
+            if dataset in FRAME_DATASETS:
+                with open(_get_dataset_path(ticker, dataset), "rb") as f:
+                    content = f.read()
+            elif dataset == "info":
+                content = _encode_scalars(scalars)
+            else:
+                continue
+            store.put(ticker.upper(), dataset, content, datetime.fromisoformat(fetched[dataset]))
+    except (sqlite3.Error, OSError) as e:
+        # Snapshots are a history only; the cache entry itself is complete
+        logger.warning(f"Could not snapshot cache for {ticker}: {e}")
+
+
+def write_bundle(
+    ticker: str,
+    data: dict,
+    fetched: dict[str, datetime] | None = None,
+    datasets: Iterable[str] | None = None,
+):
+    """
+    Persist a ticker bundle. DataFrame values go to Arrow files, the rest to the meta file.
+    Callers updating an existing entry should hold ``ticker_lock``.
+
+    ``fetched`` maps datasets to their fetch time (default: now for every
+    dataset written). With ``datasets`` only those Arrow files are
+    rewritten; the other entries keep their files and fetch times.
+    """
+    ticker_dir = get_ticker_dir(ticker)
+    os.makedirs(ticker_dir, exist_ok=True)
+    datasets = DATASETS if datasets is None else tuple(datasets)
+    now = datetime.now()
+    fetched_times = {}
+    if datasets != DATASETS and has_bundle(ticker):
+        fetched_times.update(_read_meta(ticker)["fetched"])
+    for dataset in datasets:
+        fetched_times[dataset] = ((fetched or {}).get(dataset) or now).isoformat()
+        if dataset in FRAME_DATASETS:
+            frame = data.get(dataset)
+            frame = frame if isinstance(frame, pd.DataFrame) else pd.DataFrame()
+            _write_frame(frame.copy(), dataset, _get_dataset_path(ticker, dataset))
+            with suppress(FileNotFoundError):
+                os.remove(_get_dataset_path(ticker, dataset, suffix=".parquet"))
+    # Iterate keys so that frames a LazyDict has not loaded are not read just to be skipped
+    scalars = {key: data[key] for key in data if key not in FRAME_DATASETS}
+    meta = {"version": META_VERSION, "fetched": fetched_times, "data": scalars}
+    # The meta file goes last: it is what marks the entry as present and fresh
+    _write_meta(ticker, meta)
+    if "info" in fetched_times:
+        _record_in_manifest(ticker, fetched_times, datasets)
+    _snapshot(ticker, scalars, fetched_times, datasets)
+
+
+def read_bundle(ticker: str, datasets: Iterable[str] | None = None) -> tuple[dict[str, datetime], dict] | None:
+    """
+    Load a cached bundle as ``(fetched, data)`` with typed DataFrames, where
+    ``fetched`` maps each dataset to its fetch time. Returns None when the
+    ticker has no columnar entry.
+
+    With ``datasets`` only those frames are read up front and ``data`` is a
+    ``LazyDict`` that reads the other frames from disk when first accessed.
+    """
+    if not has_bundle(ticker):
+        return None
+    meta = _read_meta(ticker)
+    fetched = {dataset: datetime.fromisoformat(value) for dataset, value in meta["fetched"].items()}
+    data = dict(meta["data"])
+    if datasets is None:
+        for dataset in FRAME_DATASETS:
+            data[dataset] = _read_frame(ticker, dataset)
+        return fetched, data
+    for dataset in FRAME_DATASETS:
+        if dataset in datasets:
+            data[dataset] = _read_frame(ticker, dataset)
+    return fetched, LazyDict(data, lambda dataset: _read_frame(ticker, dataset), FRAME_DATASETS)
+
+
+def read_snapshots(
+    tickers: Iterable[str],
+    as_of: date,
+    datasets: Iterable[str] | None = None,
+) -> dict[str, dict | None]:
+    """
+    The bundles as the cache held them on ``as_of``: ``{ticker: data}`` in
+    input order, from each dataset's latest snapshot on or before that day
+    and, for ``history``, the logged bars up to it. Frames without a snapshot
+    are empty; a ticker without an ``info`` snapshot by then maps to None.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    datasets = DATASETS if datasets is None else tuple(datasets)
+    versioned = ("info",) + tuple(d for d in datasets if d not in ("info", "history"))
+    contents = get_snapshot_store().get_many(tickers, versioned, as_of)
+    bundles = {}
+    for ticker in tickers:
+        if (ticker, "info") not in contents:
+            bundles[ticker] = None
+            continue
+        data = json.loads(gzip.decompress(contents[ticker, "info"]))
+        for dataset in FRAME_DATASETS:
+            content = contents.get((ticker, dataset)) if dataset in datasets else None
+            data[dataset] = _decode_frame(feather.read_feather(BytesIO(content)), dataset) if content else pd.DataFrame()
+        if "history" in datasets:
+            data["history"] = _slice_history(_read_history_log(ticker), as_of)
+        bundles[ticker] = data
+    return bundles
+
+
+def prune_snapshots(retention: timedelta = SNAPSHOT_RETENTION) -> int:
+    """
+    Drop snapshot versions superseded more than ``retention`` ago, and logged
+    bars no longer needed to replay a day within it. Returns the number of
+    files deleted.
+    """
+    cutoff = date.today() - retention
+    removed = get_snapshot_store().prune(cutoff)
+    oldest_bar = pd.Timestamp(cutoff) - HISTORY_WINDOW
+    for path in glob.glob(os.path.join(YFINANCE_CACHE_DIR, SNAPSHOT_DIR, HISTORY_LOG_DIR, "*.arrow")):
+        with file_lock(f"{path}.lock"):
+            log = feather.read_feather(path)
+            kept = log[_bar_dates(log.index) > oldest_bar] if isinstance(log.index, pd.DatetimeIndex) else log
+            if kept.empty:
+                os.remove(path)
+                removed += 1
+            elif len(kept) < len(log):
+                _write_frame(kept.copy(), "history", path)
+    return removed
+
+
+def remove_bundle(ticker: str):
+    shutil.rmtree(get_ticker_dir(ticker), ignore_errors=True)
+    get_manifest().remove([ticker])
+
+
+def expire_datasets(tickers: Iterable[str], datasets: Iterable[str] | None = None) -> list[str]:
+    """
+    Bulk expiry: mark ``datasets`` (default: all) of each ticker as never
+    fetched, so the next read refreshes them. Returns the tickers touched.
+    """
+    datasets = DATASETS if datasets is None else tuple(datasets)
+    expired_at = EXPIRED_AT
+    expired = []
+    for ticker in tickers:
+        with ticker_lock(ticker):
+            if not has_bundle(ticker):
+                continue
+            meta = _read_meta(ticker)
+            meta["fetched"].update(dict.fromkeys(datasets, expired_at.isoformat()))
+            _write_meta(ticker, meta)
+        expired.append(ticker.upper())
+    get_manifest().set_fetched(expired, datasets, expired_at)
+    return expired
+
+
+def rebuild_manifest() -> int:
+    """Re-index every cached ticker from the files on disk. Returns the number of tickers indexed."""
+    manifest = get_manifest()
+    manifest.clear()
+    count = 0
+    ticker_dirs = {os.path.dirname(path) for path in glob.glob(os.path.join(YFINANCE_CACHE_DIR, "*", f"{META_FILE}*"))}
+    for ticker_dir in sorted(ticker_dirs):
+        ticker = os.path.basename(ticker_dir)
+        fetched = _read_meta(ticker)["fetched"]
+        datasets = [d for d in FRAME_DATASETS if d in fetched and os.path.exists(_get_dataset_path(ticker, d))]
+        _record_in_manifest(ticker, {**dict.fromkeys(DATASETS, EXPIRED_AT.isoformat()), **fetched}, datasets)
+        count += 1
+    return count
+
+
+# --------------------------------------------------------------------------- #
+#  Legacy indent=4 JSON cache                                                 #
+# --------------------------------------------------------------------------- #
+def get_legacy_file_path(ticker: str) -> str:
+    return os.path.join(YFINANCE_CACHE_DIR, f"{ticker.upper()}.json")
+
+
+def load_legacy_json(path: str) -> tuple[datetime, dict]:
+    """Decode a legacy ``<TICKER>.json`` file, turning the nested to_json() strings into DataFrames."""
+    with open(path, "r") as f:
+        payload = json.load(f)
+    data = dict(payload["data"])
+    for dataset in FRAME_DATASETS:
+        raw = data.get(dataset)
+        if isinstance(raw, str):
+            convert_dates = ["Start Date"] if dataset == "insider_transactions" else True
+            data[dataset] = pd.read_json(StringIO(raw), convert_dates=convert_dates)
+        else:
+            data[dataset] = pd.DataFrame()
+    return datetime.fromisoformat(payload["timestamp"]), data
+
+
+def migrate_legacy_file(ticker: str, remove: bool = True, locked: bool = False) -> bool:
+    """
+    Convert one legacy JSON entry to the columnar layout, keeping its original
+    timestamp. Callers already holding ``ticker_lock`` pass ``locked=True``:
+    ``flock`` locks taken through separate opens conflict even within a process.
+    """
+    path = get_legacy_file_path(ticker)
+    if not os.path.exists(path):
+        return False
+    with nullcontext() if locked else ticker_lock(ticker):
+        if not os.path.exists(path):
+            return False
+        timestamp, data = load_legacy_json(path)
+        write_bundle(ticker, data, fetched=dict.fromkeys(DATASETS, timestamp))
+        if remove:
+            os.remove(path)
+    logger.info(f"Migrated legacy Yahoo Finance cache for {ticker}")
+    return True
+
+
+def migrate_legacy_cache(remove: bool = True) -> list[str]:
+    """One-shot migration of every ``<TICKER>.json`` file in ``YFINANCE_CACHE_DIR``."""
+    migrated = []
+    for path in sorted(glob.glob(os.path.join(YFINANCE_CACHE_DIR, "*.json"))):
+        ticker = os.path.splitext(os.path.basename(path))[0]
+        try:
+            if migrate_legacy_file(ticker, remove=remove):
+                migrated.append(ticker)
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            logger.warning(f"Could not migrate legacy cache for {ticker}: {e}")
+    return migrated
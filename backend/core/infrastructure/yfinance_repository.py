@@ -1,77 +1,490 @@
 import yfinance as yf
 import os
-import json
-from datetime import datetime, timedelta
+from contextlib import suppress
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator
+import pandas as pd
 from ..entities.models import Company
 from backend.logger import logger
+from .memory_cache import BundleLRUCache, SingleFlight
+from .rate_limit import RequestBudget
+from .yfinance_cache import (
+    DATASETS,
+    EXPIRED_AT,
+    FRAME_DATASETS,
+    STATEMENT_DATASETS,
+    YFINANCE_CACHE_DIR,
+    expire_datasets,
+    get_legacy_file_path,
+    get_manifest,
+    has_bundle,
+    migrate_legacy_file,
+    read_bundle,
+    read_snapshots,
+    ticker_lock,
+    write_bundle,
+)
 
-YFINANCE_CACHE_DIR = "./data/cache/yfinance_data"
-CACHE_DURATION_HOURS = 24 # Cache data for 24 hours
+CACHE_DURATION_HOURS = 24 # Default TTL for info and insider transactions
+HISTORY_PERIOD = "1y" # Window of daily bars kept in the cache
+HISTORY_WINDOW = pd.DateOffset(years=1)
+QUARTER_LENGTH = timedelta(days=91)
+FISCAL_YEAR_LENGTH = timedelta(days=365)
+DEFAULT_FETCH_WORKERS = 8 # Concurrent tickers fetched by the bulk API
+MEMORY_CACHE_MAX_BYTES = 256 * 1024 * 1024 # Budget for decoded bundles kept in memory
+ALL_FIELDS = frozenset(DATASETS)
 
-def _get_cache_file_path(ticker: str) -> str:
-    os.makedirs(YFINANCE_CACHE_DIR, exist_ok=True)
-    return os.path.join(YFINANCE_CACHE_DIR, f"{ticker.upper()}.json")
+# Per-dataset TTL policy. A dataset is re-fetched once it is older than its TTL;
+# None means any age is acceptable. Statements past their TTL are still only
+# re-pulled once a new fiscal period could exist (see _new_fiscal_period_possible).
+DEFAULT_DATASET_TTLS = {
+    "info": timedelta(hours=CACHE_DURATION_HOURS),
+    "history": timedelta(hours=1),
+    "insider_transactions": timedelta(hours=CACHE_DURATION_HOURS),
+    **dict.fromkeys(STATEMENT_DATASETS, timedelta(days=7)),
+}
+# Example per-call override for get_all_data(..., max_age=...): fresh price, any-age statements
+FRESH_PRICE_ANY_AGE_STATEMENTS = {
+    "info": timedelta(minutes=15),
+    "history": timedelta(minutes=15),
+    **dict.fromkeys(STATEMENT_DATASETS, None),
+}
 
-def _read_yfinance_cache(ticker: str) -> dict | None:
-    file_path = _get_cache_file_path(ticker)
-    if os.path.exists(file_path):
+# Shared by every repository in the process: decoded bundles stay in memory in
+# front of the disk cache, and at most one fetch per ticker is ever in flight.
+bundle_cache = BundleLRUCache(MEMORY_CACHE_MAX_BYTES)
+_inflight_fetches = SingleFlight()
+# Runs stale-while-revalidate refreshes after the stale bundle has been returned
+_revalidation_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="yfinance-revalidate")
+
+def _load_yfinance_cache(ticker: str, fields: frozenset[str] = ALL_FIELDS) -> tuple[dict[str, datetime], dict] | None:
+    """
+    Returns the cached ``(fetched, data)`` pair regardless of age, or None if nothing usable is cached.
+    On a memory miss only ``fields`` are read from disk; the other frames load when first accessed.
+    """
+    cached = bundle_cache.get(ticker)
+    if cached is not None:
+        return cached
+    cached = _read_disk_cache(ticker, fields)
+    if cached is not None:
+        bundle_cache.put(ticker, cached)
+    return cached
+
+def _read_disk_cache(
+    ticker: str,
+    fields: frozenset[str] = ALL_FIELDS,
+    locked: bool = False,
+) -> tuple[dict[str, datetime], dict] | None:
+    # Entries written by the old indent=4 JSON cache are converted on first read;
+    # ``locked`` says the caller already holds the ticker lock the migration takes
+    legacy_path = get_legacy_file_path(ticker)
+    if os.path.exists(legacy_path):
         try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-            timestamp = datetime.fromisoformat(data["timestamp"])
-            if datetime.now() - timestamp < timedelta(hours=CACHE_DURATION_HOURS):
-                logger.info(f"Returning cached Yahoo Finance data for {ticker}")
-                return data["data"]
+            if has_bundle(ticker):
+                with suppress(FileNotFoundError):
+                    os.remove(legacy_path)
             else:
-                logger.info(f"Cached Yahoo Finance data for {ticker} is expired.")
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logger.warning(f"Error reading or parsing cache for {ticker}: {e}")
-        # If there's an error or cache is expired, delete it to force fresh fetch
-        os.remove(file_path)
-    return None
-
-def _write_yfinance_cache(ticker: str, data: dict):
-    file_path = _get_cache_file_path(ticker)
-    with open(file_path, "w") as f:
-        json.dump({"timestamp": datetime.now().isoformat(), "data": data}, f, indent=4)
+                migrate_legacy_file(ticker, locked=locked)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Error migrating legacy cache for {ticker}: {e}")
+            with suppress(FileNotFoundError):
+                os.remove(legacy_path)
+    try:
+        return read_bundle(ticker, datasets=None if fields == ALL_FIELDS else fields)
+    except (OSError, KeyError, ValueError) as e:
+        # Treated as a miss rather than deleted: the refresh rewrites the entry
+        # under the ticker lock, so other workers do not race to refetch it.
+        logger.warning(f"Error reading or parsing cache for {ticker}: {e}")
+        return None
+
+def _stale_datasets(fetched: dict[str, datetime], ttls: dict[str, timedelta | None]) -> set[str]:
+    """Datasets that are missing from the cache or older than their TTL."""
+    now = datetime.now()
+    return {
+        dataset for dataset in DATASETS
+        if dataset not in fetched or (ttls.get(dataset) is not None and now - fetched[dataset] >= ttls[dataset])
+    }
+
+def _with_cache_status(fetched: dict[str, datetime], data: dict, stale: set[str]) -> dict:
+    """
+    Shallow copy of a stale bundle flagged with the age of its oldest stale
+    dataset. Expired datasets carry no real fetch time and are left out of the
+    age, which is None when every stale dataset was expired.
+    """
+    now = datetime.now()
+    ages = [now - fetched[dataset] for dataset in stale if dataset in fetched and fetched[dataset] != EXPIRED_AT]
+    bundle = data.copy()
+    bundle["cache_status"] = {
+        "stale": True,
+        "age_seconds": int(max(ages).total_seconds()) if ages else None,
+        "stale_datasets": sorted(stale),
+    }
+    return bundle
+
+def _write_yfinance_cache(ticker: str, fetched: dict[str, datetime], data: dict, datasets: Iterable[str]):
+    write_bundle(ticker, data, fetched=fetched, datasets=datasets)
+    bundle_cache.put(ticker, (fetched, data))
     logger.info(f"Cached Yahoo Finance data for {ticker}")
 
+def _fields(fields: Iterable[str] | None) -> frozenset[str]:
+    if fields is None:
+        return ALL_FIELDS
+    fields = frozenset(fields)
+    unknown = fields - ALL_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown Yahoo Finance datasets: {', '.join(sorted(unknown))}")
+    return fields
+
+def _flight_key(ticker: str, fields: frozenset[str]) -> str:
+    # Projected refreshes fetch less, so they only coalesce with the same projection
+    return ticker.upper() if fields == ALL_FIELDS else f"{ticker.upper()}:{','.join(sorted(fields))}"
+
+def _frame_or_empty(frame) -> pd.DataFrame:
+    return frame if isinstance(frame, pd.DataFrame) else pd.DataFrame()
+
+def _align_index_tz(frame: pd.DataFrame, tz) -> pd.DataFrame:
+    """Bring a bar index to ``tz``. Naive indexes (legacy cache entries) hold UTC instants."""
+    if not isinstance(frame.index, pd.DatetimeIndex) or frame.index.tz == tz:
+        return frame
+    index = frame.index if frame.index.tz is not None else frame.index.tz_localize("UTC")
+    index = index.tz_convert(tz) if tz is not None else index.tz_convert("UTC").tz_localize(None)
+    return frame.set_axis(index)
+
+def _merge_history(cached: pd.DataFrame, new_bars: pd.DataFrame) -> pd.DataFrame:
+    """Append ``new_bars`` to the cached bars, letting re-fetched days win, and trim to ``HISTORY_WINDOW``."""
+    if cached.empty:
+        return new_bars
+    if new_bars.empty:
+        return cached
+    merged = pd.concat([_align_index_tz(cached, new_bars.index.tz), new_bars])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    return merged[merged.index > merged.index[-1] - HISTORY_WINDOW]
+
+def _latest_period_end(frame: pd.DataFrame):
+    if frame is None or frame.empty:
+        return pd.NaT
+    return pd.to_datetime(frame.columns, errors="coerce").max()
+
+def _new_fiscal_period_possible(data: dict, now: datetime | None = None) -> bool:
+    """
+    True when a fiscal period may have closed since the latest cached statement.
+    Quarterly statements are checked first; annual ones are the fallback.
+    """
+    now = pd.Timestamp(now or datetime.now())
+    latest_quarter = _latest_period_end(data.get("quarterly_financials"))
+    if not pd.isna(latest_quarter):
+        return now >= latest_quarter + QUARTER_LENGTH
+    latest_year = _latest_period_end(data.get("financials"))
+    if not pd.isna(latest_year):
+        return now >= latest_year + FISCAL_YEAR_LENGTH
+    return True
+
+def company_from_bundle(ticker: str, data: dict | None) -> Company | None:
+    info = (data or {}).get("info")
+    if not info:
+        return None
+    return Company(
+        ticker=ticker.upper(),
+        name=info.get("longName"),
+        industry=info.get("industry"),
+        story=info.get("longBusinessSummary"),
+    )
+
+def serialize_bundle(data: dict | None) -> dict | None:
+    """Return a JSON-safe copy of a bundle, with DataFrames rendered through ``to_json()``."""
+    if data is None:
+        return None
+    return {
+        key: value.to_json() if isinstance(value, pd.DataFrame) else value
+        for key, value in data.items()
+    }
+
 class YahooFinanceRepository:
+    def __init__(
+        self,
+        incremental_refresh: bool = True,
+        ttls: dict[str, timedelta | None] | None = None,
+        request_budget: RequestBudget | None = None,
+    ):
+        # When True, stale price history is extended from the last cached bar and
+        # statements wait for a new fiscal period instead of being refetched in full.
+        self.incremental_refresh = incremental_refresh
+        self.ttls = {**DEFAULT_DATASET_TTLS, **(ttls or {})}
+        # Optional cap on Yahoo Finance calls, shared by every fetch this repository makes
+        self.request_budget = request_budget
+
     def get_ticker(self, ticker: str):
         return yf.Ticker(ticker)
 
-    def get_company_info(self, ticker_obj) -> Company:
-        info = ticker_obj.info
-        return Company(
-            ticker=ticker_obj.ticker,
-            name=info.get("longName"),
-            industry=info.get("industry"),
-            story=info.get("longBusinessSummary"),
-        )
+    def get_company_info(self, ticker) -> Company | None:
+        """
+        Company profile served from the cached bundle's ``info`` (fetched only if
+        missing or expired), so it shares its single ``info`` request with
+        ``get_all_data``. Accepts a ticker symbol or a ``yf.Ticker``.
+        """
+        symbol = getattr(ticker, "ticker", ticker)
+        return company_from_bundle(symbol, self.get_all_data(symbol, fields=["info"]))
+
+    def get_company_infos(
+        self,
+        tickers: Iterable[str],
+        max_workers: int = DEFAULT_FETCH_WORKERS,
+    ) -> dict[str, Company | None]:
+        """Bulk ``get_company_info``: ``{ticker: Company}`` in input order, None where no info is available."""
+        bundles = self.get_all_data_many(tickers, max_workers=max_workers, fields=["info"])
+        return {ticker: company_from_bundle(ticker, bundle) for ticker, bundle in bundles.items()}
+
+    def get_all_data(
+        self,
+        ticker: str,
+        max_age: dict[str, timedelta | None] | None = None,
+        stale_while_revalidate: bool = False,
+        fields: Iterable[str] | None = None,
+    ):
+        """
+        Returns the ticker bundle: ``info`` as a dict, statements, insider
+        transactions and price history as DataFrames, plus a few scalar fields.
+        Use ``serialize_bundle`` before handing the result to a JSON encoder.
+        The bundle is shared with the in-memory cache and must not be mutated.
+
+        ``max_age`` overrides the repository TTLs for this call, per dataset
+        (None accepts any age), e.g. ``FRESH_PRICE_ANY_AGE_STATEMENTS``.
 
-    def get_all_data(self, ticker: str):
+        With ``stale_while_revalidate`` an expired bundle is returned at once,
+        with a ``cache_status`` entry giving its age, while a background task
+        refreshes it. Only a ticker with nothing cached waits for the network.
+
+        ``fields`` projects the call onto some datasets, e.g. ``["info", "history"]``:
+        only those are read from disk and checked for freshness or fetched. The
+        bundle still has every key, but the other frames are read from the disk
+        cache on first access, as they are (possibly stale, or empty if never fetched).
+        """
         # Try to read from cache first
-        cached_data = _read_yfinance_cache(ticker)
-        if cached_data:
-            return cached_data
+        ttls = self._ttls(max_age)
+        fields = _fields(fields)
+        cached = _load_yfinance_cache(ticker, fields)
+        stale = _stale_datasets(cached[0], ttls) & fields if cached else set(fields)
+        if not stale:
+            logger.info(f"Returning cached Yahoo Finance data for {ticker}")
+            return cached[1]
 
-        # If not in cache or expired, fetch from yfinance
-        ticker_obj = self.get_ticker(ticker)
-        info = ticker_obj.info
-        if not info:
-            logger.warning(f"No information found for ticker {ticker_obj.ticker}")
-            return None
-
-        data = {
-            "info": info,
-            "financials": ticker_obj.financials.to_json(),
-            "balance_sheet": ticker_obj.balance_sheet.to_json(),
-            "cashflow": ticker_obj.cashflow.to_json(),
-            "quarterly_financials": ticker_obj.quarterly_financials.to_json(),
-            "insider_transactions": ticker_obj.insider_transactions.to_json(),
-            "history": ticker_obj.history(period="1y").to_json(),
-            "market_cap": info.get("marketCap"),
-            "trailing_pe": info.get("trailingPE"),
+        if stale_while_revalidate and cached:
+            logger.info(f"Returning stale Yahoo Finance data for {ticker} while it is refreshed")
+            self._revalidate_in_background(ticker, ttls, fields)
+            return _with_cache_status(cached[0], cached[1], stale)
+
+        # Fetch whatever is missing or expired from yfinance
+        return self._refresh(ticker, ttls, fields)
+
+    def iter_all_data(
+        self,
+        tickers: Iterable[str],
+        max_workers: int = DEFAULT_FETCH_WORKERS,
+        max_age: dict[str, timedelta | None] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator[tuple[str, dict | None]]:
+        """
+        Streams ``(ticker, bundle)`` pairs. Cache hits are yielded straight away,
+        misses are fetched on a bounded thread pool and yielded as they complete.
+        A ticker whose fetch fails is yielded with ``None``.
+        """
+        ttls = self._ttls(max_age)
+        fields = _fields(fields)
+        misses = []
+        for ticker in dict.fromkeys(tickers):
+            cached = _load_yfinance_cache(ticker, fields)
+            if cached and not _stale_datasets(cached[0], ttls) & fields:
+                yield ticker, cached[1]
+            else:
+                misses.append(ticker)
+        if not misses:
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as executor:
+            futures = {executor.submit(self._refresh, ticker, ttls, fields): ticker for ticker in misses}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    yield ticker, future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching Yahoo Finance data for {ticker}: {e}")
+                    yield ticker, None
+
+    def get_all_data_many(
+        self,
+        tickers: Iterable[str],
+        max_workers: int = DEFAULT_FETCH_WORKERS,
+        max_age: dict[str, timedelta | None] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> dict[str, dict | None]:
+        """Bulk ``get_all_data``: returns ``{ticker: bundle}`` in the order the tickers were given."""
+        tickers = list(dict.fromkeys(tickers))
+        results = dict(self.iter_all_data(tickers, max_workers=max_workers, max_age=max_age, fields=fields))
+        return {ticker: results.get(ticker) for ticker in tickers}
+
+    def get_all_data_as_of(self, ticker: str, as_of: date, fields: Iterable[str] | None = None) -> dict | None:
+        """
+        The bundle as the cache held it on ``as_of``, replayed from its daily
+        snapshots without any network access. None if nothing was cached by then.
+        """
+        return self.get_all_data_many_as_of([ticker], as_of, fields=fields)[ticker.upper()]
+
+    def get_all_data_many_as_of(
+        self,
+        tickers: Iterable[str],
+        as_of: date,
+        fields: Iterable[str] | None = None,
+    ) -> dict[str, dict | None]:
+        """Bulk ``get_all_data_as_of``: ``{ticker: bundle}`` keyed by upper-case ticker, in input order."""
+        return read_snapshots(tickers, as_of, datasets=_fields(fields))
+
+    def get_cached_many(self, tickers: Iterable[str], fields: Iterable[str] | None = None) -> dict[str, dict | None]:
+        """``{ticker: bundle}`` as cached, whatever its age and without any network access; None where nothing is cached."""
+        fields = _fields(fields)
+        return {
+            ticker: cached[1] if cached is not None else None
+            for ticker in dict.fromkeys(tickers)
+            for cached in [_load_yfinance_cache(ticker, fields)]
         }
-        _write_yfinance_cache(ticker, data)
+
+    def cached_fetch_times(self, dataset: str) -> dict[str, datetime]:
+        """``{ticker: fetched_at}`` of every cached ticker holding ``dataset``, from the manifest."""
+        return get_manifest().fetch_times(dataset)
+
+    def tickers_needing_refresh(
+        self,
+        tickers: Iterable[str],
+        max_age: dict[str, timedelta | None] | None = None,
+    ) -> list[str]:
+        """
+        The given tickers with a missing or expired dataset, in input order.
+        Answered from the cache manifest, without reading any bundle.
+        """
+        ttls = self._ttls(max_age)
+        fetched_by_ticker: dict[str, dict[str, datetime]] = {}
+        for entry in get_manifest().entries():
+            fetched_by_ticker.setdefault(entry["ticker"], {})[entry["dataset"]] = entry["fetched_at"]
+        return [
+            ticker for ticker in dict.fromkeys(t.upper() for t in tickers)
+            if ticker not in fetched_by_ticker or _stale_datasets(fetched_by_ticker[ticker], ttls)
+        ]
+
+    def cached_tickers_older_than(self, age: timedelta, datasets: Iterable[str] | None = None) -> list[str]:
+        """Tickers whose cached ``datasets`` (default: any) were fetched more than ``age`` ago, from the manifest."""
+        return get_manifest().tickers_older_than(datetime.now() - age, datasets)
+
+    def expire(self, tickers: Iterable[str], datasets: Iterable[str] | None = None) -> list[str]:
+        """Force the next read of ``datasets`` (default: all) to refetch them, on disk and in memory."""
+        expired = expire_datasets(tickers, datasets)
+        for ticker in expired:
+            bundle_cache.pop(ticker)
+        return expired
+
+    def _ttls(self, max_age: dict[str, timedelta | None] | None) -> dict[str, timedelta | None]:
+        return {**self.ttls, **max_age} if max_age else self.ttls
+
+    def _refresh(
+        self,
+        ticker: str,
+        ttls: dict[str, timedelta | None],
+        fields: frozenset[str] = ALL_FIELDS,
+    ) -> dict | None:
+        """
+        Single-flight refresh: concurrent callers for the same ticker share one
+        fetch, and the ticker lock keeps other worker processes from fetching it
+        at the same time. The disk entry is re-read under the lock because a
+        previous flight, here or in another process, may have just refreshed it.
+        """
+        def fetch():
+            with ticker_lock(ticker):
+                cached = _read_disk_cache(ticker, fields, locked=True)
+                if cached is not None:
+                    bundle_cache.put(ticker, cached)
+                stale = _stale_datasets(cached[0], ttls) & fields if cached else set(fields)
+                if not stale:
+                    return cached[1]
+                return self._update_all_data(ticker, cached, stale)
+
+        return _inflight_fetches.do(_flight_key(ticker, fields), fetch)
+
+    def _throttle(self):
+        if self.request_budget is not None:
+            self.request_budget.acquire()
+
+    def _revalidate_in_background(self, ticker: str, ttls: dict[str, timedelta | None], fields: frozenset[str] = ALL_FIELDS):
+        if _inflight_fetches.in_flight(_flight_key(ticker, fields)):
+            return
+
+        def revalidate():
+            try:
+                self._refresh(ticker, ttls, fields)
+            except Exception as e:
+                logger.error(f"Background refresh of Yahoo Finance data for {ticker} failed: {e}")
+
+        _revalidation_pool.submit(revalidate)
+
+    def _update_all_data(
+        self,
+        ticker: str,
+        cached: tuple[dict[str, datetime], dict] | None,
+        stale: Iterable[str] = DATASETS,
+    ) -> dict | None:
+        """
+        Re-fetches the ``stale`` datasets and writes only those back to the cache.
+        ``info`` is always fetched when nothing is cached, to tell unknown tickers apart.
+        """
+        fetched, cached_data = cached or ({}, None)
+        stale = set(stale)
+        ticker_obj = self.get_ticker(ticker)
+        # A LazyDict copy keeps the frames that are not being refreshed unread
+        data = cached_data.copy() if cached_data is not None else {}
+        refreshed = []
+
+        if "info" in stale or not data.get("info"):
+            self._throttle()
+            info = ticker_obj.info
+            if not info:
+                logger.warning(f"No information found for ticker {ticker_obj.ticker}")
+                return None
+            data.update({
+                "info": info,
+                "market_cap": info.get("marketCap"),
+                "trailing_pe": info.get("trailingPE"),
+            })
+            refreshed.append("info")
+
+        if "history" in stale:
+            history = _frame_or_empty(data.get("history"))
+            self._throttle()
+            if history.empty or not self.incremental_refresh:
+                data["history"] = _frame_or_empty(ticker_obj.history(period=HISTORY_PERIOD))
+            else:
+                # Start at the last cached day so a bar cached mid-session is replaced by its final values
+                new_bars = _frame_or_empty(ticker_obj.history(start=history.index[-1].date()))
+                data["history"] = _merge_history(history, new_bars)
+            refreshed.append("history")
+
+        if "insider_transactions" in stale:
+            self._throttle()
+            data["insider_transactions"] = _frame_or_empty(ticker_obj.insider_transactions)
+            refreshed.append("insider_transactions")
+
+        stale_statements = [dataset for dataset in STATEMENT_DATASETS if dataset in stale]
+        if stale_statements:
+            if cached_data is None or not self.incremental_refresh or _new_fiscal_period_possible(cached_data):
+                for dataset in stale_statements:
+                    self._throttle()
+                    data[dataset] = _frame_or_empty(getattr(ticker_obj, dataset))
+            else:
+                # No new period can have been reported yet; re-stamp the cached statements as checked
+                logger.info(f"Statements for {ticker} are current; skipping re-pull")
+            refreshed.extend(stale_statements)
+
+        for dataset in FRAME_DATASETS:
+            if dataset not in data:
+                data[dataset] = pd.DataFrame()
+        if refreshed:
+            fetched = {**fetched, **dict.fromkeys(refreshed, datetime.now())}
+            _write_yfinance_cache(ticker, fetched, data, refreshed)
         return data
@@ -3,8 +3,9 @@ from io import StringIO
 import re
 import json
 from backend.core.use_cases.ai_evaluation_service import AIEvaluationService
-from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository
+from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository, serialize_bundle
 from backend.core.use_cases.categorization_service import CategorizationService
+from backend.core.use_cases.triage_service import TriageService
 
 def _parse_ai_generated_ideas(ai_response_content: str) -> list[str]:
     """
@@ -30,20 +31,23 @@ def _parse_ai_generated_ideas(ai_response_content: str) -> list[str]:
         print(f"An unexpected error occurred during AI response parsing: {e}")
         return []
 
-def _parse_categorization_table(ai_response_content: str) -> dict:
+def _parse_categorization_table(ai_response_content: str | dict) -> dict:
     """
     Parses the AI-generated categorization content to extract fast growers and turnarounds.
-    Assumes the AI response contains a JSON object within a markdown code block.
+    Accepts the already-parsed JSON object, or text with the JSON object within a markdown code block.
     """
     categorized_stocks = {"Fast Grower": [], "Turnaround": []}
     try:
-        json_match = re.search(r'```json\n([\s\S]*?)\n```', ai_response_content)
-        if not json_match:
-            print("Error: No JSON code block found in AI categorization response.")
-            return categorized_stocks
+        if isinstance(ai_response_content, dict):
+            data = ai_response_content
+        else:
+            json_match = re.search(r'```json\n([\s\S]*?)\n```', ai_response_content)
+            if not json_match:
+                print("Error: No JSON code block found in AI categorization response.")
+                return categorized_stocks
 
-        json_content = json_match.group(1)
-        data = json.loads(json_content)
+            json_content = json_match.group(1)
+            data = json.loads(json_content)
 
         if "fast_growers" in data:
             categorized_stocks["Fast Grower"] = [item["ticker"] for item in data["fast_growers"] if "ticker" in item]
@@ -99,13 +103,20 @@ def run_investment_workflow():
         print("No initial stock tickers found. Exiting workflow.")
         return
 
-    # Step 2: AI-Powered Categorization & Triage
+    # Step 2: Categorization & Triage; the clear cases are settled from cached data, the rest by the AI
     print("\nStep 2: Categorizing and triaging stocks into Peter Lynch categories...")
-    categorization_response = ai_service.categorize_and_filter_lynch(initial_stock_tickers)
-    categorization_markdown = categorization_response.get("content", "")
-    print("AI Categorization Results:\n", categorization_markdown)
+    categorization_response = TriageService(yfinance_repo).categorize(
+        initial_stock_tickers, ai_service.categorize_and_filter_lynch
+    )
+    categorization_content = categorization_response["content"]
+    pre_triage = categorization_content["pre_triage"]
+    print(
+        f"Pre-triage: {len(pre_triage['fast_growers'])} Fast Growers and {len(pre_triage['rejected'])} rejects "
+        f"from cached data; {len(pre_triage['sent_to_llm'])} tickers sent to the AI."
+    )
+    print("AI Categorization Results:\n", categorization_content)
 
-    categorized_stocks = _parse_categorization_table(categorization_markdown)
+    categorized_stocks = _parse_categorization_table(categorization_content)
     fast_growers = categorized_stocks.get("Fast Grower", [])
     turnarounds = categorized_stocks.get("Turnaround", [])
     
@@ -123,7 +134,8 @@ def run_investment_workflow():
         # In a real scenario, you'd fetch detailed financial data for each ticker here
         # For demonstration, we'll just pass the tickers to the AI prompt
         # and assume the AI has access to the necessary data or we'd pass it in a more complex structure.
-        fast_grower_info_for_ai = [{"ticker": t, "data": yfinance_repo.get_all_data(t) } for t in fast_growers] # Placeholder
+        fast_grower_bundles = yfinance_repo.get_all_data_many(fast_growers)
+        fast_grower_info_for_ai = [{"ticker": t, "data": serialize_bundle(data)} for t, data in fast_grower_bundles.items()]
 
         vet_fg_response = ai_service.vet_fast_growers(fast_grower_info_for_ai)
         vet_fg_content = vet_fg_response.get("content", "")
@@ -0,0 +1,26 @@
+import sys
+import os
+import argparse
+
+# Add the repository root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.core.infrastructure import yfinance_cache
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the legacy <TICKER>.json Yahoo Finance cache into the columnar Arrow layout."
+    )
+    parser.add_argument("--cache-dir", default=yfinance_cache.YFINANCE_CACHE_DIR, help="Yahoo Finance cache directory.")
+    parser.add_argument("--keep", action="store_true", help="Keep the legacy JSON files after converting them.")
+    parser.add_argument("--rebuild-manifest", action="store_true", help="Re-index the cache into manifest.sqlite afterwards.")
+    args = parser.parse_args()
+
+    yfinance_cache.YFINANCE_CACHE_DIR = args.cache_dir
+    migrated = yfinance_cache.migrate_legacy_cache(remove=not args.keep)
+    print(f"Migrated {len(migrated)} ticker(s): {', '.join(migrated) if migrated else '-'}")
+    if args.rebuild_manifest:
+        print(f"Indexed {yfinance_cache.rebuild_manifest()} ticker(s) in the cache manifest")
+
+if __name__ == "__main__":
+    main()
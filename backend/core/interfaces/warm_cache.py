@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import argparse
+from datetime import timedelta
+
+# Add the repository root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from backend.core.infrastructure import yfinance_cache
+from backend.core.infrastructure.rate_limit import RequestBudget
+from backend.core.infrastructure.yfinance_repository import DEFAULT_FETCH_WORKERS, YahooFinanceRepository
+
+DEFAULT_REQUESTS_PER_MINUTE = 120
+
+def read_universe(path: str) -> list[str]:
+    """Tickers from a universe file: whitespace or comma separated, ``#`` starts a comment."""
+    tickers = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(token.strip().upper() for token in line.replace(",", " ").split())
+    return list(dict.fromkeys(tickers))
+
+def warm_up(repo: YahooFinanceRepository, tickers: list[str], max_workers: int = DEFAULT_FETCH_WORKERS, report=print) -> dict:
+    """
+    Fetches every ticker whose cache entry is missing or expired. Tickers already
+    fresh in the cache manifest are skipped, so an interrupted run resumes where
+    it stopped when started again.
+    """
+    pending = repo.tickers_needing_refresh(tickers)
+    summary = {"total": len(tickers), "skipped": len(tickers) - len(pending), "fetched": 0, "failed": []}
+    report(f"{summary['skipped']} of {len(tickers)} ticker(s) already fresh; fetching {len(pending)}")
+    if not pending:
+        return summary
+
+    started = time.monotonic()
+    for done, (ticker, bundle) in enumerate(repo.iter_all_data(pending, max_workers=max_workers), start=1):
+        if bundle is None:
+            summary["failed"].append(ticker)
+        else:
+            summary["fetched"] += 1
+        rate = done / max(time.monotonic() - started, 1e-9)
+        eta = (len(pending) - done) / rate
+        status = "ok" if bundle is not None else "FAILED"
+        report(f"[{done}/{len(pending)}] {ticker} {status} ({rate * 60:.1f} tickers/min, ETA {eta:.0f}s)")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-populate the Yahoo Finance cache for a ticker universe, e.g. before market open."
+    )
+    parser.add_argument("universe", help="File listing the tickers to warm (whitespace or comma separated).")
+    parser.add_argument("--workers", type=int, default=DEFAULT_FETCH_WORKERS, help="Tickers fetched concurrently.")
+    parser.add_argument(
+        "--requests-per-minute", type=int, default=DEFAULT_REQUESTS_PER_MINUTE,
+        help="Budget for Yahoo Finance calls across all workers (each ticker costs up to 7).",
+    )
+    parser.add_argument("--cache-dir", default=yfinance_cache.YFINANCE_CACHE_DIR, help="Yahoo Finance cache directory.")
+    parser.add_argument(
+        "--snapshot-retention-days", type=int, default=yfinance_cache.SNAPSHOT_RETENTION.days,
+        help="Prune cache snapshots superseded more than this many days ago.",
+    )
+    args = parser.parse_args()
+
+    yfinance_cache.YFINANCE_CACHE_DIR = args.cache_dir
+    repo = YahooFinanceRepository(request_budget=RequestBudget(args.requests_per_minute))
+    summary = warm_up(repo, read_universe(args.universe), max_workers=args.workers)
+    print(
+        f"Warm-up complete: {summary['fetched']} fetched, {summary['skipped']} already fresh, "
+        f"{len(summary['failed'])} failed{': ' + ', '.join(summary['failed']) if summary['failed'] else ''}"
+    )
+    pruned = yfinance_cache.prune_snapshots(timedelta(days=args.snapshot_retention_days))
+    print(f"Pruned {pruned} superseded snapshot file(s)")
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
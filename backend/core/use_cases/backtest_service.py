@@ -0,0 +1,290 @@
+"""
+Point-in-time backtest of the quantitative screen.
+
+On each rebalance date the screen is rebuilt from what was known that day:
+  * price and volume criteria use only bars up to and including the date;
+  * RS ratings rank the universe's weighted performance as of the date;
+  * statement figures come from the ``FundamentalsPanel``. A quarter counts
+    only once ``REPORTING_LAG`` has passed after its period end, roughly the
+    10-Q filing deadline.
+``revenue_growth`` and ``eps_growth_quarterly`` are the year-over-year growth
+of the latest public quarter. The trailing P/E and PEG use the TTM EPS of the
+last four public quarters and its growth over the four before. Those columns
+feed ``CategorizationService.categorize_many`` and ``screen_universe``
+unchanged, so the backtest applies the same thresholds as the live screen.
+Insider activity has no history in the cache and is left out
+(``POINT_IN_TIME_CRITERIA``).
+
+Features are computed for all rebalance dates and tickers in array passes.
+The selected basket's equal-weighted forward returns over each horizon are
+reported against the universe of tickers trading that day. ``run_backtest``
+can split the rebalance dates into ranges and run them in a process pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..infrastructure.fundamentals_panel import PANEL_QUARTERS, FundamentalsPanel
+from ..infrastructure.yfinance_repository import YahooFinanceRepository
+from .categorization_service import CategorizationService
+from .chart_pattern_service import ohlcv_matrices
+from .fundamentals_service import YOY_LAG, FundamentalsService, growth
+from .relative_strength_service import LOOKBACKS, MIN_RANKING_UNIVERSE, MIN_SESSIONS, WEIGHTS
+from .screening_service import CRITERIA, INFO_COLUMNS, HISTORY_COLUMNS, screen_universe
+
+REPORTING_LAG = np.timedelta64(45, "D")
+REBALANCE_SESSIONS = 21 # Monthly
+HORIZONS = (21, 63, 126) # About one, three and six months
+HIGH_WINDOW = 252 # Sessions in the 52-week high and the average volume
+WARMUP_SESSIONS = max(HIGH_WINDOW, LOOKBACKS[-1] + 1)
+POINT_IN_TIME_CRITERIA = tuple(c for c in CRITERIA if c != "insider_activity")
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    picks: pd.DataFrame # One row per (date, ticker) selected, with its forward returns
+    periods: pd.DataFrame # One row per rebalance date: basket and universe forward returns
+
+    def summary(self) -> pd.DataFrame:
+        """Per horizon: mean basket, universe and excess return, and how often the basket beat the universe."""
+        rows = {}
+        for horizon in _horizons(self.periods):
+            basket, universe = self.periods[f"basket_{horizon}"], self.periods[f"universe_{horizon}"]
+            measured = basket.notna() & universe.notna()
+            excess = (basket - universe)[measured]
+            rows[horizon] = {
+                "periods": int(measured.sum()),
+                "basket": basket[measured].mean(),
+                "universe": universe[measured].mean(),
+                "excess": excess.mean(),
+                "hit_rate": (excess > 0).mean() if len(excess) else np.nan,
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def _horizons(periods: pd.DataFrame) -> list[int]:
+    return [int(column.split("_")[1]) for column in periods.columns if column.startswith("basket_")]
+
+
+def _rows_at(index: pd.DatetimeIndex, dates: Sequence) -> np.ndarray:
+    """Row of each date in ``index``; dates must be sessions of the index."""
+    rows = index.get_indexer(pd.DatetimeIndex(dates))
+    if (rows < 0).any():
+        raise ValueError("Rebalance dates must be sessions of the price history")
+    return rows
+
+
+def rs_rating_rows(closes: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """
+    RS ratings (see ``relative_strength_service``) as of each of ``rows``:
+    shape ``(len(rows), tickers)``, NaN where a ticker has too few bars.
+    """
+    values = pd.DataFrame(closes).ffill().to_numpy()
+    n_tickers = values.shape[1]
+    first_bar = np.argmax(~np.isnan(values), axis=0)[None, :]
+    columns = np.arange(n_tickers)[None, :]
+    at = rows[:, None]
+    last = values[at, columns]
+    score = np.zeros((len(rows), n_tickers))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for lookback, weight in zip(LOOKBACKS, WEIGHTS):
+            score += weight * (last / values[np.maximum(at - lookback, first_bar), columns] - 1)
+    score[at + 1 - first_bar < MIN_SESSIONS] = np.nan
+    score[(~np.isnan(score)).sum(axis=1) < MIN_RANKING_UNIVERSE] = np.nan
+    percentile = pd.DataFrame(score).rank(axis=1, pct=True).to_numpy()
+    return np.where(np.isnan(percentile), np.nan, np.clip(np.ceil(percentile * 99), 1, 99))
+
+
+def statement_rows(panel: FundamentalsPanel, tickers: Sequence[str], dates: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Statement figures public on each date, shape ``(dates, tickers)``:
+    ``eps_yoy``, ``sales_yoy``, ``ttm_eps`` and ``ttm_eps_growth``.
+    """
+    n_tickers = len(tickers)
+    periods = np.full((n_tickers, PANEL_QUARTERS), np.datetime64("NaT"), dtype="datetime64[ns]")
+    eps = np.full((n_tickers, PANEL_QUARTERS), np.nan)
+    sales = np.full((n_tickers, PANEL_QUARTERS), np.nan)
+    selected = panel.select(tickers)
+    if len(selected):
+        positions = pd.Index(tickers).get_indexer(selected.tickers)
+        diluted = selected.item("Diluted EPS")
+        periods[positions] = selected.periods
+        eps[positions] = np.where(np.isnan(diluted), selected.item("Basic EPS"), diluted)
+        sales[positions] = selected.item("Total Revenue")
+
+    # Quarters are newest first, so the number not yet public is the index of the newest public one
+    public_from = periods + REPORTING_LAG
+    newest = (public_from[None, :, :] > dates.astype("datetime64[ns]")[:, None, None]).sum(axis=2)
+    columns = np.arange(n_tickers)[None, :]
+
+    def quarter(values: np.ndarray, offset: int) -> np.ndarray:
+        position = newest + offset
+        return np.where(position < PANEL_QUARTERS, values[columns, np.minimum(position, PANEL_QUARTERS - 1)], np.nan)
+
+    ttm = sum(quarter(eps, offset) for offset in range(4))
+    ttm_prior = sum(quarter(eps, offset) for offset in range(YOY_LAG, YOY_LAG + 4))
+    return {
+        "eps_yoy": growth(quarter(eps, 0), quarter(eps, YOY_LAG)),
+        "sales_yoy": growth(quarter(sales, 0), quarter(sales, YOY_LAG)),
+        "ttm_eps": ttm,
+        "ttm_eps_growth": growth(ttm, ttm_prior),
+    }
+
+
+def point_in_time_frame(matrices: dict[str, pd.DataFrame], panel: FundamentalsPanel, rows: np.ndarray) -> pd.DataFrame:
+    """The screening frame of ``universe_frame`` for each of ``rows``, indexed by (date, ticker)."""
+    close = matrices["Close"]
+    dates, tickers = close.index[rows], close.columns
+    high_52w = matrices["High"].rolling(HIGH_WINDOW, min_periods=1).max().to_numpy()[rows]
+    avg_volume = matrices["Volume"].rolling(HIGH_WINDOW, min_periods=1).mean().to_numpy()[rows]
+    last_close = close.to_numpy()[rows]
+    statements = statement_rows(panel, list(tickers), dates.to_numpy())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ttm_eps = statements["ttm_eps"]
+        trailing_pe = np.where(ttm_eps > 0, last_close / ttm_eps, np.nan)
+        growth_pct = statements["ttm_eps_growth"] * 100
+        peg_ratio = np.where(growth_pct > 0, trailing_pe / growth_pct, np.nan)
+
+    columns = {
+        "revenue_growth": statements["sales_yoy"],
+        "trailing_pe": trailing_pe,
+        "peg_ratio": peg_ratio,
+        "eps_growth_quarterly": statements["eps_yoy"],
+        "last_close": last_close,
+        "high_52w": high_52w,
+        "last_volume": matrices["Volume"].to_numpy()[rows],
+        "avg_volume": avg_volume,
+        "rs_rating": rs_rating_rows(close.to_numpy(), rows),
+    }
+    index = pd.MultiIndex.from_product([dates, tickers], names=["date", "ticker"])
+    frame = pd.DataFrame({name: values.reshape(-1) for name, values in columns.items()}, index=index)
+    # Columns with no point-in-time source stay NaN and fail their criteria
+    frame = frame.reindex(columns=list(INFO_COLUMNS) + ["insider_buys"] + list(HISTORY_COLUMNS) + ["rs_rating"])
+    frame = frame[~np.isnan(last_close.reshape(-1))] # Only tickers trading that day
+    categories = CategorizationService().categorize_many(
+        frame[["revenue_growth", "trailing_pe"]].set_axis(["revenueGrowth", "trailingPE"], axis=1)
+    )
+    frame.insert(0, "category", categories)
+    return frame
+
+
+def forward_returns(close: pd.DataFrame, rows: np.ndarray, horizon: int) -> np.ndarray:
+    """Close-to-close return from each of ``rows`` to ``horizon`` sessions later; NaN past the end of the data."""
+    values = close.to_numpy()
+    ahead = rows + horizon
+    later = np.where((ahead < len(values))[:, None], values[np.minimum(ahead, len(values) - 1)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return later / values[rows] - 1
+
+
+def backtest(
+    matrices: dict[str, pd.DataFrame],
+    panel: FundamentalsPanel,
+    rebalance_dates: Sequence,
+    criteria_ids: Iterable[str] | None = None,
+    horizons: Sequence[int] = HORIZONS,
+) -> BacktestResult:
+    """Replay the screen on each rebalance date (sessions of ``matrices``) in one vectorized pass."""
+    close = matrices["Close"]
+    rows = _rows_at(close.index, rebalance_dates)
+    criteria_ids = POINT_IN_TIME_CRITERIA if criteria_ids is None else list(criteria_ids)
+    frame = point_in_time_frame(matrices, panel, rows)
+    selected = screen_universe(frame, criteria_ids).all(axis=1)
+
+    # (dates, tickers) masks; tickers not trading on a date are neither eligible nor selected
+    date_position = close.index[rows].get_indexer(frame.index.get_level_values("date"))
+    ticker_position = close.columns.get_indexer(frame.index.get_level_values("ticker"))
+    eligible = np.zeros((len(rows), close.shape[1]), dtype=bool)
+    eligible[date_position, ticker_position] = True
+    chosen = np.zeros_like(eligible)
+    chosen[date_position, ticker_position] = selected.to_numpy()
+
+    periods = {"selected": chosen.sum(axis=1), "eligible": eligible.sum(axis=1)}
+    picks = frame.index[selected.to_numpy()].to_frame(index=False)
+    for horizon in horizons:
+        returns = forward_returns(close, rows, horizon)
+        periods[f"basket_{horizon}"] = _masked_mean(returns, chosen)
+        periods[f"universe_{horizon}"] = _masked_mean(returns, eligible)
+        picks[f"return_{horizon}"] = returns[
+            close.index[rows].get_indexer(picks["date"]), close.columns.get_indexer(picks["ticker"])
+        ]
+    return BacktestResult(picks, pd.DataFrame(periods, index=pd.Index(close.index[rows], name="date")))
+
+
+def _masked_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Row means of ``values`` where ``mask`` holds, ignoring NaN; NaN for rows with nothing to average."""
+    usable = mask & ~np.isnan(values)
+    counts = usable.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, np.where(usable, values, 0).sum(axis=1) / counts, np.nan)
+
+
+def _window(matrices: dict[str, pd.DataFrame], dates: Sequence, horizon: int) -> dict[str, pd.DataFrame]:
+    """The rows a range of rebalance dates needs: ``WARMUP_SESSIONS`` before it and ``horizon`` after."""
+    rows = _rows_at(matrices["Close"].index, dates)
+    start, stop = max(rows[0] - WARMUP_SESSIONS, 0), rows[-1] + horizon + 1
+    return {field: matrix.iloc[start:stop] for field, matrix in matrices.items()}
+
+
+def _backtest_range(args) -> BacktestResult:
+    return backtest(*args)
+
+
+def run_backtest(
+    matrices: dict[str, pd.DataFrame],
+    panel: FundamentalsPanel,
+    rebalance_dates: Sequence,
+    criteria_ids: Iterable[str] | None = None,
+    horizons: Sequence[int] = HORIZONS,
+    max_workers: int = 1,
+) -> BacktestResult:
+    """``backtest``, optionally with contiguous ranges of rebalance dates run in ``max_workers`` processes."""
+    rebalance_dates = list(rebalance_dates)
+    if max_workers <= 1 or len(rebalance_dates) < 2:
+        return backtest(matrices, panel, rebalance_dates, criteria_ids, horizons)
+    criteria_ids = None if criteria_ids is None else list(criteria_ids)
+    ranges = [list(dates) for dates in np.array_split(np.array(rebalance_dates, dtype=object), max_workers) if len(dates)]
+    tasks = [
+        (_window(matrices, dates, max(horizons, default=0)), panel, dates, criteria_ids, horizons)
+        for dates in ranges
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(_backtest_range, tasks))
+    return BacktestResult(
+        pd.concat([result.picks for result in results], ignore_index=True),
+        pd.concat([result.periods for result in results]),
+    )
+
+
+def rebalance_dates(index: pd.DatetimeIndex, start=None, end=None, every: int = REBALANCE_SESSIONS) -> pd.DatetimeIndex:
+    """Every ``every``-th session between ``start`` and ``end``, once RS ratings can exist."""
+    first = max(index.searchsorted(pd.Timestamp(start)) if start is not None else 0, MIN_SESSIONS - 1)
+    last = index.searchsorted(pd.Timestamp(end), side="right") if end is not None else len(index)
+    return index[first:last:every]
+
+
+class BacktestService:
+    def __init__(self, yfinance_repo: YahooFinanceRepository | None = None):
+        self.yfinance_repo = yfinance_repo or YahooFinanceRepository()
+        self.fundamentals = FundamentalsService(self.yfinance_repo)
+
+    def run(
+        self,
+        tickers: Iterable[str],
+        start=None,
+        end=None,
+        criteria_ids: Iterable[str] | None = None,
+        horizons: Sequence[int] = HORIZONS,
+        every: int = REBALANCE_SESSIONS,
+        max_workers: int = 1,
+    ) -> BacktestResult:
+        """Backtest over the tickers' cached price history and the fundamentals panel."""
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        bundles = self.yfinance_repo.get_all_data_many(tickers, fields=["history"])
+        matrices = ohlcv_matrices({ticker: bundle.get("history") for ticker, bundle in bundles.items() if bundle})
+        dates = rebalance_dates(matrices["Close"].index, start, end, every)
+        return run_backtest(matrices, self.fundamentals.panel(tickers), dates, criteria_ids, horizons, max_workers)
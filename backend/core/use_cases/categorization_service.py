@@ -1,5 +1,27 @@
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
 from ..entities.models import InvestmentCandidate
 
+def _coerce_floats(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Bulk ``float()``: returns the floats and a mask of values ``float()`` accepts.
+    NaN is a valid float here, as it is for ``float()``; only values it rejects are invalid.
+    """
+    floats = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    valid = ~np.isnan(floats)
+    # NaN out of to_numeric is either a rejected value or a real NaN; only those positions need the scalar check
+    for position in np.flatnonzero(~valid):
+        try:
+            value = float(values.iat[position])
+        except (ValueError, TypeError):
+            continue
+        floats[position] = value
+        valid[position] = True
+    return floats, valid
+
 class CategorizationService:
     def categorize(self, data: dict) -> str:
         """
@@ -34,3 +56,39 @@ class CategorizationService:
             return "Slow Grower"
         else:
             return "Cyclical"
+
+    def categorize_many(self, infos: Mapping[str, dict] | Iterable[dict] | pd.DataFrame) -> pd.Series:
+        """
+        Vectorized ``categorize`` over many ``info`` records: a ``{ticker: info}``
+        mapping, a list of info dicts, or a frame with ``revenueGrowth`` and
+        ``trailingPE`` columns (where NaN means missing). Returns the labels as
+        a Series aligned with the input, identical to calling ``categorize`` on
+        each record.
+        """
+        if isinstance(infos, pd.DataFrame):
+            index = infos.index
+            missing = pd.Series(None, index=index, dtype=object)
+            growth = infos.get("revenueGrowth", missing).astype(object)
+            pe_ratio = infos.get("trailingPE", missing).astype(object)
+        else:
+            if not isinstance(infos, Mapping):
+                infos = dict(enumerate(infos))
+            index = list(infos)
+            # Object dtype keeps None (missing) apart from a NaN value, which float() accepts
+            growth = pd.Series([(info or {}).get("revenueGrowth") for info in infos.values()], index=index, dtype=object)
+            pe_ratio = pd.Series([(info or {}).get("trailingPE") for info in infos.values()], index=index, dtype=object)
+        growth, growth_valid = _coerce_floats(growth)
+        pe_ratio, pe_valid = _coerce_floats(pe_ratio)
+        if isinstance(infos, pd.DataFrame):
+            # A frame cannot tell missing from NaN; its NaN cells are missing values
+            growth_valid &= ~np.isnan(growth)
+            pe_valid &= ~np.isnan(pe_ratio)
+
+        # Comparisons with NaN are False, as in the scalar branches
+        turnaround = ~growth_valid | ~pe_valid | (pe_ratio == 0) | (pe_ratio > 40)
+        categories = np.select(
+            [turnaround, growth > 0.20, growth > 0.10, growth > 0],
+            ["Turnaround or Asset Play", "Fast Grower", "Stalwart", "Slow Grower"],
+            default="Cyclical",
+        )
+        return pd.Series(categories, index=index, name="category", dtype=object)
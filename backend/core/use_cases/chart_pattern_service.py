@@ -0,0 +1,220 @@
+"""
+Cup-with-handle bases, pivots and breakouts (the "N" and "S" in CAN SLIM).
+
+The OHLCV bars of the whole universe are aligned into date x ticker matrices.
+Every rule is then a rolling-window or elementwise operation over those
+matrices, so each session of each ticker is evaluated in the same pass. The
+only Python loop is over the candidate base lengths.
+
+A session ``t`` ends a cup-with-handle base of ``length`` sessions when:
+  * the left lip (highest high of the base's first third) is the top of the
+    cup, and it is at least ``MIN_PRIOR_ADVANCE`` above the lowest low of the
+    ``PRIOR_SESSIONS`` before the base (a prior uptrend);
+  * the cup (the base without the handle) is ``MIN_CUP_DEPTH`` to
+    ``MAX_CUP_DEPTH`` deep;
+  * the handle (the last ``HANDLE_SESSIONS``) tops out in its first half,
+    within ``MAX_PIVOT_DISCOUNT`` below the left lip, drifts down no more
+    than ``MAX_HANDLE_DEPTH`` and stays in the upper half of the cup.
+The pivot (buy point) is the handle's high. A breakout is the first close
+above the previous session's pivot. It is volume-confirmed when volume is at
+least ``MIN_BREAKOUT_VOLUME`` above the ``VOLUME_AVERAGE_SESSIONS`` average.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..infrastructure.yfinance_repository import YahooFinanceRepository
+
+OHLCV = ("High", "Low", "Close", "Volume")
+CUP_LENGTHS = (35, 50, 65, 90, 130) # 7 to 26 weeks, shortest preferred
+HANDLE_SESSIONS = 10
+PRIOR_SESSIONS = 63
+MIN_PRIOR_ADVANCE = 0.30
+MIN_CUP_DEPTH = 0.12
+MAX_CUP_DEPTH = 0.35
+MAX_HANDLE_DEPTH = 0.12
+MAX_PIVOT_DISCOUNT = 0.10
+VOLUME_AVERAGE_SESSIONS = 50
+MIN_BREAKOUT_VOLUME = 0.5 # Breakout volume at least 50% above average
+RECENT_BREAKOUT_SESSIONS = 5
+
+BASE_COLUMNS = ["as_of", "base_sessions", "left_high", "cup_low", "depth", "pivot", "close", "pivot_distance"]
+BREAKOUT_COLUMNS = ["ticker", "date", "pivot", "close", "volume_ratio", "volume_confirmed", "base_sessions", "depth"]
+
+
+@dataclass(frozen=True)
+class PatternScan:
+    bases: pd.DataFrame # Tickers in a base as of their last session, indexed by ticker
+    breakouts: pd.DataFrame # Every breakout in the scanned history, oldest first
+
+
+def ohlcv_matrices(histories: Mapping[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """``{field: date x ticker matrix}`` for ``OHLCV``; histories without a date index or a field are left out."""
+    tickers, days, values = [], [], []
+    for ticker, history in histories.items():
+        if not isinstance(history, pd.DataFrame) or history.empty or not isinstance(history.index, pd.DatetimeIndex):
+            continue
+        if not set(OHLCV).issubset(history.columns):
+            continue
+        # Exchange-local session dates, as in relative_strength_service
+        index = history.index.tz_localize(None) if history.index.tz is not None else history.index
+        sessions = index.to_numpy().astype("datetime64[D]")
+        last_of_day = np.append(sessions[1:] != sessions[:-1], True)
+        tickers.append(ticker)
+        days.append(sessions[last_of_day])
+        values.append(np.column_stack([history[field].to_numpy(dtype="float64") for field in OHLCV])[last_of_day])
+    dates = np.unique(np.concatenate(days)) if days else np.array([], dtype="datetime64[D]")
+    matrix = np.full((len(OHLCV), len(dates), len(tickers)), np.nan)
+    # One assignment per ticker; aligning thousands of frames with pd.concat is much slower
+    for column, (sessions, bars) in enumerate(zip(days, values)):
+        matrix[:, np.searchsorted(dates, sessions), column] = bars.T
+    index, columns = pd.DatetimeIndex(dates.astype("datetime64[ns]")), pd.Index(tickers)
+    return {field: pd.DataFrame(matrix[i], index=index, columns=columns) for i, field in enumerate(OHLCV)}
+
+
+def _shift(values: np.ndarray, lag: int) -> np.ndarray:
+    """Rows moved down by ``lag``, NaN-filled at the top."""
+    if lag == 0:
+        return values
+    shifted = np.full_like(values, np.nan)
+    shifted[lag:] = values[:-lag]
+    return shifted
+
+
+def _rolling(values: np.ndarray, window: int, lag: int, how: str) -> np.ndarray:
+    """
+    Max/min over the ``window`` rows ending ``lag`` rows before each row; NaN
+    if any of them is missing. Built from doubling power-of-two blocks, so the
+    cost is O(rows x columns x log(window)).
+    """
+    reduce = np.maximum if how == "max" else np.minimum # Both propagate NaN
+    blocks, span = values, 1
+    while span * 2 <= window:
+        blocks = reduce(blocks, _shift(blocks, span))
+        span *= 2
+    return _shift(reduce(blocks, _shift(blocks, window - span)), lag)
+
+
+def _previous(values: np.ndarray) -> np.ndarray:
+    return _shift(values, 1)
+
+
+def cup_with_handle(high: pd.DataFrame, low: pd.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Date x ticker arrays describing the base each session ends, if any:
+    ``found``, ``base_sessions``, ``left_high``, ``cup_low``, ``depth`` and ``pivot``.
+    """
+    high, low = high.to_numpy(), low.to_numpy()
+    shape = high.shape
+    handle_high = _rolling(high, HANDLE_SESSIONS, 0, "max")
+    handle_low = _rolling(low, HANDLE_SESSIONS, 0, "min")
+    # A handle drifts down or sideways: a right side still rising into session t is not one
+    handle_start_high = _rolling(high, HANDLE_SESSIONS // 2, HANDLE_SESSIONS - HANDLE_SESSIONS // 2, "max")
+    found = np.zeros(shape, dtype=bool)
+    base_sessions = np.zeros(shape, dtype=int)
+    left_high = np.full(shape, np.nan)
+    cup_low = np.full(shape, np.nan)
+    for length in CUP_LENGTHS:
+        third = length // 3
+        left = _rolling(high, third, length - third, "max")
+        cup_high = _rolling(high, length - HANDLE_SESSIONS, HANDLE_SESSIONS, "max")
+        bottom = _rolling(low, length - HANDLE_SESSIONS, HANDLE_SESSIONS, "min")
+        prior_low = _rolling(low, PRIOR_SESSIONS, length, "min")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            depth = 1 - bottom / left
+            valid = (
+                (cup_high <= left)
+                & (left >= prior_low * (1 + MIN_PRIOR_ADVANCE))
+                & (depth >= MIN_CUP_DEPTH) & (depth <= MAX_CUP_DEPTH)
+                & (handle_high <= left) & (handle_high >= left * (1 - MAX_PIVOT_DISCOUNT))
+                & (handle_start_high >= handle_high)
+                & (handle_low >= handle_high * (1 - MAX_HANDLE_DEPTH))
+                & (handle_low >= (left + bottom) / 2)
+            )
+        new = valid & ~found
+        base_sessions[new] = length
+        left_high[new] = left[new]
+        cup_low[new] = bottom[new]
+        found |= valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        depth = 1 - cup_low / left_high
+    return {
+        "found": found,
+        "base_sessions": base_sessions,
+        "left_high": left_high,
+        "cup_low": cup_low,
+        "depth": depth,
+        "pivot": np.where(found, handle_high, np.nan),
+    }
+
+
+def scan_patterns(histories: Mapping[str, pd.DataFrame]) -> PatternScan:
+    """Current bases and all breakouts of every ticker with OHLCV history."""
+    matrices = ohlcv_matrices(histories)
+    close = matrices["Close"]
+    if close.empty:
+        return PatternScan(pd.DataFrame(columns=BASE_COLUMNS), pd.DataFrame(columns=BREAKOUT_COLUMNS))
+    base = cup_with_handle(matrices["High"], matrices["Low"])
+    closes = close.to_numpy()
+    volume = matrices["Volume"]
+    average_volume = _previous(volume.rolling(VOLUME_AVERAGE_SESSIONS, min_periods=VOLUME_AVERAGE_SESSIONS).mean().to_numpy())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = np.where(average_volume > 0, volume.to_numpy() / average_volume, np.nan)
+
+    # A breakout clears the pivot of the base that ended the session before
+    pivot = _previous(base["pivot"])
+    breakout = (closes > pivot) & (_previous(closes) <= pivot)
+    rows, columns = np.nonzero(breakout) # Row-major, so oldest first
+    base_sessions = _previous(base["base_sessions"].astype("float64"))
+    depth = _previous(base["depth"])
+    ratio = volume_ratio[rows, columns]
+    breakouts = pd.DataFrame({
+        "ticker": close.columns[columns],
+        "date": close.index[rows],
+        "pivot": pivot[rows, columns],
+        "close": closes[rows, columns],
+        "volume_ratio": ratio,
+        "volume_confirmed": ratio >= 1 + MIN_BREAKOUT_VOLUME,
+        "base_sessions": base_sessions[rows, columns].astype(int),
+        "depth": depth[rows, columns],
+    }, columns=BREAKOUT_COLUMNS)
+
+    # Each ticker's last session with a close: tickers can end on different days
+    last = len(closes) - 1 - np.argmax(~np.isnan(closes[::-1]), axis=0)
+    tickers = np.arange(closes.shape[1])
+    in_base = base["found"][last, tickers]
+    last, tickers = last[in_base], tickers[in_base]
+    bases = pd.DataFrame({
+        "as_of": close.index[last],
+        "base_sessions": base["base_sessions"][last, tickers],
+        "left_high": base["left_high"][last, tickers],
+        "cup_low": base["cup_low"][last, tickers],
+        "depth": base["depth"][last, tickers],
+        "pivot": base["pivot"][last, tickers],
+        "close": closes[last, tickers],
+    }, index=close.columns[tickers])
+    bases["pivot_distance"] = bases["close"] / bases["pivot"] - 1
+    return PatternScan(bases, breakouts)
+
+
+def recent_breakout(scan: PatternScan, ticker: str, as_of: pd.Timestamp) -> pd.Series | None:
+    """The ticker's latest breakout within ``RECENT_BREAKOUT_SESSIONS`` sessions (by business day) of ``as_of``."""
+    breakouts = scan.breakouts[scan.breakouts["ticker"] == ticker]
+    if breakouts.empty:
+        return None
+    latest = breakouts.iloc[-1]
+    sessions = np.busday_count(latest["date"].date(), pd.Timestamp(as_of).date())
+    return latest if sessions < RECENT_BREAKOUT_SESSIONS else None
+
+
+class ChartPatternService:
+    def __init__(self, yfinance_repo: YahooFinanceRepository | None = None):
+        self.yfinance_repo = yfinance_repo or YahooFinanceRepository()
+
+    def scan(self, tickers: Iterable[str]) -> PatternScan:
+        """Scan the tickers' cached price history."""
+        bundles = self.yfinance_repo.get_all_data_many(tickers, fields=["history"])
+        return scan_patterns({ticker: bundle.get("history") for ticker, bundle in bundles.items() if bundle})
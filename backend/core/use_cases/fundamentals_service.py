@@ -0,0 +1,106 @@
+"""
+Quarterly EPS and sales growth, acceleration and consistency (the "C" in
+CAN SLIM) for the whole universe.
+
+The metrics are array operations over the ``FundamentalsPanel``. Growth is
+measured against the same quarter a year earlier, which is four panel
+columns back. A negative base uses its absolute value, so a smaller loss
+counts as growth. Acceleration is how much the latest quarter's year-over-year
+growth changed from the quarter before. Consistency is the share of
+measurable quarters that grew year over year.
+
+``FundamentalsService.panel`` memory-maps the persisted panel. It only reparses
+tickers that are missing from the panel or whose ``quarterly_financials``
+checksum in the cache manifest changed.
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from ..infrastructure.fundamentals_panel import FUNDAMENTALS_PANEL_PATH, FundamentalsPanel
+from ..infrastructure.yfinance_cache import get_manifest
+from ..infrastructure.yfinance_repository import YahooFinanceRepository
+from backend.logger import logger
+
+YOY_LAG = 4 # Quarters back to the same quarter a year earlier
+GROWTH_COLUMNS = (
+    "eps_qoq",
+    "eps_yoy",
+    "eps_acceleration",
+    "eps_consistency",
+    "sales_qoq",
+    "sales_yoy",
+    "sales_acceleration",
+    "sales_consistency",
+)
+
+
+def growth(current: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """Elementwise ``(current - base) / |base|``; NaN where either is missing or the base is zero."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(base != 0, (current - base) / np.abs(base), np.nan)
+
+
+def _series_metrics(values: np.ndarray) -> tuple[np.ndarray, ...]:
+    """``(qoq, yoy, acceleration, consistency)`` of a ``(tickers, quarters)`` array, newest quarter first."""
+    qoq = growth(values[:, 0], values[:, 1])
+    yoy = growth(values[:, :-YOY_LAG], values[:, YOY_LAG:]) # (tickers, quarters - YOY_LAG)
+    acceleration = yoy[:, 0] - yoy[:, 1]
+    measured = (~np.isnan(yoy)).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        consistency = np.where(measured > 0, (yoy > 0).sum(axis=1) / measured, np.nan)
+    return qoq, yoy[:, 0], acceleration, consistency
+
+
+def growth_metrics(panel: FundamentalsPanel) -> pd.DataFrame:
+    """``GROWTH_COLUMNS`` for every ticker in the panel, one row per ticker."""
+    diluted = panel.item("Diluted EPS")
+    eps = np.where(np.isnan(diluted), panel.item("Basic EPS"), diluted)
+    columns = _series_metrics(eps) + _series_metrics(panel.item("Total Revenue"))
+    return pd.DataFrame(dict(zip(GROWTH_COLUMNS, columns)), index=pd.Index(panel.tickers), dtype="float64")
+
+
+class FundamentalsService:
+    def __init__(self, yfinance_repo: YahooFinanceRepository | None = None, panel_path: str = FUNDAMENTALS_PANEL_PATH):
+        self.yfinance_repo = yfinance_repo or YahooFinanceRepository()
+        self.panel_path = panel_path
+        self._panel: FundamentalsPanel | None = None
+
+    def panel(self, tickers: Iterable[str]) -> FundamentalsPanel:
+        """Panel rows for ``tickers``, parsing only the statements that changed since the panel was saved."""
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        if self._panel is None:
+            self._panel = FundamentalsPanel.load(self.panel_path)
+        checksums = self._statement_checksums()
+        stale = [
+            ticker for ticker in tickers
+            if self._panel is None or ticker not in self._panel or self._panel.sources.get(ticker) != checksums.get(ticker)
+        ]
+        if stale:
+            bundles = self.yfinance_repo.get_all_data_many(stale, fields=["quarterly_financials"])
+            # Loading may have fetched statements, so checksums are read again. Tickers without
+            # data get NaN rows under their (possibly None) checksum, so they are not fetched
+            # again on every call, only once the manifest records a new statement for them.
+            checksums = self._statement_checksums()
+            rebuilt = FundamentalsPanel.from_bundles(bundles, {ticker: checksums.get(ticker) for ticker in bundles})
+            self._panel = rebuilt if self._panel is None else self._panel.merge(rebuilt)
+            try:
+                self._panel.save(self.panel_path)
+            except OSError as e:
+                logger.warning(f"Could not save the fundamentals panel to {self.panel_path}: {e}")
+        if self._panel is None:
+            return FundamentalsPanel.from_bundles({})
+        return self._panel.select(tickers)
+
+    def metrics(self, tickers: Iterable[str]) -> pd.DataFrame:
+        return growth_metrics(self.panel(tickers))
+
+    @staticmethod
+    def _statement_checksums() -> dict[str, str]:
+        return {
+            entry["ticker"]: entry["checksum"]
+            for entry in get_manifest().entries()
+            if entry["dataset"] == "quarterly_financials"
+        }
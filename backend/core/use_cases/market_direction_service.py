@@ -0,0 +1,199 @@
+"""
+Market direction (the "M" in CAN SLIM) across several indexes.
+
+Each index gets an ``IndexTracker`` that keeps its rolling state incrementally:
+running sums for the 50/200-day moving averages, the distribution days of the
+last ``DISTRIBUTION_WINDOW`` sessions and the current rally attempt. A new bar
+costs O(1). The latest bar is held provisionally, so intraday updates of the
+current session replace it instead of being counted twice; it is committed
+once a bar for a later session arrives.
+
+Regime rules, after O'Neil:
+  * A distribution day closes down ``DISTRIBUTION_DECLINE`` or more on higher
+    volume than the previous session.
+  * In a correction, the first up close after the lowest close starts a rally
+    attempt. A close below that low resets it. From day ``FOLLOW_THROUGH_MIN_DAY``,
+    a gain of ``FOLLOW_THROUGH_GAIN`` on higher volume is a follow-through day.
+    It confirms a new uptrend and starts a fresh distribution count.
+  * In an uptrend, ``PRESSURE_DISTRIBUTION_DAYS`` put it under pressure and
+    ``CORRECTION_DISTRIBUTION_DAYS`` end it.
+
+The overall signal is the median regime of the tracked indexes.
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ..entities.models import IndexState, MarketRegime, MarketRegimeSignal
+from ..infrastructure.economic_data_repository import EconomicDataRepository
+
+DEFAULT_INDEXES = ("^GSPC", "^IXIC", "^RUT") # S&P 500, Nasdaq Composite, Russell 2000
+DISTRIBUTION_WINDOW = 25 # Sessions a distribution day stays on the count
+DISTRIBUTION_DECLINE = 0.002
+FOLLOW_THROUGH_MIN_DAY = 4
+FOLLOW_THROUGH_GAIN = 0.0125
+PRESSURE_DISTRIBUTION_DAYS = 4
+CORRECTION_DISTRIBUTION_DAYS = 6
+SHORT_MA = 50
+LONG_MA = 200
+
+_REGIME_ORDER = list(MarketRegime)
+
+
+class _RollingWindow:
+    """Fixed-length window with a running sum; ``peek_*`` show the effect of one more value without adding it."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.values: deque = deque()
+        self.total = 0.0
+
+    def _evicted(self) -> float:
+        return self.values[0] if len(self.values) == self.length else 0.0
+
+    def peek_sum(self, value: float) -> float:
+        return self.total - self._evicted() + value
+
+    def peek_mean(self, value: float) -> float | None:
+        count = min(len(self.values) + 1, self.length)
+        return self.peek_sum(value) / count if count == self.length else None
+
+    def push(self, value: float):
+        self.total -= self._evicted()
+        if len(self.values) == self.length:
+            self.values.popleft()
+        self.values.append(value)
+        self.total += value
+
+    def clear(self):
+        self.values.clear()
+        self.total = 0.0
+
+
+class IndexTracker:
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._short_ma = _RollingWindow(SHORT_MA)
+        self._long_ma = _RollingWindow(LONG_MA)
+        self._distribution = _RollingWindow(DISTRIBUTION_WINDOW)
+        # State as of the last committed bar
+        self._previous: tuple[datetime, float, float] | None = None
+        self._regime = MarketRegime.CORRECTION
+        self._rally_low: float | None = None
+        self._rally_day = 0
+        # Latest bar, which may still be revised by an intraday update
+        self._pending: tuple[datetime, float, float] | None = None
+        self._state: IndexState | None = None
+
+    @property
+    def last_timestamp(self) -> datetime | None:
+        return self._pending[0] if self._pending else None
+
+    @property
+    def state(self) -> IndexState | None:
+        return self._state
+
+    def push(self, timestamp: datetime, close: float, volume: float) -> IndexState | None:
+        """Add a bar, or replace the latest one if ``timestamp`` is the same session. Older bars are ignored."""
+        if self._pending is not None:
+            if timestamp < self._pending[0]:
+                return self._state
+            if timestamp > self._pending[0]:
+                self._commit()
+        self._pending = (timestamp, float(close), float(volume))
+        self._state = self._evaluate()[0]
+        return self._state
+
+    def _evaluate(self) -> tuple[IndexState, bool, float | None, int]:
+        """The state after the pending bar, computed from the committed state without changing it."""
+        timestamp, close, volume = self._pending
+        distribution = follow_through = False
+        regime, rally_low, rally_day = self._regime, self._rally_low, self._rally_day
+        if self._previous is None:
+            rally_low = close
+        else:
+            _, previous_close, previous_volume = self._previous
+            change = close / previous_close - 1 if previous_close else 0.0
+            higher_volume = volume > previous_volume
+            distribution = change <= -DISTRIBUTION_DECLINE and higher_volume
+            if regime is MarketRegime.CORRECTION:
+                if rally_low is None or close < rally_low:
+                    rally_low, rally_day = close, 0
+                elif rally_day or change > 0:
+                    rally_day += 1
+                follow_through = rally_day >= FOLLOW_THROUGH_MIN_DAY and change >= FOLLOW_THROUGH_GAIN and higher_volume
+        distribution_days = int(self._distribution.peek_sum(float(distribution)))
+
+        if follow_through:
+            regime, rally_low, rally_day, distribution_days = MarketRegime.CONFIRMED_UPTREND, None, 0, 0
+        elif regime is not MarketRegime.CORRECTION:
+            if distribution_days >= CORRECTION_DISTRIBUTION_DAYS:
+                regime, rally_low, rally_day = MarketRegime.CORRECTION, close, 0
+            elif distribution_days >= PRESSURE_DISTRIBUTION_DAYS:
+                regime = MarketRegime.UNDER_PRESSURE
+            else:
+                regime = MarketRegime.CONFIRMED_UPTREND
+
+        state = IndexState(
+            symbol=self.symbol,
+            as_of=timestamp,
+            close=close,
+            regime=regime,
+            distribution_days=distribution_days,
+            rally_day=rally_day,
+            follow_through=follow_through,
+            ma50=self._short_ma.peek_mean(close),
+            ma200=self._long_ma.peek_mean(close),
+        )
+        return state, distribution, rally_low, rally_day
+
+    def _commit(self):
+        state, distribution, rally_low, rally_day = self._evaluate()
+        _, close, _ = self._pending
+        self._short_ma.push(close)
+        self._long_ma.push(close)
+        if state.follow_through:
+            # A confirmed uptrend starts a fresh count (at most DISTRIBUTION_WINDOW entries)
+            self._distribution.clear()
+        self._distribution.push(float(distribution and not state.follow_through))
+        self._regime, self._rally_low, self._rally_day = state.regime, rally_low, rally_day
+        self._previous = self._pending
+
+
+class MarketDirectionService:
+    """Keeps one ``IndexTracker`` per index and feeds it only the bars it has not seen."""
+
+    def __init__(self, economic_repo: EconomicDataRepository | None = None, symbols=DEFAULT_INDEXES):
+        self.economic_repo = economic_repo or EconomicDataRepository()
+        self.trackers = {symbol: IndexTracker(symbol) for symbol in symbols}
+
+    def update(self, symbol: str, bars: pd.DataFrame) -> IndexState | None:
+        """Feed daily ``Close``/``Volume`` bars; only those from the tracker's latest session on are processed."""
+        tracker = self.trackers.setdefault(symbol, IndexTracker(symbol))
+        if tracker.last_timestamp is not None:
+            last = pd.Timestamp(tracker.last_timestamp)
+            if bars.index.tz is not None and last.tz is None:
+                last = last.tz_localize(bars.index.tz)
+            bars = bars.iloc[bars.index.searchsorted(last):]
+        for timestamp, close, volume in zip(bars.index, bars["Close"], bars["Volume"]):
+            tracker.push(timestamp, close, volume)
+        return tracker.state
+
+    def refresh(self, max_age: timedelta | None = None) -> MarketRegimeSignal | None:
+        """Top up every index from the local history store (see ``get_index_history``) and return the signal."""
+        for symbol in self.trackers:
+            self.update(symbol, self.economic_repo.get_index_history(symbol, max_age=max_age))
+        return self.signal()
+
+    def signal(self) -> MarketRegimeSignal | None:
+        states = {symbol: tracker.state for symbol, tracker in self.trackers.items() if tracker.state is not None}
+        if not states:
+            return None
+        ranks = sorted(_REGIME_ORDER.index(state.regime) for state in states.values())
+        return MarketRegimeSignal(
+            as_of=max(state.as_of for state in states.values()),
+            regime=_REGIME_ORDER[ranks[(len(ranks) - 1) // 2]],
+            indexes=states,
+        )
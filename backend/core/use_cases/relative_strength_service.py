@@ -0,0 +1,152 @@
+"""
+O'Neil-style Relative Strength rating ("L" in CAN SLIM), 1-99.
+
+Closing prices of the whole universe are kept as one date x ticker matrix of
+the last ``MATRIX_SESSIONS`` sessions. A ticker's score is its weighted
+3/6/9/12-month price performance, with the latest quarter counted double.
+The rating is the score's percentile rank across the universe. Tickers with
+less than a year of bars are measured from their first bar. Tickers with
+fewer than ``MIN_SESSIONS`` bars get no rating, and no ticker is rated while
+fewer than ``MIN_RANKING_UNIVERSE`` tickers have a score to rank against.
+
+``RelativeStrengthService.universe_ratings`` ranks against every ticker in
+the Yahoo Finance cache, so a rating does not depend on which tickers a
+caller happened to ask about.
+
+``RelativeStrengthService.update`` only merges bars from the matrix's last
+session on, and ratings are cached per trading day until a bar for that day
+changes.
+"""
+
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..infrastructure.yfinance_repository import YahooFinanceRepository
+
+LOOKBACKS = (63, 126, 189, 252) # Sessions in ~3, 6, 9 and 12 months
+WEIGHTS = (0.4, 0.2, 0.2, 0.2)
+MATRIX_SESSIONS = LOOKBACKS[-1] + 1
+MIN_SESSIONS = LOOKBACKS[0] + 1
+MIN_RANKING_UNIVERSE = 20 # Fewer scored tickers than this give no meaningful percentile
+
+
+def _session_dates(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    # Exchange-local calendar dates, so tickers from different time zones share rows
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def close_matrix(histories: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    """Date x ticker matrix of closing prices; tickers without bars are left out."""
+    columns = {
+        ticker: pd.Series(history["Close"].to_numpy(dtype="float64"), index=_session_dates(history.index))
+        for ticker, history in histories.items()
+        if isinstance(history, pd.DataFrame) and not history.empty
+    }
+    if not columns:
+        return pd.DataFrame(dtype="float64")
+    closes = pd.DataFrame(columns)
+    return closes[~closes.index.duplicated(keep="last")].sort_index()
+
+
+def weighted_performance(closes: pd.DataFrame) -> pd.Series:
+    """Weighted 3/6/9/12-month return of each column as of the last row."""
+    values = closes.ffill().to_numpy()
+    n_sessions, n_tickers = values.shape
+    if not n_sessions:
+        return pd.Series(np.nan, index=closes.columns)
+    first_bar = np.argmax(~np.isnan(values), axis=0)
+    columns = np.arange(n_tickers)
+    last = values[-1]
+    score = np.zeros(n_tickers)
+    for lookback, weight in zip(LOOKBACKS, WEIGHTS):
+        base = values[np.maximum(n_sessions - 1 - lookback, first_bar), columns]
+        score += weight * (last / base - 1)
+    score[n_sessions - first_bar < MIN_SESSIONS] = np.nan
+    return pd.Series(score, index=closes.columns)
+
+
+def rs_ratings(scores: pd.Series) -> pd.Series:
+    """Percentile rank of each score as a 1-99 rating; missing scores stay missing."""
+    if scores.notna().sum() < MIN_RANKING_UNIVERSE:
+        return pd.Series(pd.NA, index=scores.index, name="rs_rating", dtype="Int64")
+    percentile = scores.rank(pct=True).to_numpy()
+    ratings = np.clip(np.ceil(percentile * 99), 1, 99)
+    return pd.Series(ratings, index=scores.index, name="rs_rating").astype("Int64")
+
+
+class RelativeStrengthService:
+    def __init__(self, yfinance_repo: YahooFinanceRepository | None = None):
+        self.yfinance_repo = yfinance_repo or YahooFinanceRepository()
+        self._closes = pd.DataFrame(dtype="float64")
+        self._ratings: dict[pd.Timestamp, pd.Series] = {}
+        self._synced: dict[str, object] = {} # Ticker -> history fetch time last merged from the cache
+
+    @property
+    def closes(self) -> pd.DataFrame:
+        return self._closes
+
+    def update(self, histories: Mapping[str, pd.DataFrame]):
+        """Merge new bars. Known tickers contribute only bars from the matrix's last session on."""
+        last_session = self._closes.index[-1] if len(self._closes) else None
+        recent = {}
+        for ticker, history in histories.items():
+            if not isinstance(history, pd.DataFrame) or history.empty:
+                continue
+            if last_session is not None and ticker in self._closes.columns:
+                history = history.iloc[_session_dates(history.index).searchsorted(last_session):]
+            recent[ticker] = history
+        new = close_matrix(recent)
+        if new.empty:
+            return
+        closes = self._closes.reindex(
+            index=self._closes.index.union(new.index),
+            columns=self._closes.columns.union(new.columns),
+        )
+        closes.update(new)
+        self._closes = closes.iloc[-MATRIX_SESSIONS:]
+        # A revised or added bar invalidates the ratings of its day and every later one
+        first_changed = new.index[0]
+        self._ratings = {day: ratings for day, ratings in self._ratings.items() if day < first_changed}
+
+    def ratings(self, as_of: pd.Timestamp | None = None) -> pd.Series:
+        """RS ratings of every ticker in the matrix as of ``as_of`` (default: the latest session)."""
+        closes = self._closes if as_of is None else self._closes.loc[:pd.Timestamp(as_of)]
+        if closes.empty:
+            return pd.Series(dtype="Int64", name="rs_rating")
+        day = closes.index[-1]
+        if day not in self._ratings:
+            self._ratings[day] = rs_ratings(weighted_performance(closes))
+        return self._ratings[day]
+
+    def sync_cached_universe(self):
+        """
+        Merge the price history of every cached ticker whose history was
+        fetched since the last sync, without any network access, and drop
+        tickers that are no longer cached.
+        """
+        fetch_times = self.yfinance_repo.cached_fetch_times("history")
+        changed = [ticker for ticker, fetched_at in fetch_times.items() if self._synced.get(ticker) != fetched_at]
+        if changed:
+            bundles = self.yfinance_repo.get_cached_many(changed, fields=["history"])
+            self.update({ticker: bundle.get("history") for ticker, bundle in bundles.items() if bundle})
+        gone = self._closes.columns.intersection([ticker for ticker in self._synced if ticker not in fetch_times])
+        if len(gone):
+            self._closes = self._closes.drop(columns=gone)
+            self._ratings = {}
+        self._synced = fetch_times
+
+    def universe_ratings(self) -> pd.Series:
+        """RS ratings ranked against the whole cached universe."""
+        self.sync_cached_universe()
+        return self.ratings()
+
+    def ratings_for(self, tickers: Iterable[str]) -> pd.Series:
+        """Load the tickers' price history (refreshing it if stale) and rate them against the whole cached universe."""
+        tickers = list(tickers)
+        bundles = self.yfinance_repo.get_all_data_many(tickers, fields=["history"])
+        self.update({ticker: bundle.get("history") for ticker, bundle in bundles.items() if bundle})
+        return self.universe_ratings().reindex(tickers)
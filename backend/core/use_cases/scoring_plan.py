@@ -0,0 +1,181 @@
+"""
+Weighted scoring plan compiled from ``docs/STOCK_SELECTION_FRAMEWORK.yaml``.
+
+Each criterion definition with a ``rule`` is compiled once into a function
+from a universe frame (one row per ticker, as built by ``universe_frame``) to
+a nullable boolean column. ``ScoringPlan.evaluate`` runs every compiled rule
+as a column operation and weights the results with a single matrix product,
+so changing thresholds or weights in the YAML needs no code change.
+
+A rule result is NA when one of its inputs is missing, including when the
+frame lacks the column entirely. NA counts as zero in ``score``. ``max_score``
+and ``coverage`` show how much of the plan's weight could be assessed.
+"""
+
+import operator
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from typing import Callable, Sequence
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from ..entities.candidate_table import STATUS_CODES, CandidateTable
+from ..entities.models import Company, Criterion, CriterionCategory, CriterionResult, ResultStatus
+
+FRAMEWORK_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "docs", "STOCK_SELECTION_FRAMEWORK.yaml"
+)
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "in": lambda values, allowed: values.isin(allowed),
+}
+SCORE_COLUMNS = ["score", "max_score", "coverage", "score_pct"]
+# Source citations such as `"..." [1]` after a quoted scalar are not valid YAML
+_CITATION = re.compile(r'(")\s*\[\d+\]\s*$', re.MULTILINE)
+
+Rule = Callable[[pd.DataFrame], pd.Series]
+
+
+@dataclass(frozen=True)
+class CompiledCriterion:
+    criterion: Criterion
+    weight: float
+    columns: tuple[str, ...] # Frame columns the rule reads
+    rule: Rule
+
+
+@dataclass(frozen=True)
+class PlanEvaluation:
+    results: pd.DataFrame # tickers x criteria, nullable boolean
+    scores: pd.DataFrame # SCORE_COLUMNS per ticker
+
+
+def _column(frame: pd.DataFrame, name: str) -> pd.Series:
+    return frame[name] if name in frame.columns else pd.Series(np.nan, index=frame.index, dtype="float64")
+
+
+def compile_rule(rule: dict) -> tuple[Rule, tuple[str, ...]]:
+    """``(function, columns read)`` for one rule definition; raises ValueError if it is malformed."""
+    for combinator, combine in (("all", operator.and_), ("any", operator.or_)):
+        if combinator in rule:
+            parts = [compile_rule(part) for part in rule[combinator]]
+            if not parts:
+                raise ValueError(f"'{combinator}' needs at least one rule")
+            columns = tuple(dict.fromkeys(column for _, part_columns in parts for column in part_columns))
+            # Kleene logic on the nullable booleans: False & NA is False, True & NA is NA
+            return (lambda frame: reduce(combine, (part(frame) for part, _ in parts))), columns
+    try:
+        column, op, value = rule["column"], OPERATORS[rule["op"]], rule["value"]
+    except KeyError as e:
+        raise ValueError(f"Invalid rule {rule!r}: missing or unknown {e}") from None
+    relative_to = rule.get("relative_to")
+
+    def evaluate(frame: pd.DataFrame) -> pd.Series:
+        values = _column(frame, column)
+        missing = values.isna()
+        threshold = value
+        if relative_to is not None:
+            base = _column(frame, relative_to)
+            threshold, missing = base * value, missing | base.isna()
+        return op(values, threshold).astype("boolean").mask(missing)
+
+    return evaluate, (column,) if relative_to is None else (column, relative_to)
+
+
+def _criterion(definition: dict) -> Criterion:
+    return Criterion(
+        id=definition["id"],
+        name=definition.get("name", definition["id"]),
+        category=CriterionCategory(definition["category"]),
+        description=definition.get("description", ""),
+    )
+
+
+class ScoringPlan:
+    def __init__(self, criteria: list[CompiledCriterion]):
+        self.criteria = {compiled.criterion.id: compiled for compiled in criteria}
+        self.weights = np.array([compiled.weight for compiled in criteria], dtype="float64")
+
+    @classmethod
+    def from_framework(cls, framework: dict) -> "ScoringPlan":
+        """Compile the ``criteria_definitions`` that have a rule."""
+        compiled = []
+        for definition in framework["spec"]["criteria_definitions"]:
+            if "rule" not in definition:
+                continue
+            rule, columns = compile_rule(definition["rule"])
+            compiled.append(CompiledCriterion(_criterion(definition), float(definition.get("weight", 0)), columns, rule))
+        return cls(compiled)
+
+    @property
+    def columns(self) -> set[str]:
+        """Every frame column the plan reads."""
+        return {column for compiled in self.criteria.values() for column in compiled.columns}
+
+    def evaluate(self, frame: pd.DataFrame) -> PlanEvaluation:
+        results = pd.DataFrame(
+            {criterion_id: compiled.rule(frame) for criterion_id, compiled in self.criteria.items()},
+            index=frame.index,
+        )
+        passed = results.fillna(False).to_numpy(dtype="float64")
+        assessed = results.notna().to_numpy(dtype="float64")
+        score, max_score = passed @ self.weights, assessed @ self.weights
+        total = self.weights.sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = pd.DataFrame({
+                "score": score,
+                "max_score": max_score,
+                "coverage": max_score / total if total else np.nan,
+                "score_pct": np.where(max_score > 0, score / max_score * 100, np.nan),
+            }, index=frame.index, columns=SCORE_COLUMNS)
+        return PlanEvaluation(results, scores)
+
+    def criterion_results(self, evaluation: PlanEvaluation, ticker: str) -> dict[str, CriterionResult]:
+        """One ticker's row of ``evaluation`` as ``CriterionResult`` objects; NA becomes PENDING."""
+        row = evaluation.results.loc[ticker]
+        statuses = {True: ResultStatus.PASS, False: ResultStatus.FAIL}
+        return {
+            criterion_id: CriterionResult(
+                criterion_id=criterion_id,
+                status=ResultStatus.PENDING if pd.isna(passed) else statuses[bool(passed)],
+                notes="" if not pd.isna(passed) else "Missing input: " + ", ".join(self.criteria[criterion_id].columns),
+            )
+            for criterion_id, passed in row.items()
+        }
+
+    def candidate_table(self, evaluation: PlanEvaluation, companies: Sequence[Company]) -> CandidateTable:
+        """
+        ``evaluation`` as a ``CandidateTable`` over ``companies`` (matched on
+        ticker), filled column by column; tickers not evaluated have no results.
+        """
+        table = CandidateTable(companies, self.criteria)
+        results = evaluation.results.reindex(index=table.tickers, columns=list(self.criteria))
+        evaluated = np.isin(table.tickers, evaluation.results.index)
+        missing = results.isna().to_numpy() & evaluated[:, None]
+        passed = results.fillna(False).to_numpy(dtype=bool)
+        codes = np.where(passed, STATUS_CODES[ResultStatus.PASS], STATUS_CODES[ResultStatus.FAIL])
+        codes = np.where(missing, STATUS_CODES[ResultStatus.PENDING], codes)
+        table.statuses[evaluated] = codes[evaluated]
+        for column, compiled in enumerate(self.criteria.values()):
+            table.note_codes[missing[:, column], column] = table.note_code("Missing input: " + ", ".join(compiled.columns))
+        return table
+
+
+def read_framework(path: str = FRAMEWORK_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(_CITATION.sub(r"\1", f.read()))
+
+
+@lru_cache(maxsize=None)
+def load_scoring_plan(path: str = FRAMEWORK_PATH) -> ScoringPlan:
+    """The plan compiled from the framework file, once per process."""
+    return ScoringPlan.from_framework(read_framework(path))
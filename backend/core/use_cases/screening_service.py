@@ -1,8 +1,147 @@
+"""
+Universe-wide quantitative screen.
+
+``universe_frame`` flattens the cached ``info`` fields and a few price-history
+aggregates of every ticker into one row per ticker. ``screen_universe`` then
+evaluates each criterion as a column operation over the whole frame and
+returns a boolean pass/fail matrix (tickers x criteria), so thousands of
+tickers are screened in a single vectorized pass and only the survivors need
+to go on to the LLM.
+
+Criterion ids follow ``docs/STOCK_SELECTION_FRAMEWORK.yaml``, and each check
+is that criterion's compiled ``rule`` from the same file (see
+``scoring_plan``), so the screen, the backtest and the scoring plan share one
+set of thresholds. ``relative_strength`` needs an ``rs_rating`` column, which
+``ScreeningService.load_universe`` fills in by ranking against every cached
+ticker's price history. ``ScreeningService.score_tickers`` evaluates the
+framework's weighted scoring plan (see ``scoring_plan``) over the same frame.
+"""
+
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
 from ..entities.models import InvestmentCandidate
+from ..infrastructure.yfinance_repository import YahooFinanceRepository
+from .categorization_service import CategorizationService
+from .relative_strength_service import RelativeStrengthService
+from .scoring_plan import PlanEvaluation, ScoringPlan, load_scoring_plan
+from .valuation_service import ValuationService
+
+# Frame column -> key in the yfinance info dict
+INFO_COLUMNS = {
+    "revenue_growth": "revenueGrowth",
+    "trailing_pe": "trailingPE",
+    "peg_ratio": "pegRatio",
+    "eps_growth_quarterly": "earningsQuarterlyGrowth",
+    "return_on_equity": "returnOnEquity",
+    "market_cap": "marketCap",
+}
+HISTORY_COLUMNS = ("last_close", "high_52w", "last_volume", "avg_volume")
+
+# Criteria whose rule inputs are all columns of ``universe_frame``
+CRITERIA = (
+    "stock_category",
+    "peg_ratio",
+    "insider_activity",
+    "current_quarterly_eps",
+    "new_highs",
+    "supply_demand",
+    "relative_strength",
+)
+
+
+def _history_aggregates(history) -> tuple[float, float, float, float]:
+    if not isinstance(history, pd.DataFrame) or history.empty:
+        return (np.nan,) * 4
+    return (
+        history["Close"].iloc[-1],
+        history["High"].max(),
+        history["Volume"].iloc[-1],
+        history["Volume"].mean(),
+    )
+
+
+def universe_frame(bundles: Mapping[str, dict | None]) -> pd.DataFrame:
+    """
+    One row per ticker with the Lynch ``category`` and the numeric inputs of
+    every criterion; tickers without data are dropped.
+    """
+    rows = {}
+    infos = {}
+    for ticker, bundle in bundles.items():
+        info = (bundle or {}).get("info")
+        if not info:
+            continue
+        row = {column: info.get(key) for column, key in INFO_COLUMNS.items()}
+        row["insider_buys"] = (info.get("netSharePurchaseActivity") or {}).get("buyInfoCount", 0)
+        row.update(zip(HISTORY_COLUMNS, _history_aggregates(bundle.get("history"))))
+        rows[ticker] = row
+        infos[ticker] = info
+    columns = list(INFO_COLUMNS) + ["insider_buys"] + list(HISTORY_COLUMNS) + ["rs_rating"]
+    frame = pd.DataFrame.from_dict(rows, orient="index", columns=columns)
+    # Non-numeric values ("N/A", ...) become NaN and fail every threshold
+    frame = frame.apply(pd.to_numeric, errors="coerce").astype("float64")
+    # Categorized from the raw info so labels match CategorizationService exactly
+    frame.insert(0, "category", CategorizationService().categorize_many(infos).reindex(frame.index))
+    return frame
+
+
+def screen_universe(
+    frame: pd.DataFrame,
+    criteria_ids: Iterable[str] | None = None,
+    plan: ScoringPlan | None = None,
+) -> pd.DataFrame:
+    """
+    Boolean pass/fail matrix, tickers by criteria; missing inputs fail.
+    Each criterion is checked with its rule in ``plan`` (default: the framework file's).
+    """
+    plan = plan or load_scoring_plan()
+    criteria_ids = CRITERIA if criteria_ids is None else [c for c in criteria_ids if c in CRITERIA]
+    missing = [criterion for criterion in criteria_ids if criterion not in plan.criteria]
+    if missing:
+        raise ValueError(f"The scoring plan has no rule for screening criteria: {', '.join(missing)}")
+    return pd.DataFrame(
+        {criterion: plan.criteria[criterion].rule(frame).fillna(False).astype(bool) for criterion in criteria_ids},
+        index=frame.index,
+    )
+
+
+def survivors(matrix: pd.DataFrame) -> list[str]:
+    """Tickers passing every criterion in the matrix."""
+    return matrix.index[matrix.all(axis=1)].tolist()
+
 
 class ScreeningService:
+    def __init__(self, yfinance_repo: YahooFinanceRepository | None = None):
+        self.yfinance_repo = yfinance_repo or YahooFinanceRepository()
+        self.relative_strength = RelativeStrengthService(self.yfinance_repo)
+        self.valuation = ValuationService(self.yfinance_repo)
+
+    def load_universe(self, tickers: Iterable[str]) -> pd.DataFrame:
+        """Screening frame for ``tickers``, built from the cache (only info and price history are read)."""
+        bundles = self.yfinance_repo.get_all_data_many(tickers, fields=["info", "history"])
+        frame = universe_frame(bundles)
+        self.relative_strength.update({ticker: bundle.get("history") for ticker, bundle in bundles.items() if bundle})
+        # Ranked against the whole cache, never just the tickers asked about
+        frame["rs_rating"] = self.relative_strength.universe_ratings().reindex(frame.index).astype("float64")
+        return frame
+
+    def screen_tickers(self, tickers: Iterable[str], criteria_ids: Iterable[str] | None = None) -> pd.DataFrame:
+        return screen_universe(self.load_universe(tickers), criteria_ids)
+
+    def score_tickers(self, tickers: Iterable[str]) -> PlanEvaluation:
+        """The framework's weighted scoring plan over ``tickers``, with statement-derived EPS CAGR and net cash."""
+        tickers = list(tickers)
+        frame = self.load_universe(tickers)
+        fundamentals = self.valuation.value_tickers(tickers)[["eps_cagr", "net_cash"]]
+        return load_scoring_plan().evaluate(frame.join(fundamentals, how="left"))
+
     def screen(self, candidate: InvestmentCandidate, criteria_ids: list[str]) -> bool:
-        # This service would run quantitative screens.
-        # For now, it's a placeholder.
-        print(f"Screening {candidate.company.ticker} for {criteria_ids}...")
-        return True
+        """Whether one candidate passes the given criteria; ids this screen does not implement are ignored."""
+        criteria_ids = [c for c in criteria_ids if c in CRITERIA]
+        if not criteria_ids:
+            return True
+        matrix = self.screen_tickers([candidate.company.ticker], criteria_ids)
+        return bool(not matrix.empty and matrix.iloc[0].all())
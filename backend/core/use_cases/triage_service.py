@@ -0,0 +1,154 @@
+"""
+Deterministic pre-triage for the Lynch categorization step.
+
+The LLM step keeps only Fast Growers and Turnarounds. Cached ``info`` fields
+settle many tickers without it:
+  * a clear Fast Grower is profitable at a P/E of at most ``MAX_PE``, with
+    revenue and earnings both growing at ``FAST_GROWTH`` or more;
+  * a clear reject is profitable at a P/E of at most ``MAX_PE``, with revenue
+    growth between ``MIN_STEADY_GROWTH`` and ``MAX_STEADY_GROWTH`` and no
+    earnings drop worse than ``MIN_STEADY_EARNINGS_GROWTH``: a steady
+    Stalwart or Slow Grower, neither fast nor troubled enough to turn around.
+Everything else goes to the LLM: losses, missing data, rich valuations and
+borderline growth. Turnarounds are always left to the LLM. ``TriageService.categorize``
+merges both halves into the LLM step's ``{"fast_growers", "turnarounds"}`` shape.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..infrastructure.yfinance_repository import YahooFinanceRepository
+from backend.logger import logger
+
+MAX_PE = 40
+FAST_GROWTH = 0.20
+MAX_STEADY_GROWTH = 0.15
+MIN_STEADY_GROWTH = -0.10
+MIN_STEADY_EARNINGS_GROWTH = -0.20
+
+FAST_GROWER = "Fast Grower"
+REJECT = "Reject"
+AMBIGUOUS = "Ambiguous"
+
+
+@dataclass(frozen=True)
+class TriageResult:
+    fast_growers: list[dict] # {"ticker", "justification"}, as the LLM returns them
+    rejected: list[str]
+    ambiguous: list[str]
+
+
+def triage_frame(infos: Mapping[str, dict | None]) -> pd.DataFrame:
+    """One row per ticker with the triage inputs and its ``decision``."""
+    rows = {}
+    for ticker, info in infos.items():
+        info = info or {}
+        earnings = info.get("earningsQuarterlyGrowth")
+        rows[ticker] = {
+            "revenue_growth": info.get("revenueGrowth"),
+            "earnings_growth": earnings if earnings is not None else info.get("earningsGrowth"),
+            "trailing_pe": info.get("trailingPE"),
+        }
+    columns = ["revenue_growth", "earnings_growth", "trailing_pe"]
+    frame = pd.DataFrame.from_dict(rows, orient="index", columns=columns)
+    frame = frame.apply(pd.to_numeric, errors="coerce").astype("float64")
+    revenue, earnings, pe = frame["revenue_growth"], frame["earnings_growth"], frame["trailing_pe"]
+
+    # Comparisons with NaN are False, so missing inputs end up ambiguous
+    profitable = (pe > 0) & (pe <= MAX_PE)
+    fast = profitable & (revenue >= FAST_GROWTH) & (earnings >= FAST_GROWTH)
+    steady = (
+        profitable
+        & (revenue >= MIN_STEADY_GROWTH) & (revenue <= MAX_STEADY_GROWTH)
+        & (earnings >= MIN_STEADY_EARNINGS_GROWTH)
+    )
+    frame["decision"] = np.select([fast, steady], [FAST_GROWER, REJECT], default=AMBIGUOUS)
+    return frame
+
+
+def _justification(row: pd.Series) -> str:
+    return (
+        f"Pre-triage: revenue growth {row['revenue_growth']:.0%}, earnings growth {row['earnings_growth']:.0%}, "
+        f"trailing P/E {row['trailing_pe']:.1f}."
+    )
+
+
+def triage(infos: Mapping[str, dict | None]) -> TriageResult:
+    frame = triage_frame(infos)
+    decisions = frame["decision"]
+    return TriageResult(
+        fast_growers=[
+            {"ticker": ticker, "justification": _justification(row)}
+            for ticker, row in frame[decisions == FAST_GROWER].iterrows()
+        ],
+        rejected=frame.index[decisions == REJECT].tolist(),
+        ambiguous=frame.index[decisions == AMBIGUOUS].tolist(),
+    )
+
+
+def merge_categorization(result: TriageResult, llm_response: dict | None) -> dict:
+    """
+    The categorization step's response: pre-triaged Fast Growers plus the LLM's
+    picks among the ambiguous tickers. A failed LLM call is passed through as
+    is, so the client sees the error rather than a partial result.
+    """
+    if llm_response is not None and llm_response.get("format") == "error":
+        return llm_response
+    llm_content = (llm_response or {}).get("content")
+    if llm_response is not None and not isinstance(llm_content, dict):
+        logger.warning(f"LLM categorization returned no JSON ({llm_response.get('format')}); keeping the pre-triage only")
+        llm_content = {}
+    llm_content = llm_content or {}
+    ambiguous = set(result.ambiguous)
+    decided = {item["ticker"] for item in result.fast_growers}
+    llm_fast = [
+        item for item in llm_content.get("fast_growers", [])
+        if isinstance(item, dict) and item.get("ticker") in ambiguous and item["ticker"] not in decided
+    ]
+    llm_turnarounds = [
+        item for item in llm_content.get("turnarounds", [])
+        if isinstance(item, dict) and item.get("ticker") in ambiguous
+    ]
+    return {
+        "content": {
+            "fast_growers": result.fast_growers + llm_fast,
+            "turnarounds": llm_turnarounds,
+            "pre_triage": {
+                "fast_growers": [item["ticker"] for item in result.fast_growers],
+                "rejected": result.rejected,
+                "sent_to_llm": result.ambiguous,
+            },
+        },
+        "model": (llm_response or {}).get("model", "pre_triage"),
+        "format": "json",
+    }
+
+
+class TriageService:
+    def __init__(self, yfinance_repo: YahooFinanceRepository | None = None):
+        self.yfinance_repo = yfinance_repo or YahooFinanceRepository()
+
+    def triage(self, tickers: Iterable[str]) -> TriageResult:
+        """
+        Pre-triage ``tickers`` from their cached ``info``, whatever its age and
+        without fetching: tickers that are not cached are ambiguous.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        bundles = self.yfinance_repo.get_cached_many(tickers, fields=["info"])
+        return triage({ticker: (bundles.get(ticker) or {}).get("info") for ticker in tickers})
+
+    def categorize(self, tickers: Iterable[str], categorize_with_llm: Callable[[list[str]], dict]) -> dict:
+        """
+        Pre-triage ``tickers`` and send only the ambiguous ones to
+        ``categorize_with_llm`` (e.g. ``AIEvaluationService.categorize_and_filter_lynch``).
+        """
+        result = self.triage(tickers)
+        logger.info(
+            f"Pre-triage: {len(result.fast_growers)} Fast Growers, {len(result.rejected)} rejected, "
+            f"{len(result.ambiguous)} sent to the LLM"
+        )
+        llm_response = categorize_with_llm(result.ambiguous) if result.ambiguous else None
+        return merge_categorization(result, llm_response)
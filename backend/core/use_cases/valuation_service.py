@@ -1,8 +1,175 @@
+"""
+Valuation metrics derived from the cached statements.
+
+For each ticker the statement-derived fundamentals (the last four annual
+diluted EPS figures, trailing-twelve-month EPS from the last four quarters,
+annual EPS CAGR and net cash) are computed for the whole universe at once
+with array operations. They are memoized per ticker and fiscal period, so
+they are only recomputed once a new statement lands. Price-based metrics
+(trailing/forward P/E and PEG, a Lynch fair value at PEG 1) are recomputed on
+every call, also as array operations over the universe.
+"""
+
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
 from ..entities.models import InvestmentCandidate
+from ..infrastructure.yfinance_repository import YahooFinanceRepository
+
+ANNUAL_EPS_YEARS = 4 # Annual EPS figures used for the CAGR (three years of growth)
+EPS_ROWS = ("Diluted EPS", "Basic EPS")
+CASH_ROWS = ("Cash Cash Equivalents And Short Term Investments", "Cash And Cash Equivalents")
+DEBT_ROWS = ("Total Debt",)
+STATEMENT_FIELDS = ["info", "financials", "quarterly_financials", "balance_sheet"]
+FUNDAMENTAL_COLUMNS = ("ttm_eps", "eps_cagr", "net_cash")
+
+
+def _newest_first(frame, rows: Iterable[str]) -> np.ndarray:
+    """Values of the first of ``rows`` present in a statement frame, newest period first."""
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return np.array([])
+    for row in rows:
+        if row in frame.index:
+            values = frame.loc[row]
+            periods = pd.to_datetime(values.index, errors="coerce")
+            return pd.to_numeric(values.iloc[np.argsort(periods)[::-1]], errors="coerce").to_numpy(dtype="float64")
+    return np.array([])
+
+
+def _padded(values: np.ndarray, length: int) -> np.ndarray:
+    return np.concatenate([values[:length], np.full(max(length - len(values), 0), np.nan)])
+
+
+def fiscal_period(bundle: dict) -> pd.Timestamp:
+    """Latest period end across the bundle's statements; the memoization key of its fundamentals."""
+    periods = [
+        pd.to_datetime(frame.columns, errors="coerce").max()
+        for frame in (bundle.get(dataset) for dataset in STATEMENT_FIELDS[1:])
+        if isinstance(frame, pd.DataFrame) and not frame.empty
+    ]
+    periods = [period for period in periods if not pd.isna(period)]
+    return max(periods) if periods else pd.NaT
+
+
+def _statement_inputs(bundle: dict) -> np.ndarray:
+    """``[annual EPS x ANNUAL_EPS_YEARS (newest first), last 4 quarterly EPS, cash, debt]`` for one ticker."""
+    annual = _padded(_newest_first(bundle.get("financials"), EPS_ROWS), ANNUAL_EPS_YEARS)
+    quarterly = _padded(_newest_first(bundle.get("quarterly_financials"), EPS_ROWS), 4)
+    cash = _padded(_newest_first(bundle.get("balance_sheet"), CASH_ROWS), 1)
+    debt = _padded(_newest_first(bundle.get("balance_sheet"), DEBT_ROWS), 1)
+    return np.concatenate([annual, quarterly, cash, debt])
+
+
+def statement_fundamentals(inputs: np.ndarray) -> np.ndarray:
+    """
+    Vectorized over tickers: ``inputs`` has one ``_statement_inputs`` row per
+    ticker; returns ``FUNDAMENTAL_COLUMNS`` per ticker.
+    """
+    annual = inputs[:, :ANNUAL_EPS_YEARS]
+    quarterly = inputs[:, ANNUAL_EPS_YEARS:ANNUAL_EPS_YEARS + 4]
+    cash, debt = inputs[:, -2], inputs[:, -1]
+    rows = np.arange(len(inputs))
+
+    # TTM EPS needs all four quarters
+    ttm_eps = np.where(np.isnan(quarterly).any(axis=1), np.nan, quarterly.sum(axis=1))
+
+    # CAGR from the oldest to the newest annual EPS, both positive
+    present = ~np.isnan(annual)
+    years = ANNUAL_EPS_YEARS - 1 - np.argmax(present[:, ::-1], axis=1)
+    newest, oldest = annual[:, 0], annual[rows, years]
+    growing = present.any(axis=1) & (years >= 1) & (newest > 0) & (oldest > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eps_cagr = np.where(growing, (newest / oldest) ** (1 / np.maximum(years, 1)) - 1, np.nan)
+
+    net_cash = cash - np.nan_to_num(debt)
+    return np.column_stack([ttm_eps, eps_cagr, net_cash])
+
+
+def valuation_frame(fundamentals: pd.DataFrame, info: pd.DataFrame) -> pd.DataFrame:
+    """
+    Price-based metrics from the memoized fundamentals and the current ``price``,
+    ``forward_eps``, ``trailing_eps`` and ``shares`` columns of ``info``.
+    """
+    frame = fundamentals.join(info, how="left")
+    price = frame["price"]
+    # Quarterly statements can lag; fall back to Yahoo's trailing EPS
+    ttm_eps = frame["ttm_eps"].fillna(frame["trailing_eps"])
+    forward_eps = frame["forward_eps"]
+    growth_pct = frame["eps_cagr"] * 100
+    forward_growth_pct = (forward_eps / ttm_eps - 1) * 100
+
+    trailing_pe = (price / ttm_eps).where(ttm_eps > 0)
+    forward_pe = (price / forward_eps).where(forward_eps > 0)
+    return pd.DataFrame({
+        "ttm_eps": ttm_eps,
+        "eps_cagr": frame["eps_cagr"],
+        "trailing_pe": trailing_pe,
+        "trailing_peg": (trailing_pe / growth_pct).where(growth_pct > 0),
+        "forward_pe": forward_pe,
+        "forward_peg": (forward_pe / forward_growth_pct).where((forward_growth_pct > 0) & (ttm_eps > 0)),
+        "net_cash": frame["net_cash"],
+        "net_cash_per_share": frame["net_cash"] / frame["shares"].where(frame["shares"] > 0),
+        # Lynch: a fairly priced grower trades at a P/E equal to its growth rate
+        "fair_value": (ttm_eps * growth_pct).where((ttm_eps > 0) & (growth_pct > 0)),
+    }, index=fundamentals.index)
+
+
+def _info_frame(bundles: Mapping[str, dict]) -> pd.DataFrame:
+    rows = {}
+    for ticker, bundle in bundles.items():
+        info = bundle.get("info") or {}
+        rows[ticker] = {
+            "price": info.get("currentPrice", info.get("regularMarketPrice")),
+            "forward_eps": info.get("forwardEps"),
+            "trailing_eps": info.get("trailingEps"),
+            "shares": info.get("sharesOutstanding"),
+        }
+    frame = pd.DataFrame.from_dict(rows, orient="index", columns=["price", "forward_eps", "trailing_eps", "shares"])
+    return frame.apply(pd.to_numeric, errors="coerce").astype("float64")
+
 
 class ValuationService:
-    def calculate_peg_ratio(self, candidate: InvestmentCandidate) -> float:
-        # This would fetch P/E and growth data to calculate the PEG ratio.
-        # Placeholder implementation.
-        print(f"Calculating PEG ratio for {candidate.company.ticker}...")
-        return 0.9
+    def __init__(self, yfinance_repo: YahooFinanceRepository | None = None):
+        self.yfinance_repo = yfinance_repo or YahooFinanceRepository()
+        # ticker -> (fiscal period, FUNDAMENTAL_COLUMNS values)
+        self._fundamentals: dict[str, tuple[pd.Timestamp, np.ndarray]] = {}
+
+    def fundamentals(self, bundles: Mapping[str, dict]) -> pd.DataFrame:
+        """Statement-derived fundamentals, recomputed only for tickers whose fiscal period changed."""
+        periods = {ticker: fiscal_period(bundle) for ticker, bundle in bundles.items()}
+        changed = [
+            ticker for ticker, period in periods.items()
+            if ticker not in self._fundamentals or not _same_period(self._fundamentals[ticker][0], period)
+        ]
+        if changed:
+            inputs = np.vstack([_statement_inputs(bundles[ticker]) for ticker in changed])
+            for ticker, values in zip(changed, statement_fundamentals(inputs)):
+                self._fundamentals[ticker] = (periods[ticker], values)
+        tickers = list(bundles)
+        values = [self._fundamentals[ticker][1] for ticker in tickers]
+        return pd.DataFrame(values, index=tickers, columns=list(FUNDAMENTAL_COLUMNS), dtype="float64")
+
+    def value_universe(self, bundles: Mapping[str, dict | None]) -> pd.DataFrame:
+        """Valuation metrics for every ticker with data, one row per ticker."""
+        bundles = {ticker: bundle for ticker, bundle in bundles.items() if bundle}
+        return valuation_frame(self.fundamentals(bundles), _info_frame(bundles))
+
+    def value_tickers(self, tickers: Iterable[str]) -> pd.DataFrame:
+        return self.value_universe(self.yfinance_repo.get_all_data_many(tickers, fields=STATEMENT_FIELDS))
+
+    def peg_ratio(self, ticker: str, bundle: dict) -> float | None:
+        """Trailing PEG from one bundle, falling back to the forward PEG."""
+        row = self.value_universe({ticker: bundle}).iloc[0]
+        peg = row["trailing_peg"] if not pd.isna(row["trailing_peg"]) else row["forward_peg"]
+        return None if pd.isna(peg) else float(peg)
+
+    def calculate_peg_ratio(self, candidate: InvestmentCandidate) -> float | None:
+        ticker = candidate.company.ticker
+        bundle = self.yfinance_repo.get_all_data(ticker, fields=STATEMENT_FIELDS)
+        return self.peg_ratio(ticker, bundle) if bundle else None
+
+
+def _same_period(a: pd.Timestamp, b: pd.Timestamp) -> bool:
+    return (pd.isna(a) and pd.isna(b)) or a == b
@@ -2,6 +2,8 @@ import pandas as pd
 from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository
 from backend.core.infrastructure.economic_data_repository import EconomicDataRepository
 from backend.core.use_cases.categorization_service import CategorizationService
+from backend.core.use_cases.valuation_service import ValuationService
+from backend.core.use_cases.chart_pattern_service import recent_breakout, scan_patterns
 from backend.core.entities.models import Company, InvestmentCandidate
 
 class VettingService:
@@ -9,23 +11,34 @@ class VettingService:
         self.yfinance_repo = YahooFinanceRepository()
         self.economic_repo = EconomicDataRepository()
         self.categorization_service = CategorizationService()
+        self.valuation_service = ValuationService(self.yfinance_repo)
 
     def vet_candidate(self, ticker: str) -> dict:
+        # Categorization and the Lynch/CANSLIM checks only read info and price history
+        data = self.yfinance_repo.get_all_data(ticker, fields=["info", "history"])
+        # Served from the bundle just loaded: no second info request
         company = self.yfinance_repo.get_company_info(ticker)
-        data = self.yfinance_repo.get_all_data(ticker)
         category = self.categorization_service.categorize(data)
-        lynch = self._vet_lynch_criteria(data['info'])
+        peg = data['info'].get('pegRatio')
+        if peg is None:
+            # Yahoo often omits pegRatio; derive it from the cached statements instead
+            peg = self.valuation_service.peg_ratio(ticker, data)
+        lynch = self._vet_lynch_criteria(data['info'], peg)
         canslim = self._vet_canslim_criteria(data['info'], data)
+        # Memoized for the process: a batch of vettings shares one set of macro lookups
+        market_context = self.economic_repo.get_market_context()
         return {
             "ticker": ticker,
             "company_name": company.name,
             "category": category,
+            "market_direction": market_context.market_direction,
             "lynch_criteria": lynch,
             "canslim_criteria": canslim,
         }
 
-    def _vet_lynch_criteria(self, info: dict) -> dict:
-        peg = info.get('pegRatio')
+    def _vet_lynch_criteria(self, info: dict, peg: float | None = None) -> dict:
+        if peg is None:
+            peg = info.get('pegRatio')
         insider_count = info.get('netSharePurchaseActivity', {}).get('buyInfoCount', 0)
         return {
             "PEG Ratio": {
@@ -51,4 +64,19 @@ class VettingService:
             "Quarterly EPS Growth": {"pass": eps_growth > 0.25},
             "52-Week High Status": {"value": high_status},
             "Volume vs. Avg": {"value": volume_status},
+            "Base Breakout": self._vet_chart_base(history),
         }
+
+    def _vet_chart_base(self, history: pd.DataFrame) -> dict:
+        scan = scan_patterns({"": history})
+        breakout = recent_breakout(scan, "", history.index[-1]) if not scan.breakouts.empty else None
+        if breakout is not None:
+            confirmed = bool(breakout["volume_confirmed"])
+            return {
+                "pass": confirmed,
+                "value": f"Broke out above {breakout['pivot']:.2f} on {breakout['volume_ratio']:.1f}x average volume",
+            }
+        if "" in scan.bases.index:
+            base = scan.bases.loc[""]
+            return {"pass": False, "value": f"In a {base['depth'] * 100:.0f}% deep base, pivot {base['pivot']:.2f}"}
+        return {"pass": False, "value": "No base"}
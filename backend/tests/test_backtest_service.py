@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backend.core.infrastructure.fundamentals_panel import FundamentalsPanel
+from backend.core.use_cases.backtest_service import (
+    rebalance_dates,
+    rs_rating_rows,
+    run_backtest,
+    statement_rows,
+)
+from backend.core.use_cases.relative_strength_service import rs_ratings, weighted_performance
+
+
+def _matrices(closes: dict, start="2023-01-02"):
+    index = pd.bdate_range(start, periods=len(next(iter(closes.values()))))
+    close = pd.DataFrame(closes, index=index, dtype="float64")
+    return {
+        "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": pd.DataFrame(1000.0, index=index, columns=close.columns),
+    }
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_statements_count_only_once_public(self):
+        periods = pd.to_datetime(["2023-03-31", "2023-06-30", "2023-09-30", "2023-12-31", "2024-03-31"])
+        statement = pd.DataFrame(
+            [[1.0, 1.1, 1.2, 1.3, 2.0], [10, 10, 10, 10, 15]], index=["Diluted EPS", "Total Revenue"], columns=periods,
+        )
+        panel = FundamentalsPanel.from_bundles({"ACME": {"quarterly_financials": statement}})
+        dates = pd.to_datetime(["2024-05-01", "2024-05-20"]).to_numpy()
+
+        rows = statement_rows(panel, ["ACME", "NONE"], dates)
+
+        # Q1 2024 is public 45 days after March 31st: not on May 1st, but by May 20th
+        self.assertTrue(np.isnan(rows["eps_yoy"][0, 0])) # Q4 2023 has no year-ago quarter in the panel
+        self.assertAlmostEqual(rows["eps_yoy"][1, 0], 1.0)
+        self.assertAlmostEqual(rows["sales_yoy"][1, 0], 0.5)
+        self.assertAlmostEqual(rows["ttm_eps"][1, 0], 1.1 + 1.2 + 1.3 + 2.0)
+        self.assertTrue(np.isnan(rows["eps_yoy"][:, 1]).all())
+
+    def test_rs_ratings_match_the_live_service(self):
+        rng = np.random.default_rng(5)
+        closes = {f"T{i}": 100 * np.cumprod(1 + rng.normal(0.0005 * i, 0.01, 300)) for i in range(30)}
+        closes["YOUNG"] = np.concatenate([np.full(200, np.nan), np.linspace(10, 12, 100)])
+        close = _matrices(closes)["Close"]
+        rows = np.array([150, 299])
+
+        ratings = rs_rating_rows(close.to_numpy(), rows)
+
+        for position, row in enumerate(rows):
+            expected = rs_ratings(weighted_performance(close.iloc[:row + 1].dropna(axis=1, how="all")))
+            actual = pd.Series(ratings[position], index=close.columns)
+            pd.testing.assert_series_equal(
+                actual.reindex(expected.index), expected.astype("float64"), check_names=False,
+            )
+
+    def test_baskets_and_forward_returns(self):
+        sessions = 200
+        closes = {
+            "UP": np.linspace(50, 150, sessions),
+            "DOWN": np.linspace(150, 50, sessions),
+            "FLAT": np.full(sessions, 100.0),
+        }
+        # Enough tickers for RS percentiles to be assigned; an opening spike keeps all but UP off new highs
+        closes.update({f"F{i}": np.linspace(100, 100 + i, sessions) for i in range(20)})
+        for ticker, values in closes.items():
+            if ticker != "UP":
+                values[0] = 300.0
+        matrices = _matrices(closes)
+        panel = FundamentalsPanel.from_bundles({})
+        dates = rebalance_dates(matrices["Close"].index, every=21)
+
+        result = run_backtest(matrices, panel, dates, ["new_highs", "relative_strength"], horizons=(21,))
+
+        self.assertEqual(set(result.picks["ticker"]), {"UP"})
+        first = result.periods.iloc[0]
+        self.assertEqual((first["selected"], first["eligible"]), (1, len(closes)))
+        row = matrices["Close"].index.get_loc(dates[0])
+        up = matrices["Close"]["UP"]
+        self.assertAlmostEqual(first["basket_21"], up.iloc[row + 21] / up.iloc[row] - 1)
+        self.assertTrue(np.isnan(result.periods["basket_21"].iloc[-1])) # No bars 21 sessions past the end
+        self.assertGreater(result.summary().loc[21, "excess"], 0)
+
+        pooled = run_backtest(matrices, panel, dates, ["new_highs", "relative_strength"], horizons=(21,), max_workers=2)
+        pd.testing.assert_frame_equal(pooled.periods, result.periods)
+        pd.testing.assert_frame_equal(pooled.picks, result.picks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from backend.core.infrastructure import yfinance_cache
+from backend.core.infrastructure.cache_manifest import file_checksum
+from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository, bundle_cache
+
+SOURCE_CACHE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "yfinance_data", "AMD.json")
+
+
+class TestCacheManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = patch.object(yfinance_cache, "YFINANCE_CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        bundle_cache.clear()
+        self.addCleanup(bundle_cache.clear)
+        shutil.copy(SOURCE_CACHE, os.path.join(self.cache_dir, "AMD.json"))
+        _, self.data = yfinance_cache.load_legacy_json(os.path.join(self.cache_dir, "AMD.json"))
+
+    def test_write_bundle_records_every_dataset(self):
+        fetched = datetime(2026, 1, 2, 3, 4, 5)
+        yfinance_cache.write_bundle("amd", self.data, fetched=dict.fromkeys(yfinance_cache.DATASETS, fetched))
+
+        entries = {entry["dataset"]: entry for entry in yfinance_cache.get_manifest().entries("AMD")}
+        self.assertEqual(set(entries), set(yfinance_cache.DATASETS))
+        history_path = yfinance_cache._get_dataset_path("AMD", "history")
+        self.assertEqual(entries["history"]["size"], os.path.getsize(history_path))
+        self.assertEqual(entries["history"]["checksum"], file_checksum(history_path))
+        self.assertTrue(all(entry["fetched_at"] == fetched for entry in entries.values()))
+
+    def test_partial_write_only_updates_written_datasets(self):
+        old = datetime(2026, 1, 1)
+        yfinance_cache.write_bundle("AMD", self.data, fetched=dict.fromkeys(yfinance_cache.DATASETS, old))
+        new = datetime(2026, 2, 1)
+        yfinance_cache.write_bundle("AMD", self.data, fetched={"history": new}, datasets=["history"])
+
+        entries = {entry["dataset"]: entry["fetched_at"] for entry in yfinance_cache.get_manifest().entries("AMD")}
+        self.assertEqual(entries["history"], new)
+        self.assertEqual(entries["financials"], old)
+
+    def test_staleness_queries_and_bulk_expiry(self):
+        now = datetime.now()
+        yfinance_cache.write_bundle("AMD", self.data, fetched=dict.fromkeys(yfinance_cache.DATASETS, now))
+        yfinance_cache.write_bundle("NVDA", self.data, fetched=dict.fromkeys(yfinance_cache.DATASETS, now - timedelta(days=3)))
+        repo = YahooFinanceRepository()
+
+        self.assertEqual(repo.cached_tickers_older_than(timedelta(days=1), ["history"]), ["NVDA"])
+        self.assertEqual(yfinance_cache.get_manifest().missing_tickers(["amd", "MSFT"]), ["MSFT"])
+
+        bundle_cache.put("AMD", yfinance_cache.read_bundle("AMD"))
+        self.assertEqual(repo.expire(["AMD", "MSFT"], ["history"]), ["AMD"])
+        self.assertNotIn("AMD", bundle_cache)
+        fetched, _ = yfinance_cache.read_bundle("AMD")
+        self.assertEqual(fetched["history"], datetime.min)
+        self.assertEqual(fetched["info"], now)
+        self.assertEqual(repo.cached_tickers_older_than(timedelta(days=1), ["history"]), ["AMD", "NVDA"])
+
+    def test_rebuild_matches_incremental_index(self):
+        yfinance_cache.migrate_legacy_cache()
+        yfinance_cache.write_bundle("NVDA", self.data)
+        expected = yfinance_cache.get_manifest().entries()
+
+        os.remove(os.path.join(self.cache_dir, yfinance_cache.MANIFEST_FILE))
+        self.assertEqual(yfinance_cache.rebuild_manifest(), 2)
+        self.assertEqual(yfinance_cache.get_manifest().entries(), expected)
+
+    def test_remove_bundle_drops_rows(self):
+        yfinance_cache.write_bundle("AMD", self.data)
+        yfinance_cache.remove_bundle("AMD")
+        self.assertEqual(yfinance_cache.get_manifest().tickers(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
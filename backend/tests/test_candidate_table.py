@@ -0,0 +1,82 @@
+import tracemalloc
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backend.core.entities.candidate_table import NO_RESULT, CandidateTable
+from backend.core.entities.models import Company, CriterionResult, InvestmentCandidate, ResultStatus
+from backend.core.use_cases.scoring_plan import ScoringPlan
+
+
+def _candidates(tickers: int, criteria: int) -> list[InvestmentCandidate]:
+    candidates = []
+    for i in range(tickers):
+        candidate = InvestmentCandidate(company=Company(f"T{i}", f"Company {i}", "Semiconductors"))
+        for j in range(criteria):
+            status = ResultStatus.PASS if (i + j) % 3 else ResultStatus.FAIL
+            candidate.add_criterion_result(CriterionResult(f"c{j}", status, float(i * j) if j % 2 else None))
+        candidates.append(candidate)
+    return candidates
+
+
+class TestCandidateTable(unittest.TestCase):
+
+    def test_rows_read_back_like_the_candidates(self):
+        acme = InvestmentCandidate(company=Company("ACME", "Acme", "Tools", "Anvils."))
+        acme.add_criterion_result(CriterionResult("peg", ResultStatus.PASS, 0.8))
+        acme.add_criterion_result(CriterionResult("story", ResultStatus.PENDING, notes="Needs review"))
+        initech = InvestmentCandidate(company=Company("INTC", "Initech", "Software"))
+        initech.add_criterion_result(CriterionResult("peg", ResultStatus.FAIL, "n/a")) # Turns the column into objects
+
+        table = CandidateTable.from_candidates([acme, initech])
+
+        self.assertEqual(table.criteria, ("peg", "story"))
+        self.assertEqual(table.statuses.dtype, np.int8)
+        self.assertEqual(table.statuses[1, 1], NO_RESULT)
+        for candidate in (acme, initech):
+            view = table[candidate.company.ticker]
+            self.assertEqual(view.company, candidate.company)
+            self.assertEqual(dict(view.results), candidate.results)
+            self.assertEqual(view.to_candidate(), candidate)
+        self.assertIsNone(table["INTC"].get_criterion_result("story"))
+        self.assertNotIn("story", table["INTC"].results)
+
+        table["INTC"].add_criterion_result(CriterionResult("story", ResultStatus.PASS, notes="Needs review"))
+        self.assertEqual(table["INTC"].results["story"].status, ResultStatus.PASS)
+        self.assertEqual(table.note_texts, ["", "Needs review"])
+        with self.assertRaises(KeyError):
+            table["ACME"].add_criterion_result(CriterionResult("unknown", ResultStatus.PASS))
+
+    def test_scoring_plan_fills_the_table_column_by_column(self):
+        plan = ScoringPlan.from_framework({"spec": {"criteria_definitions": [
+            {"id": "cheap", "name": "cheap", "category": "Lynch/Fisher", "weight": 10,
+             "rule": {"column": "peg", "op": "<=", "value": 1.5}},
+        ]}})
+        evaluation = plan.evaluate(pd.DataFrame({"peg": [1.0, 2.0, np.nan]}, index=["A", "B", "C"]))
+        companies = [Company(ticker, ticker, "") for ticker in ("A", "B", "C", "D")]
+
+        table = plan.candidate_table(evaluation, companies)
+
+        for ticker in ("A", "B", "C"):
+            self.assertEqual(dict(table[ticker].results), plan.criterion_results(evaluation, ticker))
+        self.assertEqual(len(table["D"].results), 0)
+
+    def test_uses_an_order_of_magnitude_less_memory(self):
+        candidates = _candidates(1000, 30)
+        tracemalloc.start()
+        objects = [InvestmentCandidate(c.company, {k: CriterionResult(r.criterion_id, r.status, r.value, r.notes)
+                                                  for k, r in c.results.items()}) for c in candidates]
+        object_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        table = CandidateTable.from_candidates(candidates)
+        table_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertEqual(len(objects), len(table))
+        self.assertLess(table_bytes * 5, object_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
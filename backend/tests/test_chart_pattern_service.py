@@ -0,0 +1,73 @@
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backend.core.use_cases.chart_pattern_service import scan_patterns
+
+
+def _bars(closes, volumes=None, start="2024-01-02"):
+    closes = np.asarray(closes, dtype="float64")
+    volumes = np.full(len(closes), 1000.0) if volumes is None else np.asarray(volumes, dtype="float64")
+    index = pd.bdate_range(start, periods=len(closes), tz="America/New_York")
+    return pd.DataFrame({
+        "Open": closes, "High": closes * 1.005, "Low": closes * 0.995, "Close": closes, "Volume": volumes,
+    }, index=index)
+
+
+def _cup_with_handle():
+    """63-session advance, a 65-session cup with handle, then a breakout on double volume."""
+    closes = np.concatenate([
+        np.linspace(70, 100, 63),
+        np.linspace(100, 75, 28), np.linspace(75, 97, 27), # Cup: 25% deep
+        np.linspace(96, 92, 5), np.linspace(92.5, 95, 5), # Handle
+        [99.0],
+    ])
+    volumes = np.full(len(closes), 1000.0)
+    volumes[-1] = 2000.0
+    return _bars(closes, volumes)
+
+
+class TestChartPatterns(unittest.TestCase):
+
+    def test_detects_the_base_pivot_and_confirmed_breakout(self):
+        histories = {"CUP": _cup_with_handle(), "UP": _bars(np.linspace(50, 120, 200))}
+        in_base = {"CUP": _cup_with_handle().iloc[:-1], "UP": histories["UP"]}
+
+        bases = scan_patterns(in_base).bases
+        self.assertEqual(bases.index.tolist(), ["CUP"])
+        self.assertEqual(bases.loc["CUP", "base_sessions"], 65)
+        self.assertAlmostEqual(bases.loc["CUP", "depth"], 1 - 75 * 0.995 / (100 * 1.005), places=6)
+        self.assertAlmostEqual(bases.loc["CUP", "pivot"], 96 * 1.005)
+
+        breakouts = scan_patterns(histories).breakouts
+        self.assertEqual(breakouts["ticker"].tolist(), ["CUP"])
+        breakout = breakouts.iloc[0]
+        self.assertEqual(breakout["date"], pd.Timestamp(histories["CUP"].index[-1].date()))
+        self.assertAlmostEqual(breakout["volume_ratio"], 2.0)
+        self.assertTrue(breakout["volume_confirmed"])
+
+    def test_histories_without_ohlcv_are_skipped(self):
+        scan = scan_patterns({"BAD": pd.DataFrame({"Close": [1.0, 2.0]}), "NONE": None})
+        self.assertTrue(scan.bases.empty)
+        self.assertTrue(scan.breakouts.empty)
+
+    def test_scans_thousands_of_tickers_in_seconds(self):
+        rng = np.random.default_rng(7)
+        closes = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, (252, 3000)), axis=0)
+        index = pd.bdate_range("2024-01-02", periods=252, tz="America/New_York")
+        histories = {
+            f"T{i:04d}": pd.DataFrame({
+                "Open": closes[:, i], "High": closes[:, i] * 1.01, "Low": closes[:, i] * 0.99,
+                "Close": closes[:, i], "Volume": 1000.0,
+            }, index=index)
+            for i in range(3000)
+        }
+        start = time.perf_counter()
+        scan_patterns(histories)
+        self.assertLess(time.perf_counter() - start, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
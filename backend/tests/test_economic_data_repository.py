@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from backend.core.infrastructure import economic_data_repository
+from backend.core.infrastructure.economic_data_repository import EconomicDataRepository, clear_market_context
+
+
+class TestEconomicDataRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = patch.object(economic_data_repository, "ECONOMIC_CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        clear_market_context()
+        self.addCleanup(clear_market_context)
+
+        self.repo = EconomicDataRepository()
+        self.repo._fred = MagicMock()
+        dates = pd.date_range("2025-01-01", periods=4, freq="MS")
+        self.repo._fred.get_series.return_value = pd.Series([100.0, 101.0, 102.0, 103.0], index=dates)
+
+    def test_series_is_stored_and_topped_up_incrementally(self):
+        self.repo.get_fred_series("GDPC1")
+        self.repo.get_fred_series("GDPC1")
+        self.repo._fred.get_series.assert_called_once_with("GDPC1")
+
+        # Once the stored copy is due for a refresh only the newer observations are requested
+        revised = pd.Series([103.5, 104.0], index=pd.to_datetime(["2025-04-01", "2025-05-01"]))
+        self.repo._fred.get_series.return_value = revised
+        with patch.object(economic_data_repository, "SERIES_REFRESH_INTERVAL", pd.Timedelta(0)):
+            series = self.repo.get_fred_series("GDPC1")
+
+        self.repo._fred.get_series.assert_called_with("GDPC1", observation_start=pd.Timestamp("2025-04-01"))
+        self.assertEqual(series.tolist(), [100.0, 101.0, 102.0, 103.5, 104.0])
+
+    def test_stored_series_is_used_when_the_source_fails(self):
+        self.repo.get_fred_series("FEDFUNDS")
+        self.repo._fred.get_series.side_effect = ConnectionError("offline")
+        with patch.object(economic_data_repository, "SERIES_REFRESH_INTERVAL", pd.Timedelta(0)):
+            self.assertEqual(self.repo.get_interest_rates(), 103.0)
+
+    def test_market_context_is_shared_across_instances(self):
+        closes = pd.DataFrame({"Close": range(250)}, index=pd.date_range("2025-01-01", periods=250, freq="B"))
+        with patch.object(economic_data_repository.yf, "Ticker") as ticker:
+            ticker.return_value.history.return_value = closes
+            context = self.repo.get_market_context()
+            other = EconomicDataRepository()
+            self.assertIs(other.get_market_context(), context)
+
+        ticker.return_value.history.assert_called_once()
+        self.assertEqual(context.market_direction, "Uptrend")
+        self.assertEqual(context.interest_rate, 103.0)
+        self.assertAlmostEqual(context.gdp_growth, 100 * (103 / 102 - 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from backend.core.infrastructure.file_utils import atomic_write, file_lock
+
+
+def _increment(counter_path: str, lock_path: str, times: int):
+    for _ in range(times):
+        with file_lock(lock_path):
+            with open(counter_path) as f:
+                value = int(f.read())
+            with atomic_write(counter_path) as f:
+                f.write(str(value + 1))
+
+
+class TestFileUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_atomic_write_keeps_old_content_on_failure(self):
+        path = os.path.join(self.directory, "cache.json")
+        with atomic_write(path) as f:
+            f.write("old")
+
+        with self.assertRaises(RuntimeError):
+            with atomic_write(path) as f:
+                f.write("partial")
+                raise RuntimeError("crash mid-write")
+
+        with open(path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.directory), ["cache.json"])
+
+    def test_lock_serializes_read_modify_write_across_processes(self):
+        counter_path = os.path.join(self.directory, "counter")
+        lock_path = os.path.join(self.directory, "locks", "counter.lock")
+        with open(counter_path, "w") as f:
+            f.write("0")
+
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_increment, args=(counter_path, lock_path, 25)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+
+        with open(counter_path) as f:
+            self.assertEqual(int(f.read()), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
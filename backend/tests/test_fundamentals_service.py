@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from backend.core.infrastructure.fundamentals_panel import PANEL_QUARTERS, FundamentalsPanel
+from backend.core.use_cases.fundamentals_service import FundamentalsService, growth_metrics
+
+
+def _bundle(eps, revenue):
+    """Quarterly statement with ``eps``/``revenue`` given newest quarter first, columns oldest first like Yahoo's."""
+    periods = pd.date_range(end="2025-06-30", periods=len(eps), freq="QE")[::-1]
+    frame = pd.DataFrame([eps, revenue], index=["Diluted EPS", "Total Revenue"], columns=periods)
+    return {"quarterly_financials": frame[frame.columns[::-1]]}
+
+
+class TestFundamentalsPanel(unittest.TestCase):
+
+    def setUp(self):
+        self.bundles = {
+            # Accelerating: +50% YoY after +25%
+            "FAST": _bundle([1.5, 1.2, 1.1, 1.0, 1.0, 0.96, 0.9, 0.8], [150, 130, 120, 110, 100, 100, 100, 100]),
+            # Loss narrowing from -1.0 to -0.5, only five quarters reported
+            "TURN": _bundle([-0.5, -0.6, -0.8, -0.9, -1.0], [10, 10, 10, 10, 10]),
+            "NONE": {"quarterly_financials": pd.DataFrame()},
+        }
+
+    def test_growth_acceleration_and_consistency(self):
+        metrics = growth_metrics(FundamentalsPanel.from_bundles(self.bundles))
+        fast = metrics.loc["FAST"]
+        self.assertAlmostEqual(fast["eps_yoy"], 0.5)
+        self.assertAlmostEqual(fast["eps_qoq"], 0.25)
+        self.assertAlmostEqual(fast["eps_acceleration"], 0.5 - 0.25)
+        self.assertAlmostEqual(fast["eps_consistency"], 1.0)
+        self.assertAlmostEqual(fast["sales_yoy"], 0.5)
+        self.assertAlmostEqual(metrics.loc["TURN", "eps_yoy"], 0.5)
+        self.assertTrue(np.isnan(metrics.loc["TURN", "eps_acceleration"]))
+        self.assertTrue(metrics.loc["NONE"].isna().all())
+
+    def test_saved_panel_is_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "panel.arrow")
+            panel = FundamentalsPanel.from_bundles(self.bundles, {"FAST": "abc"})
+            panel.save(path)
+            loaded = FundamentalsPanel.load(path)
+            self.assertEqual(loaded.tickers, ["FAST", "TURN", "NONE"])
+            self.assertEqual(loaded.sources, {"FAST": "abc"})
+            self.assertEqual(loaded.item("Diluted EPS").shape, (3, PANEL_QUARTERS))
+            self.assertFalse(loaded.item("Diluted EPS").flags.writeable)
+            np.testing.assert_array_equal(loaded.as_array(), panel.as_array())
+            np.testing.assert_array_equal(loaded.periods, panel.periods)
+            pd.testing.assert_frame_equal(growth_metrics(loaded), growth_metrics(panel))
+
+    def test_empty_panel_round_trips(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "panel.arrow")
+            FundamentalsPanel.from_bundles({}).save(path)
+            loaded = FundamentalsPanel.load(path)
+            self.assertEqual(len(loaded), 0)
+            self.assertEqual(loaded.item("Diluted EPS").shape, (0, PANEL_QUARTERS))
+            self.assertTrue(growth_metrics(loaded).empty)
+
+    def test_tickers_without_data_are_not_fetched_again(self):
+        repo = MagicMock()
+        repo.get_all_data_many.side_effect = lambda tickers, fields: dict.fromkeys(tickers)
+        checksums = {}
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(FundamentalsService, "_statement_checksums", side_effect=lambda: dict(checksums)):
+            path = os.path.join(tmp, "panel.arrow")
+            FundamentalsService(repo, panel_path=path).metrics(["ZZZ"])
+
+            service = FundamentalsService(repo, panel_path=path)
+            self.assertTrue(service.metrics(["ZZZ"]).loc["ZZZ"].isna().all())
+            repo.get_all_data_many.assert_called_once_with(["ZZZ"], fields=["quarterly_financials"])
+
+            # Once the manifest records a statement, the ticker is parsed again
+            checksums["ZZZ"] = "a"
+            service.metrics(["ZZZ"])
+            self.assertEqual(repo.get_all_data_many.call_count, 2)
+
+    def test_service_reparses_only_changed_statements(self):
+        repo = MagicMock()
+        repo.get_all_data_many.side_effect = lambda tickers, fields: {t: self.bundles[t] for t in tickers}
+        checksums = {"FAST": "a", "TURN": "b"}
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(FundamentalsService, "_statement_checksums", side_effect=lambda: dict(checksums)):
+            path = os.path.join(tmp, "panel.arrow")
+            FundamentalsService(repo, panel_path=path).panel(["FAST", "TURN"])
+
+            # A new process memory-maps the saved panel and reparses nothing
+            service = FundamentalsService(repo, panel_path=path)
+            repo.get_all_data_many.reset_mock()
+            self.assertEqual(service.metrics(["TURN", "FAST"]).index.tolist(), ["TURN", "FAST"])
+            repo.get_all_data_many.assert_not_called()
+
+            checksums["TURN"] = "c"
+            service.panel(["FAST", "TURN"])
+            repo.get_all_data_many.assert_called_once_with(["TURN"], fields=["quarterly_financials"])
+
+
+if __name__ == "__main__":
+    unittest.main()
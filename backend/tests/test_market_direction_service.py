@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from backend.core.entities.models import MarketRegime
+from backend.core.use_cases.market_direction_service import IndexTracker, MarketDirectionService
+
+
+def _bars(closes, volumes, start="2025-01-02"):
+    return pd.DataFrame(
+        {"Close": closes, "Volume": volumes},
+        index=pd.bdate_range(start, periods=len(closes), tz="America/New_York"),
+    )
+
+
+def _random_walk(sessions=300, seed=7):
+    rng = np.random.default_rng(seed)
+    closes = 4000 * np.cumprod(1 + rng.normal(0.0005, 0.012, sessions))
+    volumes = rng.integers(2_000_000, 4_000_000, sessions).astype(float)
+    return _bars(closes, volumes)
+
+
+class TestMarketDirectionService(unittest.TestCase):
+
+    def test_follow_through_day_confirms_uptrend(self):
+        # Decline to a low, then a rally attempt: day 4 gains 2% on higher volume
+        closes = [100, 98, 96, 95, 96, 96.5, 97, 99]
+        volumes = [10, 10, 10, 10, 9, 8, 8, 12]
+        tracker = IndexTracker("^GSPC")
+        states = [tracker.push(ts, c, v) for ts, c, v in zip(_bars(closes, volumes).index, closes, volumes)]
+
+        self.assertEqual([s.rally_day for s in states], [0, 0, 0, 0, 1, 2, 3, 0])
+        self.assertTrue(states[-1].follow_through)
+        self.assertEqual(states[-1].regime, MarketRegime.CONFIRMED_UPTREND)
+        self.assertTrue(all(s.regime is MarketRegime.CORRECTION for s in states[:-1]))
+
+    def test_distribution_days_drive_the_regime_and_expire(self):
+        closes = [100, 98, 96, 95, 96, 96.5, 97, 99]
+        volumes = [10, 10, 10, 10, 9, 8, 8, 12]
+        # Four distribution days in a row, then flat sessions until they roll off
+        closes += [98.5, 98, 97.5, 97] + [97] * 25
+        volumes += [13, 14, 15, 16] + [10] * 25
+        service = MarketDirectionService(economic_repo=MagicMock(), symbols=["^GSPC"])
+        bars = _bars(closes, volumes)
+
+        state = service.update("^GSPC", bars.iloc[:12])
+        self.assertEqual(state.distribution_days, 4)
+        self.assertEqual(state.regime, MarketRegime.UNDER_PRESSURE)
+        state = service.update("^GSPC", bars)
+        self.assertEqual(state.distribution_days, 0)
+        self.assertEqual(state.regime, MarketRegime.CONFIRMED_UPTREND)
+
+    def test_incremental_updates_match_a_full_replay(self):
+        bars = _random_walk()
+        full = MarketDirectionService(economic_repo=MagicMock(), symbols=["^GSPC"])
+        full_states = [full.trackers["^GSPC"].push(*row) for row in zip(bars.index, bars["Close"], bars["Volume"])]
+
+        incremental = MarketDirectionService(economic_repo=MagicMock(), symbols=["^GSPC"])
+        for end in range(50, len(bars) + 1, 37):
+            # Re-sent overlapping windows and an intraday revision of the last bar must not double count
+            partial = bars.iloc[:end].copy()
+            partial.iloc[-1, 0] *= 0.97
+            incremental.update("^GSPC", partial)
+            incremental.update("^GSPC", bars.iloc[:end])
+        state = incremental.update("^GSPC", bars)
+
+        self.assertEqual(state, full_states[-1])
+        self.assertAlmostEqual(state.ma50, bars["Close"].rolling(50).mean().iloc[-1])
+        self.assertAlmostEqual(state.ma200, bars["Close"].rolling(200).mean().iloc[-1])
+
+    def test_signal_is_the_median_regime_across_indexes(self):
+        repo = MagicMock()
+        uptrend = _bars([100, 98, 96, 95, 96, 96.5, 97, 99], [10, 10, 10, 10, 9, 8, 8, 12])
+        correction = _bars([100, 99, 98, 97, 96, 95, 94, 93], [10] * 8)
+        repo.get_index_history.side_effect = lambda symbol, max_age=None: correction if symbol == "^RUT" else uptrend
+        signal = MarketDirectionService(economic_repo=repo).refresh()
+
+        self.assertEqual(signal.regime, MarketRegime.CONFIRMED_UPTREND)
+        self.assertEqual(signal.indexes["^RUT"].regime, MarketRegime.CORRECTION)
+        self.assertEqual(signal.as_of, uptrend.index[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pandas as pd
+
+from backend.core.infrastructure import yfinance_cache
+from backend.core.infrastructure.memory_cache import BundleLRUCache, LazyDict, SingleFlight, estimate_nbytes
+from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository, bundle_cache
+
+
+class TestBundleLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used_when_over_budget(self):
+        frame = pd.DataFrame({"Close": range(100)})
+        size = estimate_nbytes({"history": frame})
+        cache = BundleLRUCache(max_bytes=size * 2)
+
+        cache.put("aaa", {"history": frame})
+        cache.put("BBB", {"history": frame})
+        cache.get("AAA")
+        cache.put("CCC", {"history": frame})
+
+        self.assertIn("AAA", cache)
+        self.assertNotIn("BBB", cache)
+        self.assertIn("CCC", cache)
+        self.assertEqual(cache.nbytes, size * 2)
+
+    def test_oversized_entry_is_not_kept(self):
+        cache = BundleLRUCache(max_bytes=10)
+        cache.put("AAA", {"history": pd.DataFrame({"Close": range(100)})})
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_lazily_loaded_frames_count_against_the_budget(self):
+        frame = pd.DataFrame({"Close": range(100)})
+        size = estimate_nbytes(frame)
+        cache = BundleLRUCache(max_bytes=size * 2)
+        lazy = LazyDict({}, lambda key: frame.copy(), ["history", "financials"])
+        cache.put("AAA", ({}, lazy)) # Shaped like the (fetched, data) pairs the repository caches
+        cache.put("BBB", {"history": frame})
+        self.assertEqual(cache.nbytes, size)
+
+        lazy["history"]
+        self.assertEqual(cache.nbytes, size * 2)
+        lazy["history"] # Already loaded: counted once
+        self.assertEqual(cache.nbytes, size * 2)
+
+        lazy["financials"] # Over budget: the least recently used entry goes
+        self.assertNotIn("AAA", cache)
+        self.assertEqual(cache.nbytes, size)
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "done"
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flight.do, "AMD", work) for _ in range(5)]
+            while not flight.in_flight("AMD"):
+                time.sleep(0.01)
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, ["done"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(flight.in_flight("AMD"))
+
+    def test_errors_propagate_and_clear_the_flight(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("AMD", fail)
+        self.assertEqual(flight.do("AMD", lambda: 1), 1)
+
+
+class TestRepositoryCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.patcher = patch.object(yfinance_cache, "YFINANCE_CACHE_DIR", self.cache_dir)
+        self.patcher.start()
+        bundle_cache.clear()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.cache_dir)
+        bundle_cache.clear()
+
+    def test_concurrent_requests_trigger_one_fetch_and_then_hit_memory(self):
+        repo = YahooFinanceRepository()
+        calls = []
+
+        def slow_update(ticker, cached, stale):
+            calls.append(ticker)
+            time.sleep(0.1)
+            data = {"info": {"symbol": ticker}}
+            bundle_cache.put(ticker, (dict.fromkeys(stale, pd.Timestamp.now().to_pydatetime()), data))
+            return data
+
+        with patch("backend.core.infrastructure.yfinance_repository._read_disk_cache", return_value=None), \
+                patch.object(repo, "_update_all_data", side_effect=slow_update):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(repo.get_all_data, ["NVDA"] * 8))
+            again = repo.get_all_data("NVDA")
+
+        self.assertEqual(calls, ["NVDA"])
+        self.assertTrue(all(result == {"info": {"symbol": "NVDA"}} for result in results))
+        self.assertIs(again, results[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
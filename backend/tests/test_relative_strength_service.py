@@ -0,0 +1,93 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from backend.core.use_cases.relative_strength_service import (
+    RelativeStrengthService,
+    close_matrix,
+    rs_ratings,
+    weighted_performance,
+)
+
+
+def _history(closes, start="2024-06-03", tz="America/New_York"):
+    index = pd.bdate_range(start, periods=len(closes), tz=tz)
+    return pd.DataFrame({"Close": closes, "Volume": 1000.0}, index=index)
+
+
+def _universe(n_tickers=40, sessions=300, seed=3):
+    rng = np.random.default_rng(seed)
+    drifts = np.linspace(-0.002, 0.002, n_tickers)
+    return {
+        f"T{i:02d}": _history(100 * np.cumprod(1 + rng.normal(drift, 0.01, sessions)))
+        for i, drift in enumerate(drifts)
+    }
+
+
+class TestRelativeStrength(unittest.TestCase):
+
+    def test_weighted_performance_counts_the_latest_quarter_double(self):
+        # Flat for nine months, then +10% in the last quarter
+        closes = close_matrix({"UP": _history([100.0] * 190 + [110.0] * 63)})
+        expected = 0.4 * 0.1 + 0.2 * 0.1 * 3
+        self.assertAlmostEqual(weighted_performance(closes)["UP"], expected)
+
+    def test_ratings_rank_the_universe_from_1_to_99(self):
+        histories = _universe(n_tickers=200)
+        histories["NEW"] = _history([100.0] * 20, start="2025-07-01")
+        ratings = rs_ratings(weighted_performance(close_matrix(histories)))
+
+        self.assertTrue(pd.isna(ratings["NEW"]))
+        rated = ratings.dropna()
+        self.assertEqual((rated.min(), rated.max()), (1, 99))
+        scores = weighted_performance(close_matrix(histories)).dropna()
+        self.assertTrue(rated[scores.sort_values().index].is_monotonic_increasing)
+
+    def test_incremental_updates_match_a_full_rebuild_and_are_cached_per_day(self):
+        histories = _universe()
+        service = RelativeStrengthService(yfinance_repo=MagicMock())
+        for end in range(120, 301, 45):
+            revised = {ticker: history.iloc[:end].copy() for ticker, history in histories.items()}
+            revised["T00"].iloc[-1, 0] *= 1.5
+            service.update(revised)
+            service.ratings()
+            service.update({ticker: history.iloc[:end] for ticker, history in histories.items()})
+        service.update(histories)
+
+        full = close_matrix(histories).iloc[-len(service.closes):]
+        pd.testing.assert_frame_equal(service.closes, full, check_freq=False)
+        ratings = service.ratings()
+        pd.testing.assert_series_equal(ratings, rs_ratings(weighted_performance(full)))
+        self.assertIs(service.ratings(), ratings)
+
+        service.update({"T00": _history([1.0], start=full.index[-1] + pd.offsets.BDay())})
+        self.assertIsNot(service.ratings(), ratings)
+        self.assertIs(service.ratings(as_of=full.index[-1]), ratings)
+
+    def test_ratings_rank_against_the_whole_cached_universe(self):
+        histories = _universe(n_tickers=30)
+        repo = MagicMock()
+        repo.cached_fetch_times.return_value = dict.fromkeys(histories, datetime(2026, 1, 5))
+        repo.get_cached_many.side_effect = lambda tickers, fields: {t: {"history": histories[t]} for t in tickers}
+        repo.get_all_data_many.side_effect = lambda tickers, fields: {t: {"history": histories[t]} for t in tickers}
+        service = RelativeStrengthService(repo)
+
+        ratings = service.ratings_for(["T00"])
+
+        repo.get_all_data_many.assert_called_once_with(["T00"], fields=["history"])
+        self.assertEqual(list(ratings.index), ["T00"])
+        self.assertEqual(ratings["T00"], rs_ratings(weighted_performance(close_matrix(histories)))["T00"])
+        self.assertLess(ratings["T00"], 99) # Not the 99 it would get ranked alone
+        service.ratings_for(["T29"])
+        self.assertEqual(repo.get_cached_many.call_count, 1) # Nothing re-read until a fetch time changes
+
+        # A ticker dropped from the cache leaves the ranking universe; too small a universe rates nobody
+        repo.cached_fetch_times.return_value = {t: datetime(2026, 1, 5) for t in list(histories)[:10]}
+        self.assertEqual(len(service.universe_ratings()), 10)
+        self.assertTrue(service.universe_ratings().isna().all())
+
+if __name__ == "__main__":
+    unittest.main()
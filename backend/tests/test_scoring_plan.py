@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backend.core.entities.models import ResultStatus
+from backend.core.use_cases.scoring_plan import ScoringPlan, compile_rule, load_scoring_plan, read_framework
+
+
+def _framework(*criteria):
+    return {"spec": {"criteria_definitions": list(criteria)}}
+
+
+def _definition(criterion_id, weight, rule=None, category="O'Neil/CANSLIM"):
+    definition = {"id": criterion_id, "name": criterion_id, "category": category, "weight": weight}
+    if rule is not None:
+        definition["rule"] = rule
+    return definition
+
+
+class TestScoringPlan(unittest.TestCase):
+
+    def test_framework_file_compiles(self):
+        plan = load_scoring_plan()
+        framework = read_framework()
+        with_rules = [d["id"] for d in framework["spec"]["criteria_definitions"] if "rule" in d]
+        self.assertEqual(list(plan.criteria), with_rules)
+        self.assertIn("peg_ratio", plan.criteria)
+        self.assertNotIn("compelling_story", plan.criteria)
+        self.assertIs(load_scoring_plan(), plan)
+
+    def test_weighted_scores_and_missing_inputs(self):
+        plan = ScoringPlan.from_framework(_framework(
+            _definition("cheap", 20, {"column": "peg", "op": "<=", "value": 1.5}),
+            _definition("near_high", 10, {"column": "close", "op": ">=", "value": 0.95, "relative_to": "high"}),
+            _definition("quality", 10, {"all": [
+                {"column": "growth", "op": ">=", "value": 0.25},
+                {"column": "roe", "op": ">=", "value": 0.17},
+            ]}),
+            _definition("story", 5),
+        ))
+        frame = pd.DataFrame({
+            "peg": [1.0, 2.0, np.nan],
+            "close": [99.0, 80.0, 99.0],
+            "high": [100.0, 100.0, 100.0],
+            "growth": [0.3, 0.1, 0.3],
+        }, index=["A", "B", "C"])
+
+        evaluation = plan.evaluate(frame)
+        results = evaluation.results
+        self.assertEqual(results.loc["B"].tolist(), [False, False, False]) # False & NA is False
+        self.assertTrue(pd.isna(results.loc["A", "quality"])) # True & NA (no roe column) is NA
+        self.assertTrue(pd.isna(results.loc["C", "cheap"]))
+        self.assertEqual(evaluation.scores["score"].tolist(), [30.0, 0.0, 10.0])
+        self.assertEqual(evaluation.scores["max_score"].tolist(), [30.0, 40.0, 10.0])
+        self.assertAlmostEqual(evaluation.scores.loc["A", "coverage"], 0.75)
+
+        statuses = {k: r.status for k, r in plan.criterion_results(evaluation, "C").items()}
+        self.assertEqual(statuses, {
+            "cheap": ResultStatus.PENDING, "near_high": ResultStatus.PASS, "quality": ResultStatus.PENDING,
+        })
+
+    def test_malformed_rules_are_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_rule({"column": "peg", "op": "~", "value": 1})
+        with self.assertRaises(ValueError):
+            compile_rule({"all": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from backend.core.entities.models import Company, InvestmentCandidate
+from backend.core.use_cases.scoring_plan import ScoringPlan
+from backend.core.use_cases.screening_service import (
+    CRITERIA,
+    ScreeningService,
+    screen_universe,
+    survivors,
+    universe_frame,
+)
+
+
+def _bundle(info, closes=(10, 11, 12), highs=(12, 12, 12.2), volumes=(100, 100, 250)):
+    history = pd.DataFrame({"Close": closes, "High": highs, "Volume": volumes})
+    return {"info": info, "history": history}
+
+
+class TestScreeningService(unittest.TestCase):
+
+    def test_pass_fail_matrix(self):
+        bundles = {
+            "GOOD": _bundle({
+                "revenueGrowth": 0.3, "trailingPE": 30, "pegRatio": 0.8,
+                "earningsQuarterlyGrowth": 0.4, "netSharePurchaseActivity": {"buyInfoCount": 2},
+            }),
+            "BAD": _bundle(
+                {"revenueGrowth": "abc", "trailingPE": 50, "pegRatio": 2.5, "earningsQuarterlyGrowth": 0.1},
+                closes=(10, 9, 8), volumes=(100, 100, 100),
+            ),
+            "EMPTY": None,
+        }
+        frame = universe_frame(bundles)
+        frame["rs_rating"] = [95, 20]
+        matrix = screen_universe(frame)
+
+        self.assertEqual(list(matrix.columns), list(CRITERIA))
+        self.assertEqual(list(matrix.index), ["GOOD", "BAD"])
+        self.assertEqual(frame["category"].tolist(), ["Fast Grower", "Turnaround or Asset Play"])
+        self.assertTrue(matrix.loc["GOOD"].all())
+        self.assertFalse(matrix.loc["BAD"].any())
+        self.assertEqual(survivors(matrix), ["GOOD"])
+        self.assertEqual(list(screen_universe(universe_frame(bundles), ["peg_ratio", "unknown"]).columns), ["peg_ratio"])
+
+    def test_thresholds_come_from_the_scoring_plan(self):
+        frame = pd.DataFrame({"peg_ratio": [1.2, 1.8], "rs_rating": [85.0, 75.0]}, index=["A", "B"])
+        self.assertEqual(screen_universe(frame, ["peg_ratio"])["peg_ratio"].tolist(), [True, False])
+
+        looser = ScoringPlan.from_framework({"spec": {"criteria_definitions": [
+            {"id": "peg_ratio", "category": "Lynch/Fisher", "rule": {"column": "peg_ratio", "op": "<=", "value": 2.0}},
+        ]}})
+        self.assertEqual(screen_universe(frame, ["peg_ratio"], plan=looser)["peg_ratio"].tolist(), [True, True])
+        with self.assertRaises(ValueError):
+            screen_universe(frame, ["relative_strength"], plan=looser)
+
+    def test_one_ticker_is_rated_against_the_cached_universe(self):
+        index = pd.bdate_range("2025-01-02", periods=260)
+        def history(end):
+            closes = np.linspace(100, end, len(index))
+            return pd.DataFrame({"Close": closes, "High": closes, "Volume": 1000.0}, index=index)
+        cached = {f"T{i}": {"info": {"trailingPE": 20}, "history": history(100 + 5 * i)} for i in range(30)}
+        cached["LOSER"] = {"info": {"trailingPE": 20}, "history": history(50)}
+        repo = MagicMock()
+        repo.get_all_data_many.side_effect = lambda tickers, fields: {t: cached[t] for t in tickers}
+        repo.get_cached_many.side_effect = lambda tickers, fields: {t: cached[t] for t in tickers}
+        repo.cached_fetch_times.return_value = dict.fromkeys(cached, datetime(2026, 1, 5))
+        service = ScreeningService(repo)
+        loser = InvestmentCandidate(company=Company("LOSER", "Loser", "Retail"))
+
+        self.assertEqual(service.load_universe(["LOSER"]).loc["LOSER", "rs_rating"], 4.0) # Last of 31
+        self.assertFalse(service.screen(loser, ["relative_strength"]))
+
+        # Without enough tickers to rank against, the rating is missing and fails
+        repo.cached_fetch_times.return_value = {"LOSER": datetime(2026, 1, 5)}
+        self.assertTrue(np.isnan(ScreeningService(repo).load_universe(["LOSER"]).loc["LOSER", "rs_rating"]))
+        self.assertFalse(ScreeningService(repo).screen(loser, ["relative_strength"]))
+
+    def test_screens_five_thousand_tickers_in_well_under_a_second(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        frame = pd.DataFrame({
+            "category": rng.choice(["Fast Grower", "Stalwart", "Cyclical"], n),
+            "revenue_growth": rng.normal(0.1, 0.2, n),
+            "trailing_pe": rng.uniform(0, 60, n),
+            "peg_ratio": rng.uniform(0, 3, n),
+            "eps_growth_quarterly": rng.normal(0.1, 0.3, n),
+            "return_on_equity": rng.normal(0.15, 0.1, n),
+            "market_cap": rng.uniform(1e8, 1e12, n),
+            "insider_buys": rng.integers(0, 3, n).astype(float),
+            "last_close": rng.uniform(5, 500, n),
+            "high_52w": rng.uniform(5, 600, n),
+            "last_volume": rng.uniform(1e5, 1e7, n),
+            "avg_volume": rng.uniform(1e5, 1e7, n),
+            "rs_rating": rng.integers(1, 100, n).astype(float),
+        }, index=[f"T{i}" for i in range(n)])
+
+        started = time.perf_counter()
+        matrix = screen_universe(frame)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(matrix.shape, (n, len(CRITERIA)))
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+from backend.core.infrastructure.snapshot_store import OBJECTS_DIR, SnapshotStore
+
+
+def _blobs(root: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(os.path.join(root, OBJECTS_DIR)))
+
+
+class TestSnapshotStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.store = SnapshotStore(self.root)
+
+    def test_unchanged_content_is_stored_once_and_read_as_of_any_day(self):
+        self.assertTrue(self.store.put("AMD", "info", b"v1", date(2026, 1, 5)))
+        self.assertFalse(self.store.put("AMD", "info", b"v1", date(2026, 1, 6)))
+        self.assertTrue(self.store.put("AMD", "info", b"v2", date(2026, 1, 8)))
+        self.assertTrue(self.store.put("NVDA", "info", b"v1", date(2026, 1, 8))) # Shares AMD's blob
+
+        self.assertEqual([v["as_of"] for v in self.store.versions("AMD", "info")], [date(2026, 1, 5), date(2026, 1, 8)])
+        self.assertEqual(_blobs(self.root), 2)
+        self.assertIsNone(self.store.get("AMD", "info", date(2026, 1, 4)))
+        self.assertEqual(self.store.get("AMD", "info", date(2026, 1, 7)), b"v1")
+        self.assertEqual(self.store.get_many(["AMD", "NVDA", "GE"], ["info", "history"], date(2026, 2, 1)), {
+            ("AMD", "info"): b"v2", ("NVDA", "info"): b"v1",
+        })
+
+    def test_the_last_write_of_a_day_wins(self):
+        self.store.put("AMD", "info", b"v1", date(2026, 1, 5))
+        self.store.put("AMD", "info", b"draft", date(2026, 1, 6))
+        self.store.put("AMD", "info", b"final", date(2026, 1, 6))
+        self.assertEqual(self.store.get("AMD", "info", date(2026, 1, 6)), b"final")
+        self.assertEqual(_blobs(self.root), 2) # "draft" is no longer referenced
+
+        # Reverting to the previous day's content leaves a single version
+        self.assertFalse(self.store.put("AMD", "info", b"v1", date(2026, 1, 6)))
+        self.assertEqual(len(self.store.versions("AMD", "info")), 1)
+        self.assertEqual(_blobs(self.root), 1)
+
+    def test_prune_keeps_the_version_in_effect_at_the_cutoff(self):
+        for day, content in ((1, b"a"), (2, b"b"), (3, b"c"), (10, b"d")):
+            self.store.put("AMD", "history", content, date(2026, 1, day))
+
+        removed = self.store.prune(date(2026, 1, 5))
+
+        self.assertEqual(removed, 2)
+        self.assertEqual([v["as_of"].day for v in self.store.versions("AMD", "history")], [3, 10])
+        self.assertEqual(self.store.get("AMD", "history", date(2026, 1, 5)), b"c")
+        self.assertEqual(self.store.total_size(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
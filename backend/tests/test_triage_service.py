@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import MagicMock
+
+from backend.core.use_cases.triage_service import AMBIGUOUS, FAST_GROWER, REJECT, TriageService, triage_frame
+
+INFOS = {
+    "FAST": {"revenueGrowth": 0.35, "earningsQuarterlyGrowth": 0.5, "trailingPE": 30},
+    "STEADY": {"revenueGrowth": 0.05, "earningsQuarterlyGrowth": 0.03, "trailingPE": 18},
+    "LOSS": {"revenueGrowth": 0.4, "earningsQuarterlyGrowth": None, "trailingPE": None}, # No P/E while losing money
+    "SLUMP": {"revenueGrowth": -0.02, "earningsQuarterlyGrowth": -0.6, "trailingPE": 12}, # Possible turnaround
+    "RICH": {"revenueGrowth": 0.3, "earningsQuarterlyGrowth": 0.4, "trailingPE": 85},
+    "BORDER": {"revenueGrowth": 0.18, "earningsGrowth": 0.25, "trailingPE": 25},
+}
+
+
+class TestTriageService(unittest.TestCase):
+
+    def test_only_clear_cases_are_decided(self):
+        decisions = triage_frame({**INFOS, "NODATA": None})["decision"].to_dict()
+        self.assertEqual(decisions, {
+            "FAST": FAST_GROWER, "STEADY": REJECT, "LOSS": AMBIGUOUS, "SLUMP": AMBIGUOUS,
+            "RICH": AMBIGUOUS, "BORDER": AMBIGUOUS, "NODATA": AMBIGUOUS,
+        })
+
+    def test_llm_sees_only_ambiguous_tickers_and_results_are_merged(self):
+        repo = MagicMock()
+        repo.get_cached_many.return_value = {**{ticker: {"info": info} for ticker, info in INFOS.items()}, "UNCACHED": None}
+        llm = MagicMock(return_value={
+            "content": {
+                "fast_growers": [{"ticker": "BORDER", "justification": "Expanding."}],
+                "turnarounds": [{"ticker": "SLUMP", "justification": "New management."}, {"ticker": "STEADY"}],
+            },
+            "model": "fast",
+            "format": "json",
+        })
+
+        response = TriageService(repo).categorize([*INFOS, "UNCACHED"], llm)
+
+        repo.get_all_data_many.assert_not_called()
+        llm.assert_called_once_with(["LOSS", "SLUMP", "RICH", "BORDER", "UNCACHED"])
+        content = response["content"]
+        self.assertEqual([item["ticker"] for item in content["fast_growers"]], ["FAST", "BORDER"])
+        self.assertEqual([item["ticker"] for item in content["turnarounds"]], ["SLUMP"])
+        self.assertEqual(content["pre_triage"]["rejected"], ["STEADY"])
+
+    def test_llm_is_skipped_when_nothing_is_ambiguous_or_fails(self):
+        repo = MagicMock()
+        repo.get_cached_many.return_value = {t: {"info": INFOS[t]} for t in ("FAST", "STEADY")}
+        llm = MagicMock()
+        response = TriageService(repo).categorize(["FAST", "STEADY"], llm)
+        llm.assert_not_called()
+        self.assertEqual(response["model"], "pre_triage")
+        self.assertEqual([item["ticker"] for item in response["content"]["fast_growers"]], ["FAST"])
+
+        repo.get_cached_many.return_value = {"FAST": {"info": INFOS["FAST"]}, "LOSS": {"info": INFOS["LOSS"]}}
+        llm = MagicMock(return_value={"content": "AI evaluation failed", "model": "fast", "format": "error"})
+        response = TriageService(repo).categorize(["FAST", "LOSS"], llm)
+        self.assertEqual(response, {"content": "AI evaluation failed", "model": "fast", "format": "error"})
+
+        llm = MagicMock(return_value={"content": "Not JSON", "model": "fast", "format": "text"})
+        response = TriageService(repo).categorize(["FAST", "LOSS"], llm)
+        self.assertEqual([item["ticker"] for item in response["content"]["fast_growers"]], ["FAST"])
+        self.assertEqual(response["content"]["turnarounds"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
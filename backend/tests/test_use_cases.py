@@ -1,15 +1,37 @@
+import glob
+import os
+import shutil
+import tempfile
 import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+import pandas as pd
+from backend.core.infrastructure import yfinance_cache
+from backend.core.infrastructure.yfinance_cache import load_legacy_json
 from backend.core.use_cases.categorization_service import CategorizationService
 from backend.core.use_cases.screening_service import ScreeningService
+from backend.core.use_cases import valuation_service
 from backend.core.use_cases.valuation_service import ValuationService
 from backend.core.entities.models import InvestmentCandidate, Company, CriterionCategory
 
+LEGACY_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "yfinance_data")
+
 class TestUseCases(unittest.TestCase):
 
     def setUp(self):
         self.dummy_company = Company(ticker="TEST", name="Test Company", industry="Tech")
         self.dummy_candidate = InvestmentCandidate(company=self.dummy_company)
 
+    def _legacy_fixtures(self) -> list[str]:
+        """Copies of the legacy ``<TICKER>.json`` fixtures, which the cache migrates (and deletes) on first read."""
+        fixture_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, fixture_dir, ignore_errors=True)
+        for path in glob.glob(os.path.join(LEGACY_CACHE_DIR, "*.json")):
+            shutil.copy(path, fixture_dir)
+        paths = sorted(glob.glob(os.path.join(fixture_dir, "*.json")))
+        self.assertTrue(paths, f"No legacy cache fixtures in {LEGACY_CACHE_DIR}")
+        return paths
+
     def test_categorization_service(self):
         service = CategorizationService()
         # The categorize method in use_cases/categorization_service.py expects a dict
@@ -95,16 +117,98 @@ class TestUseCases(unittest.TestCase):
         self.assertEqual(category, "Turnaround or Asset Play") # Assuming default behavior
 
 
+    def test_categorize_many_matches_categorize(self):
+        service = CategorizationService()
+        records = {}
+        for path in self._legacy_fixtures():
+            _, data = load_legacy_json(path)
+            records[os.path.basename(path)] = data["info"]
+        # Edge cases of float() coercion and the scalar branches
+        edge_values = [None, 0, -0.0, 0.1, 0.2, 0.2000001, 40, 40.5, -0.05, "20", " 0.3 ", "abc", "nan",
+                       float("nan"), "inf", float("-inf"), True, np.float32(0.15), [1]]
+        for i, growth in enumerate(edge_values):
+            for j, pe_ratio in enumerate(edge_values):
+                records[f"edge_{i}_{j}"] = {"revenueGrowth": growth, "trailingPE": pe_ratio}
+        records["no_info"] = {}
+
+        categories = service.categorize_many(records)
+
+        self.assertEqual(list(categories.index), list(records))
+        for key, info in records.items():
+            self.assertEqual(categories[key], service.categorize({"info": info}), key)
+        # In a frame NaN marks a missing value, so compare on records without NaN
+        real = {key: info for key, info in records.items() if not key.startswith("edge_")}
+        frame = pd.DataFrame.from_dict(real, orient="index").reindex(list(real))
+        pd.testing.assert_series_equal(service.categorize_many(frame), categories[list(real)])
+        self.assertEqual(service.categorize_many(list(records.values())).tolist(), categories.tolist())
+
     def test_screening_service(self):
         service = ScreeningService()
         criteria_ids = ["criterion1", "criterion2"]
         result = service.screen(self.dummy_candidate, criteria_ids)
         self.assertTrue(result)
 
+    def _statement_bundle(self, price=40.0):
+        years = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31", "2021-12-31"])
+        quarters = pd.to_datetime(["2024-12-31", "2024-09-30", "2024-06-30", "2024-03-31"])
+        return {
+            "info": {"currentPrice": price, "forwardEps": 2.5, "sharesOutstanding": 100},
+            "financials": pd.DataFrame([[2.0, 1.6, 1.28, 1.024]], index=["Diluted EPS"], columns=years),
+            "quarterly_financials": pd.DataFrame([[0.6, 0.5, 0.5, 0.4]], index=["Diluted EPS"], columns=quarters),
+            "balance_sheet": pd.DataFrame(
+                [[500.0], [200.0]],
+                index=["Cash Cash Equivalents And Short Term Investments", "Total Debt"],
+                columns=years[:1],
+            ),
+        }
+
     def test_valuation_service(self):
-        service = ValuationService()
+        repo = MagicMock()
+        repo.get_all_data.return_value = self._statement_bundle()
+        service = ValuationService(repo)
+
         peg_ratio = service.calculate_peg_ratio(self.dummy_candidate)
-        self.assertEqual(peg_ratio, 0.9)
+
+        repo.get_all_data.assert_called_once_with("TEST", fields=["info", "financials", "quarterly_financials", "balance_sheet"])
+        # EPS grew 25% a year; a P/E of 20 on $2.00 of TTM EPS is a PEG of 0.8
+        self.assertAlmostEqual(peg_ratio, 0.8)
+        row = service.value_universe({"TEST": self._statement_bundle()}).loc["TEST"]
+        self.assertAlmostEqual(row["eps_cagr"], 0.25)
+        self.assertAlmostEqual(row["forward_peg"], 16 / 25)
+        self.assertAlmostEqual(row["net_cash_per_share"], 3.0)
+        self.assertAlmostEqual(row["fair_value"], 50.0)
+
+    def test_valuation_fundamentals_are_memoized_per_fiscal_period(self):
+        service = ValuationService(MagicMock())
+        bundles = {"AAA": self._statement_bundle(), "BBB": self._statement_bundle()}
+        with patch("backend.core.use_cases.valuation_service.statement_fundamentals",
+                   wraps=valuation_service.statement_fundamentals) as compute:
+            service.value_universe(bundles)
+            cheaper = service.value_universe({**bundles, "AAA": self._statement_bundle(price=20.0)})
+            self.assertEqual(compute.call_count, 1)
+            self.assertAlmostEqual(cheaper.loc["AAA", "trailing_peg"], 0.4)
+
+            # A new quarter lands for BBB only
+            newer = self._statement_bundle()
+            newer["quarterly_financials"][pd.Timestamp("2025-03-31")] = 0.7
+            service.value_universe({**bundles, "BBB": newer})
+            self.assertEqual(compute.call_count, 2)
+            self.assertEqual(len(compute.call_args.args[0]), 1)
+
+    def test_valuation_runs_over_cached_tickers(self):
+        fixtures = self._legacy_fixtures()
+        cache_dir = os.path.dirname(fixtures[0])
+        with patch.object(yfinance_cache, "YFINANCE_CACHE_DIR", cache_dir):
+            tickers = yfinance_cache.migrate_legacy_cache()
+            bundles = {ticker: yfinance_cache.read_bundle(ticker)[1] for ticker in tickers}
+        self.assertEqual(len(bundles), len(fixtures))
+
+        frame = ValuationService(MagicMock()).value_universe(bundles)
+
+        self.assertEqual(len(frame), len(bundles))
+        self.assertTrue(frame["net_cash"].notna().all())
+        self.assertTrue(frame["ttm_eps"].notna().any())
+        self.assertTrue(frame["trailing_pe"].notna().any())
 
 if __name__ == '__main__':
     unittest.main()
@@ -162,6 +162,7 @@ class TestVettingService(unittest.TestCase):
         canslim_results_empty = service._vet_canslim_criteria(info_empty_history, data_empty_history)
         self.assertEqual(canslim_results_empty["52-Week High Status"]["value"], "0.00%")
         self.assertEqual(canslim_results_empty["Volume vs. Avg"]["value"], "0.00%")
+        self.assertEqual(canslim_results_empty["Base Breakout"], {"pass": False, "value": "No base"})
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from backend.core.infrastructure import yfinance_cache
+from backend.core.infrastructure.rate_limit import RequestBudget
+from backend.core.infrastructure.yfinance_repository import YahooFinanceRepository, bundle_cache
+from backend.core.interfaces.warm_cache import read_universe, warm_up
+
+SOURCE_CACHE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "yfinance_data", "AMD.json")
+
+
+class TestRequestBudget(unittest.TestCase):
+
+    def test_blocks_until_the_oldest_call_leaves_the_window(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        budget = RequestBudget(2, period=60, clock=lambda: now[0], sleep=sleep)
+        budget.acquire()
+        now[0] = 10
+        budget.acquire()
+        budget.acquire()
+
+        self.assertEqual(sleeps, [50])
+        self.assertEqual(now[0], 60)
+
+
+class TestWarmUp(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = patch.object(yfinance_cache, "YFINANCE_CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        bundle_cache.clear()
+        self.addCleanup(bundle_cache.clear)
+        _, self.data = yfinance_cache.load_legacy_json(SOURCE_CACHE)
+
+    def test_read_universe(self):
+        path = os.path.join(self.cache_dir, "universe.txt")
+        with open(path, "w") as f:
+            f.write("# watchlist\namd, nvda\nMSFT  # software\n\nAMD\n")
+        self.assertEqual(read_universe(path), ["AMD", "NVDA", "MSFT"])
+
+    def test_skips_fresh_tickers_and_reports_failures(self):
+        now = datetime.now()
+        yfinance_cache.write_bundle("AMD", self.data, fetched=dict.fromkeys(yfinance_cache.DATASETS, now))
+        yfinance_cache.write_bundle("NVDA", self.data, fetched=dict.fromkeys(yfinance_cache.DATASETS, now - timedelta(days=30)))
+        repo = YahooFinanceRepository()
+        fetched = []
+
+        def update(ticker, cached, stale):
+            fetched.append(ticker)
+            return None if ticker == "MSFT" else cached[1]
+
+        with patch.object(repo, "_update_all_data", side_effect=update):
+            summary = warm_up(repo, ["AMD", "NVDA", "MSFT"], max_workers=2, report=lambda line: None)
+
+        self.assertEqual(sorted(fetched), ["MSFT", "NVDA"])
+        self.assertEqual(summary, {"total": 3, "skipped": 1, "fetched": 1, "failed": ["MSFT"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,318 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pandas as pd
+
+from backend.core.infrastructure import yfinance_cache
+from backend.core.infrastructure.yfinance_repository import (
+    FRESH_PRICE_ANY_AGE_STATEMENTS,
+    YahooFinanceRepository,
+    _new_fiscal_period_possible,
+    bundle_cache,
+    serialize_bundle,
+)
+
+LEGACY_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "yfinance_data")
+
+
+class TestYFinanceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.patcher = patch.object(yfinance_cache, "YFINANCE_CACHE_DIR", self.cache_dir)
+        self.patcher.start()
+        bundle_cache.clear()
+        shutil.copy(os.path.join(LEGACY_CACHE_DIR, "AMD.json"), self.cache_dir)
+
+    def tearDown(self):
+        self.patcher.stop()
+        bundle_cache.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_migration_round_trips_frames(self):
+        legacy_path = yfinance_cache.get_legacy_file_path("AMD")
+        legacy_timestamp, legacy = yfinance_cache.load_legacy_json(legacy_path)
+
+        migrated = yfinance_cache.migrate_legacy_cache()
+
+        self.assertEqual(migrated, ["AMD"])
+        self.assertFalse(os.path.exists(legacy_path))
+        fetched, data = yfinance_cache.read_bundle("AMD")
+        self.assertEqual(fetched, dict.fromkeys(yfinance_cache.DATASETS, legacy_timestamp))
+        self.assertEqual(data["info"], legacy["info"])
+        self.assertEqual(data["market_cap"], legacy["market_cap"])
+        for dataset in yfinance_cache.FRAME_DATASETS:
+            # Period-end columns come back as dates, possibly at another datetime resolution
+            pd.testing.assert_frame_equal(data[dataset], legacy[dataset], check_freq=False, check_column_type=False)
+        self.assertIsInstance(data["financials"].columns[0], pd.Timestamp)
+
+    def test_default_encoding_is_compressed_and_plain_meta_still_decodes(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        yfinance_cache.write_bundle("AMD", legacy)
+        ticker_dir = yfinance_cache.get_ticker_dir("AMD")
+        self.assertTrue(os.path.exists(os.path.join(ticker_dir, "meta.json.gz")))
+        self.assertLess(os.path.getsize(os.path.join(ticker_dir, "history.arrow")), len(legacy["history"].to_json()) / 4)
+
+        with patch.multiple(yfinance_cache, META_COMPRESSION=None, ARROW_COMPRESSION=None):
+            yfinance_cache.write_bundle("AMD", legacy)
+        self.assertEqual(sorted(f for f in os.listdir(ticker_dir) if f.startswith("meta")), ["meta.json"])
+
+        _, data = yfinance_cache.read_bundle("AMD")
+        self.assertEqual(data["info"], legacy["info"])
+        pd.testing.assert_frame_equal(data["history"], legacy["history"], check_freq=False)
+
+    def test_serialized_bundle_matches_legacy_wire_format(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        yfinance_cache.migrate_legacy_file("AMD")
+        _, data = yfinance_cache.read_bundle("AMD")
+
+        serialized = serialize_bundle(data)
+
+        self.assertIsInstance(serialized["history"], str)
+        self.assertEqual(serialized["financials"], legacy["financials"].to_json())
+
+    def test_repository_reads_fresh_entry_without_network(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        os.remove(yfinance_cache.get_legacy_file_path("AMD"))
+        yfinance_cache.write_bundle("AMD", legacy, fetched=dict.fromkeys(yfinance_cache.DATASETS, datetime.now() - timedelta(minutes=5)))
+
+        repo = YahooFinanceRepository()
+        with patch.object(repo, "get_ticker", side_effect=AssertionError("network access")):
+            data = repo.get_all_data("AMD")
+
+        self.assertEqual(data["info"]["symbol"], "AMD")
+        self.assertFalse(data["history"].empty)
+
+
+    def test_refresh_migrates_a_legacy_entry_under_its_own_lock(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        bundle_cache.put("AMD", (dict.fromkeys(yfinance_cache.DATASETS, datetime.now() - timedelta(days=30)), legacy))
+
+        repo = YahooFinanceRepository()
+        result = {}
+        with patch.object(repo, "_update_all_data", side_effect=lambda ticker, cached, stale: cached[1]):
+            worker = threading.Thread(target=lambda: result.update(data=repo.get_all_data("AMD")), daemon=True)
+            worker.start()
+            worker.join(timeout=10)
+
+        self.assertFalse(worker.is_alive(), "refresh deadlocked on the ticker lock")
+        self.assertTrue(yfinance_cache.has_bundle("AMD"))
+        self.assertFalse(os.path.exists(yfinance_cache.get_legacy_file_path("AMD")))
+        self.assertEqual(result["data"]["info"]["symbol"], "AMD")
+
+    def test_bulk_fetch_serves_hits_and_fetches_misses_in_order(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        os.remove(yfinance_cache.get_legacy_file_path("AMD"))
+        yfinance_cache.write_bundle("AMD", legacy)
+
+        repo = YahooFinanceRepository()
+        fetched = []
+
+        def fake_fetch(ticker, cached, stale):
+            fetched.append(ticker)
+            if ticker == "FAIL":
+                raise RuntimeError("boom")
+            return {"info": {"symbol": ticker}}
+
+        with patch.object(repo, "_update_all_data", side_effect=fake_fetch):
+            streamed = list(repo.iter_all_data(["AMD", "NVDA", "FAIL"], max_workers=2))
+            results = repo.get_all_data_many(["NVDA", "AMD", "FAIL", "NVDA"], max_workers=2)
+
+        self.assertEqual(streamed[0][0], "AMD")
+        self.assertEqual(list(results), ["NVDA", "AMD", "FAIL"])
+        self.assertEqual(results["NVDA"], {"info": {"symbol": "NVDA"}})
+        self.assertEqual(results["AMD"]["info"]["symbol"], "AMD")
+        self.assertIsNone(results["FAIL"])
+        self.assertNotIn("AMD", fetched)
+
+
+    def test_expired_entry_is_refreshed_incrementally(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        os.remove(yfinance_cache.get_legacy_file_path("AMD"))
+        yfinance_cache.write_bundle("AMD", legacy, fetched=dict.fromkeys(yfinance_cache.DATASETS, datetime.now() - timedelta(days=2)))
+        last_bar = legacy["history"].index[-1]
+        new_index = pd.DatetimeIndex([last_bar, last_bar + timedelta(days=1)]).tz_localize("UTC").tz_convert("America/New_York")
+        new_bars = legacy["history"].iloc[-2:].set_axis(new_index)
+        new_bars.iloc[0, new_bars.columns.get_loc("Close")] = 1.0
+
+        ticker_obj = MagicMock(ticker="AMD", info={"symbol": "AMD", "marketCap": 1})
+        ticker_obj.history.return_value = new_bars
+        financials = PropertyMock()
+        type(ticker_obj).quarterly_financials = financials
+
+        repo = YahooFinanceRepository()
+        with patch.object(repo, "get_ticker", return_value=ticker_obj), \
+                patch("backend.core.infrastructure.yfinance_repository._new_fiscal_period_possible", return_value=False):
+            data = repo.get_all_data("AMD")
+
+        ticker_obj.history.assert_called_once_with(start=last_bar.date())
+        financials.assert_not_called()
+        self.assertEqual(data["history"].index[-1], new_index[-1])
+        self.assertFalse(data["history"].index.has_duplicates)
+        self.assertEqual(data["history"]["Close"].iloc[-2], 1.0)
+        self.assertEqual(data["market_cap"], 1)
+        pd.testing.assert_frame_equal(data["quarterly_financials"], legacy["quarterly_financials"], check_column_type=False)
+
+    def test_past_days_replay_from_snapshots(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        history = legacy["history"]
+        monday, tuesday, wednesday = datetime(2025, 6, 30, 20), datetime(2025, 7, 1, 20), datetime(2025, 7, 2, 20)
+        yfinance_cache.write_bundle("AMD", legacy, fetched=dict.fromkeys(yfinance_cache.DATASETS, monday))
+        # Tuesday's refresh only changes the price history, adding a bar and revising Monday's
+        new_bars = history.iloc[[-1, -1]].set_axis([history.index[-1], history.index[-1] + timedelta(days=1)])
+        new_bars.iloc[0, new_bars.columns.get_loc("Close")] = 1.0
+        updated = {**legacy, "history": pd.concat([history.iloc[:-1], new_bars])}
+        yfinance_cache.write_bundle("AMD", updated, fetched=dict.fromkeys(yfinance_cache.DATASETS, tuesday))
+        # Wednesday's cache holds only the latest bars; the log keeps the rest
+        yfinance_cache.write_bundle("AMD", {**updated, "history": new_bars}, fetched={"history": wednesday}, datasets=["history"])
+
+        store = yfinance_cache.get_snapshot_store()
+        self.assertEqual([v["as_of"] for v in store.versions("AMD", "financials")], [monday.date()])
+        self.assertEqual(store.versions("AMD", "history"), [])
+        self.assertEqual(len(yfinance_cache._read_history_log("AMD")), len(history) + 1)
+
+        repo = YahooFinanceRepository()
+        with patch.object(repo, "get_ticker", side_effect=AssertionError("network access")):
+            before = repo.get_all_data_as_of("amd", history.index[-2].date())
+            after = repo.get_all_data_many_as_of(["AMD", "NVDA"], wednesday.date(), fields=["info", "history"])
+
+        self.assertIsNone(before) # No info snapshot before Monday
+        before = repo.get_all_data_as_of("AMD", monday.date())
+        self.assertEqual(before["info"], legacy["info"])
+        self.assertEqual(before["history"]["Close"].iloc[-1], 1.0) # Revised bars replace the logged ones
+        pd.testing.assert_frame_equal(
+            before["history"].iloc[:-1], history.iloc[:-1], check_freq=False, check_index_type=False,
+        )
+        self.assertIsInstance(before["financials"].columns[0], pd.Timestamp)
+        self.assertEqual(after["AMD"]["history"].index[-1], new_bars.index[-1])
+        self.assertLessEqual(after["AMD"]["history"].index[-1] - after["AMD"]["history"].index[0], yfinance_cache.HISTORY_WINDOW)
+        self.assertTrue(after["AMD"]["financials"].empty)
+        self.assertIsNone(after["NVDA"])
+
+    def test_pruning_trims_the_history_log(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        yfinance_cache.write_bundle("AMD", legacy)
+        last_bar = legacy["history"].index[-1].date()
+
+        yfinance_cache.prune_snapshots(date.today() - last_bar + timedelta(days=1) - yfinance_cache.HISTORY_WINDOW)
+        self.assertEqual(yfinance_cache._read_history_log("AMD").index[0].date(), last_bar)
+        self.assertEqual(yfinance_cache.prune_snapshots(date.today() - last_bar - yfinance_cache.HISTORY_WINDOW), 1)
+        self.assertTrue(yfinance_cache._read_history_log("AMD").empty)
+
+    def test_new_fiscal_period_possible(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        latest_quarter = legacy["quarterly_financials"].columns.max()
+
+        self.assertFalse(_new_fiscal_period_possible(legacy, now=latest_quarter + timedelta(days=30)))
+        self.assertTrue(_new_fiscal_period_possible(legacy, now=latest_quarter + timedelta(days=95)))
+        self.assertTrue(_new_fiscal_period_possible({}))
+
+
+    def test_datasets_refresh_on_their_own_ttl(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        os.remove(yfinance_cache.get_legacy_file_path("AMD"))
+        now = datetime.now()
+        fetched = dict.fromkeys(yfinance_cache.DATASETS, now - timedelta(days=30))
+        fetched.update({"info": now - timedelta(minutes=5), "insider_transactions": now - timedelta(minutes=5)})
+        fetched["history"] = now - timedelta(hours=2)
+        yfinance_cache.write_bundle("AMD", legacy, fetched=fetched)
+
+        ticker_obj = MagicMock(ticker="AMD")
+        ticker_obj.history.return_value = pd.DataFrame()
+        info = PropertyMock()
+        type(ticker_obj).info = info
+        statements = PropertyMock()
+        type(ticker_obj).financials = statements
+
+        repo = YahooFinanceRepository()
+        with patch.object(repo, "get_ticker", return_value=ticker_obj):
+            data = repo.get_all_data("AMD", max_age=FRESH_PRICE_ANY_AGE_STATEMENTS)
+
+        ticker_obj.history.assert_called_once()
+        info.assert_not_called()
+        statements.assert_not_called()
+        self.assertEqual(data["info"]["symbol"], "AMD")
+        refreshed, _ = yfinance_cache.read_bundle("AMD")
+        self.assertGreater(refreshed["history"], now)
+        self.assertEqual(refreshed["financials"], fetched["financials"])
+
+
+    def test_stale_while_revalidate_returns_expired_data_and_refreshes_in_background(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        os.remove(yfinance_cache.get_legacy_file_path("AMD"))
+        fetched = dict.fromkeys(yfinance_cache.DATASETS, datetime.now() - timedelta(minutes=5))
+        fetched["history"] = datetime.now() - timedelta(hours=3)
+        yfinance_cache.write_bundle("AMD", legacy, fetched=fetched)
+
+        repo = YahooFinanceRepository()
+        refreshed = threading.Event()
+        with patch.object(repo, "_refresh", side_effect=lambda ticker, ttls, fields: refreshed.set()) as refresh:
+            data = repo.get_all_data("AMD", stale_while_revalidate=True)
+            self.assertTrue(refreshed.wait(timeout=5))
+
+        refresh.assert_called_once()
+        self.assertEqual(data["cache_status"]["stale_datasets"], ["history"])
+        self.assertGreaterEqual(data["cache_status"]["age_seconds"], 3 * 3600)
+        pd.testing.assert_frame_equal(data["history"], legacy["history"], check_freq=False)
+        self.assertNotIn("cache_status", yfinance_cache.read_bundle("AMD")[1])
+
+    def test_expired_datasets_have_no_age(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        os.remove(yfinance_cache.get_legacy_file_path("AMD"))
+        yfinance_cache.write_bundle("AMD", legacy, fetched=dict.fromkeys(yfinance_cache.DATASETS, datetime.now()))
+        yfinance_cache.expire_datasets(["AMD"], ["history"])
+
+        repo = YahooFinanceRepository()
+        with patch.object(repo, "_refresh"):
+            data = repo.get_all_data("AMD", stale_while_revalidate=True)
+
+        self.assertEqual(data["cache_status"]["stale_datasets"], ["history"])
+        self.assertIsNone(data["cache_status"]["age_seconds"])
+
+    def test_projected_read_loads_other_frames_lazily(self):
+        _, legacy = yfinance_cache.load_legacy_json(yfinance_cache.get_legacy_file_path("AMD"))
+        os.remove(yfinance_cache.get_legacy_file_path("AMD"))
+        now = datetime.now()
+        fetched = dict.fromkeys(yfinance_cache.DATASETS, now - timedelta(days=30))
+        fetched.update({"info": now, "history": now})
+        yfinance_cache.write_bundle("AMD", legacy, fetched=fetched)
+
+        repo = YahooFinanceRepository()
+        with patch.object(yfinance_cache, "_read_frame", wraps=yfinance_cache._read_frame) as read_frame, \
+                patch.object(repo, "_update_all_data") as update:
+            data = repo.get_all_data("AMD", fields=["info", "history"])
+            self.assertEqual([call.args[1] for call in read_frame.call_args_list], ["history"])
+            update.assert_not_called()
+
+            pd.testing.assert_frame_equal(data["cashflow"], legacy["cashflow"], check_column_type=False)
+            self.assertEqual(read_frame.call_count, 2)
+        self.assertEqual(set(data), set(legacy))
+        with self.assertRaises(ValueError):
+            repo.get_all_data("AMD", fields=["prices"])
+
+    def test_company_profiles_come_from_the_cached_bundle(self):
+        yfinance_cache.migrate_legacy_cache()
+        bundle_cache.clear()
+        repo = YahooFinanceRepository()
+        fresh = {dataset: None for dataset in yfinance_cache.DATASETS}
+
+        with patch.object(repo, "get_ticker") as get_ticker, \
+                patch.object(repo, "_update_all_data", return_value=None) as update, \
+                patch.dict(repo.ttls, fresh):
+            company = repo.get_company_info("amd")
+            companies = repo.get_company_infos(["AMD", "ZZZZ"])
+
+        get_ticker.assert_not_called()
+        self.assertEqual([call.args[0] for call in update.call_args_list], ["ZZZZ"])
+        self.assertEqual(company.ticker, "AMD")
+        self.assertEqual(company.name, "Advanced Micro Devices, Inc.")
+        self.assertEqual(companies, {"AMD": company, "ZZZZ": None})
+
+
+if __name__ == '__main__':
+    unittest.main()